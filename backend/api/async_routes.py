@@ -0,0 +1,65 @@
+"""
+Async versions of the read-only list endpoints, served through the async
+engine when ASTA_DB_ASYNC=1. They are registered ahead of the sync handlers
+in main.py and take over the same paths, so polling clients don't each hold
+a threadpool slot while waiting on the database.
+"""
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.db import async_crud, session
+from backend.api import conditional, schemas
+from backend.api.responses import LOGS, TASKS, rows_response
+from backend.utils.date_utils import agenda_window
+
+router = APIRouter()
+
+
+@router.get("/tasks/", response_model=list[schemas.Task])
+async def read_tasks(request: Request, after: Optional[int] = None, skip: int = 0, limit: int = 10, db: AsyncSession = Depends(session.get_async_db)):
+    version = await async_crud.list_version(db)
+    etag, response = conditional.lookup(request, version)
+    if response is None:
+        tasks = await async_crud.get_tasks(db=db, skip=skip, limit=limit, after=after)
+        response = conditional.store(etag, version, rows_response(TASKS, tasks, limit))
+    return response
+
+@router.get("/users/{user_id}/tasks", response_model=list[schemas.Task])
+async def read_user_tasks(user_id: int, request: Request, after: Optional[int] = None, skip: int = 0, limit: int = 100, db: AsyncSession = Depends(session.get_async_db)):
+    version = await async_crud.list_version(db, user_id)
+    etag, response = conditional.lookup(request, version)
+    if response is None:
+        tasks = await async_crud.get_tasks_for_user(db=db, user_id=user_id, skip=skip, limit=limit, after=after)
+        response = conditional.store(etag, version, rows_response(TASKS, tasks, limit))
+    return response
+
+@router.get("/users/{user_id}/agenda", response_model=list[schemas.Task])
+async def read_user_agenda(user_id: int, request: Request, window: str = Query("today", pattern="^(today|week)$"), limit: int = 100, db: AsyncSession = Depends(session.get_async_db)):
+    start, end = agenda_window(window)
+    version = await async_crud.list_version(db, user_id)
+    etag, response = conditional.lookup(request, version, start.date().isoformat())
+    if response is None:
+        tasks = await async_crud.get_agenda(db=db, user_id=user_id, start=start, end=end, limit=limit)
+        response = conditional.store(etag, version, rows_response(TASKS, tasks))
+    return response
+
+@router.get("/logs/", response_model=list[schemas.Log])
+async def read_logs(request: Request, after: Optional[int] = None, skip: int = 0, limit: int = 100, db: AsyncSession = Depends(session.get_async_db)):
+    version = await async_crud.list_version(db)
+    etag, response = conditional.lookup(request, version)
+    if response is None:
+        logs = await async_crud.get_logs(db, skip=skip, limit=limit, after=after)
+        response = conditional.store(etag, version, rows_response(LOGS, logs, limit))
+    return response
+
+@router.get("/users/{user_id}/logs", response_model=list[schemas.Log])
+async def read_user_logs(user_id: int, request: Request, after: Optional[int] = None, skip: int = 0, limit: int = 100, db: AsyncSession = Depends(session.get_async_db)):
+    if not await async_crud.get_user_ref(db, user_id):
+        raise HTTPException(status_code=404, detail="User not found")
+    version = await async_crud.list_version(db, user_id)
+    etag, response = conditional.lookup(request, version)
+    if response is None:
+        logs = await async_crud.get_logs_for_user(db=db, user_id=user_id, skip=skip, limit=limit, after=after)
+        response = conditional.store(etag, version, rows_response(LOGS, logs, limit))
+    return response
@@ -0,0 +1,137 @@
+"""
+Bulk import/export of tasks and logs.
+
+POST /tasks/bulk and /logs/bulk read an NDJSON body (one TaskImport /
+LogImport object per line) as it streams in and insert it CHUNK_SIZE rows at
+a time, all in one transaction: a bad line rolls back the whole import and
+the 4xx names it (422 for an invalid line or an unknown user_id, 409 with
+the chunk's lines for any other constraint the database rejects).
+GET /tasks/export and /logs/export stream NDJSON or CSV.
+"""
+from collections import Counter
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from backend.db import bulk, changes, crud, models, session
+from backend.api import schemas
+
+router = APIRouter()
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+async def _ndjson_lines(request: Request):
+    # Split the body into lines as it arrives, without buffering all of it
+    lineno, tail = 0, b""
+    async for chunk in request.stream():
+        lines = (tail + chunk).split(b"\n")
+        tail = lines.pop()
+        for line in lines:
+            lineno += 1
+            if line.strip():
+                yield lineno, line
+    if tail.strip():
+        yield lineno + 1, tail
+
+
+def _task_row(item: schemas.TaskImport) -> dict:
+    # MVP: default user_id to 1 if not provided
+    return {
+        "title": item.title, "description": item.description, "due_date": item.due_date,
+        "all_day": item.all_day, "status": item.status, "user_id": item.user_id or 1,
+    }
+
+def _log_row(item: schemas.LogImport) -> dict:
+    return {
+        "user_id": item.user_id, "event_type": item.event_type,
+        "content": item.content, "timestamp": item.timestamp or datetime.utcnow(),
+    }
+
+
+def _finish_import(db: Session, entity: str, counts: Counter):
+    # Change feed clients reload the whole list rather than get a change per row
+    for user_id in counts:
+        changes.record(db, user_id, entity, "reset")
+    if entity == "task":
+        # One audit entry per user instead of one per imported task
+        for user_id, count in counts.items():
+            crud.create_log(db=db, user_id=user_id, event_type="tasks_imported", content=f"{count} tasks imported")
+    db.commit()
+
+
+def _insert_chunk(db: Session, model, rows, linenos):
+    # SQLite doesn't enforce the user foreign key and PostgreSQL would only
+    # say which constraint failed, so unknown users are looked up per chunk
+    user_ids = {row["user_id"] for row in rows}
+    known = set(db.execute(select(models.User.id).where(models.User.id.in_(user_ids))).scalars())
+    for row, lineno in zip(rows, linenos):
+        if row["user_id"] not in known:
+            raise HTTPException(status_code=422, detail=f"line {lineno}: user_id: user {row['user_id']} does not exist")
+    dbapi = db.get_bind().dialect.dbapi
+    try:
+        bulk.insert_rows(db, model, rows)
+    # COPY raises the driver's own error
+    except (IntegrityError, dbapi.IntegrityError) as e:
+        error = getattr(e, "orig", e)
+        raise HTTPException(status_code=409, detail=f"lines {linenos[0]}-{linenos[-1]}: {error}")
+
+
+async def _import(request: Request, db: Session, schema, to_row, model) -> Counter:
+    counts, chunk, linenos = Counter(), [], []
+    try:
+        async for lineno, line in _ndjson_lines(request):
+            try:
+                row = to_row(schema.model_validate_json(line))
+            except ValidationError as e:
+                error = e.errors()[0]
+                location = ".".join(str(part) for part in error["loc"])
+                raise HTTPException(status_code=422, detail=f"line {lineno}: {location}: {error['msg']}")
+            chunk.append(row)
+            linenos.append(lineno)
+            counts[row["user_id"]] += 1
+            if len(chunk) >= bulk.CHUNK_SIZE:
+                await run_in_threadpool(_insert_chunk, db, model, chunk, linenos)
+                chunk, linenos = [], []
+        if chunk:
+            await run_in_threadpool(_insert_chunk, db, model, chunk, linenos)
+        return counts
+    except Exception:
+        await run_in_threadpool(db.rollback)
+        raise
+
+
+@router.post("/tasks/bulk", response_model=schemas.BulkImportOutput)
+async def import_tasks(request: Request, db: Session = Depends(session.get_db)):
+    counts = await _import(request, db, schemas.TaskImport, _task_row, models.Task)
+    await run_in_threadpool(_finish_import, db, "task", counts)
+    return schemas.BulkImportOutput(inserted=sum(counts.values()))
+
+@router.post("/logs/bulk", response_model=schemas.BulkImportOutput)
+async def import_logs(request: Request, db: Session = Depends(session.get_db)):
+    counts = await _import(request, db, schemas.LogImport, _log_row, models.Log)
+    await run_in_threadpool(_finish_import, db, "log", counts)
+    return schemas.BulkImportOutput(inserted=sum(counts.values()))
+
+
+def _export(model, name: str, user_id: Optional[int], fmt: str) -> StreamingResponse:
+    # A sync generator: Starlette pulls each chunk on its threadpool
+    return StreamingResponse(
+        bulk.export_chunks(session.SessionLocal, model, user_id=user_id, fmt=fmt),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{fmt}"'},
+    )
+
+@router.get("/tasks/export")
+def export_tasks(user_id: Optional[int] = None, format: str = Query("ndjson", pattern="^(ndjson|csv)$")):
+    return _export(models.Task, "tasks", user_id, format)
+
+@router.get("/logs/export")
+def export_logs(user_id: Optional[int] = None, format: str = Query("ndjson", pattern="^(ndjson|csv)$")):
+    return _export(models.Log, "logs", user_id, format)
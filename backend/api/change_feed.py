@@ -0,0 +1,136 @@
+"""
+Per-user change feed over HTTP.
+
+    GET /users/{id}/changes                 current cursor, no changes
+    GET /users/{id}/changes?since=N         changes after N (?wait=S long-polls)
+    GET /users/{id}/changes/stream?since=N  the same as Server-Sent Events
+
+Clients take the cursor, load their lists once, then apply the changes after
+that cursor as patches instead of re-fetching. A "reset" change (e.g. after
+a bulk import) means: reload that entity's list.
+
+Waiting requests are woken right after a commit in this process; changes
+committed by other worker processes are picked up by re-reading the table
+every ASTA_CHANGES_POLL_SECONDS.
+"""
+import asyncio
+import os
+import threading
+from contextlib import contextmanager
+from typing import Optional
+
+from fastapi import APIRouter, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from backend.db import changes, session
+from backend.api import schemas
+from backend.api.responses import model_response
+
+router = APIRouter()
+
+POLL_SECONDS = float(os.getenv("ASTA_CHANGES_POLL_SECONDS", "2"))
+KEEPALIVE_SECONDS = 15.0
+STREAM_PAGE = 500
+
+
+class ChangeHub:
+    """Wakes this process's waiting feed requests when a commit touches their user."""
+
+    def __init__(self):
+        self._waiters = {}  # user_id -> {(loop, asyncio.Event)}
+        self._lock = threading.Lock()
+
+    def notify(self, user_ids):
+        with self._lock:
+            waiters = [w for user_id in user_ids for w in self._waiters.get(user_id, ())]
+        for loop, event in waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                pass  # loop already closed
+
+    @contextmanager
+    def listen(self, user_id: int):
+        # Register before reading the table, so a commit in between still wakes us
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            self._waiters.setdefault(user_id, set()).add(waiter)
+        try:
+            yield waiter[1]
+        finally:
+            with self._lock:
+                waiters = self._waiters.get(user_id)
+                waiters.discard(waiter)
+                if not waiters:
+                    del self._waiters[user_id]
+
+
+hub = ChangeHub()
+changes.subscribe(hub.notify)
+
+
+async def _wait(event: asyncio.Event, timeout: float):
+    try:
+        await asyncio.wait_for(event.wait(), timeout)
+    except asyncio.TimeoutError:
+        pass
+
+def _read(user_id: int, after: Optional[int], limit: int):
+    with session.SessionLocal() as db:
+        if after is None:
+            return [], changes.latest(db, user_id)
+        rows = changes.since(db, user_id, after, limit)
+        return rows, rows[-1].id if rows else after
+
+
+@router.get("/users/{user_id}/changes", response_model=schemas.ChangeFeed)
+async def read_changes(user_id: int, since: Optional[int] = None, wait: float = Query(0, ge=0, le=60),
+                       limit: int = Query(500, ge=1, le=1000)):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + wait
+    while True:
+        with hub.listen(user_id) as event:
+            rows, cursor = await run_in_threadpool(_read, user_id, since, limit)
+            remaining = deadline - loop.time()
+            if rows or since is None or remaining <= 0:
+                break
+            await _wait(event, min(remaining, POLL_SECONDS))
+    return model_response(schemas.ChangeFeed(
+        changes=[schemas.Change.model_validate(row) for row in rows],
+        cursor=cursor,
+        more=len(rows) >= limit,
+    ))
+
+
+@router.get("/users/{user_id}/changes/stream")
+async def stream_changes(user_id: int, request: Request, since: Optional[int] = None):
+    # EventSource reconnects with the id of the last event it received
+    last_event_id = request.headers.get("last-event-id", "")
+    if last_event_id.isdigit():
+        since = int(last_event_id)
+
+    async def events():
+        cursor = since
+        if cursor is None:
+            _, cursor = await run_in_threadpool(_read, user_id, None, 1)
+        # Tell the client how long to wait before reconnecting
+        yield "retry: 2000\n\n"
+        idle = 0.0
+        while True:
+            with hub.listen(user_id) as event:
+                rows, cursor = await run_in_threadpool(_read, user_id, cursor, STREAM_PAGE)
+                if rows:
+                    idle = 0.0
+                    yield "".join(
+                        f"id: {row.id}\nevent: change\ndata: {schemas.Change.model_validate(row).model_dump_json()}\n\n"
+                        for row in rows
+                    )
+                    continue
+                await _wait(event, POLL_SECONDS)
+            idle += POLL_SECONDS
+            if idle >= KEEPALIVE_SECONDS:
+                idle = 0.0
+                yield ": keepalive\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
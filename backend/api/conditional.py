@@ -0,0 +1,82 @@
+"""
+Conditional GET for the list endpoints.
+
+A list's ETag is the change-feed version of its scope (the user, or everyone
+for /tasks/ and /logs/) plus the request path and query. Every task/log
+write moves the version, so a poll that finds nothing new is answered 304
+from the cached version alone: no list query, no serialization. Pages
+rendered for the current version are kept in db.read_cache.pages and served
+as-is to the next client that asks without a matching validator.
+
+    version = crud.list_version(db, user_id)
+    etag, response = conditional.lookup(request, version)
+    if response is None:
+        response = conditional.store(etag, version, rows_response(...))
+"""
+import hashlib
+from datetime import timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response
+from backend.api.pagination import NEXT_CURSOR_HEADER
+from backend.db import read_cache
+
+
+def etag_for(request: Request, version, extra: str = "") -> str:
+    """`extra` is anything else the body depends on, e.g. the agenda's day."""
+    key = f"{request.url.path}?{request.url.query}#{extra}"
+    digest = hashlib.blake2s(key.encode(), digest_size=8).hexdigest()
+    return f'W/"{version[0]}-{digest}"'
+
+
+def _validators(etag: str, modified) -> dict:
+    # no-cache: browsers may keep the page but must revalidate it every time
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if modified is not None:
+        headers["Last-Modified"] = format_datetime(modified.replace(tzinfo=timezone.utc), usegmt=True)
+    return headers
+
+def _opaque(tag: str) -> str:
+    # If-None-Match uses the weak comparison
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+def _not_modified(request: Request, etag: str, modified) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # Takes precedence over If-Modified-Since when both are sent
+        tags = {_opaque(tag) for tag in if_none_match.split(",")}
+        return "*" in tags or _opaque(etag) in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            return False
+        return modified.replace(tzinfo=timezone.utc, microsecond=0) <= since
+    return False
+
+
+def lookup(request: Request, version, extra: str = ""):
+    """(etag, response): a 304 or an already rendered page, else (etag, None)."""
+    etag = etag_for(request, version, extra)
+    headers = _validators(etag, version[1])
+    if _not_modified(request, etag, version[1]):
+        return etag, Response(status_code=304, headers=headers)
+    page = read_cache.pages.get(etag)
+    if page is None:
+        return etag, None
+    body, cursor = page
+    if cursor is not None:
+        headers[NEXT_CURSOR_HEADER] = cursor
+    return etag, Response(content=body, media_type="application/json", headers=headers)
+
+
+def store(etag: str, version, response: Response) -> Response:
+    """Keep a freshly rendered page for `etag` and add its validators."""
+    read_cache.pages.set(etag, (response.body, response.headers.get(NEXT_CURSOR_HEADER)))
+    response.headers.update(_validators(etag, version[1]))
+    return response
+
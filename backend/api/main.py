@@ -1,13 +1,72 @@
-from fastapi import FastAPI, Depends, HTTPException
+import asyncio
+import hmac
+import os
+import signal
+import threading
+from datetime import datetime, timedelta
+from contextlib import asynccontextmanager
+from difflib import SequenceMatcher
+
+from typing import Optional
+
+from fastapi import FastAPI, Depends, Header, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from backend.db import crud, session
-from backend.api import schemas
+from backend.db import changes, crud, log_writer, reminders, session
+from backend.api import schemas, async_routes, bulk_routes, change_feed, conditional
+from backend.api.pagination import NEXT_CURSOR_HEADER
+from backend.api.responses import LOG_STATS, LOGS, TASKS, USERS, model_response, rows_response
 from backend.nlp import nlp_processor
-from backend.utils.date_utils import parse_due_date
-from backend.nlp.utils import clean_title, parse_due_date
-
-app = FastAPI()
+from backend.nlp.batcher import get_parse_batcher
+from backend.nlp import registry as nlp_registry
+from backend.nlp.executor import InferenceSaturated, get_inference_executor
+from backend.nlp.intent_matcher import IntentMatcher, load_intents
+from backend.utils import metrics
+from backend.utils.date_utils import agenda_window, parse_due_date
+from backend.nlp.utils import clean_title, task_reference
+
+# Opt-in background audit-log writer (ASTA_ASYNC_LOGS=1)
+log_writer.configure(session.SessionLocal)
+# Opt-in due-date reminder scheduler (ASTA_REMINDERS=1)
+reminders.configure(session.SessionLocal)
+
+# Admin endpoints (intent reload) are disabled unless this is set; callers
+# send it in the X-Admin-Token header
+ADMIN_TOKEN = os.getenv("ASTA_ADMIN_TOKEN")
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if x_admin_token is None or not hmac.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load NLP models without holding up "/" and the CRUD endpoints;
+    # NLP requests that arrive first wait for the load to finish.
+    if nlp_registry.WARMUP == "blocking":
+        await asyncio.to_thread(nlp_registry.registry.warm_up)
+    elif nlp_registry.WARMUP == "background":
+        threading.Thread(target=nlp_registry.registry.warm_up, name="asta-nlp-warmup", daemon=True).start()
+    if log_writer.writer is not None:
+        log_writer.writer.start()
+    if reminders.scheduler is not None:
+        reminders.scheduler.start()
+    yield
+    if reminders.scheduler is not None:
+        await asyncio.to_thread(reminders.scheduler.stop)
+    if log_writer.writer is not None:
+        # Flush queued audit rows before the process exits
+        await asyncio.to_thread(log_writer.writer.stop)
+    get_inference_executor().shutdown(wait=False)
+    if session.ASYNC_ENABLED:
+        await session.get_async_engine().dispose()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # Allow frontend (running locally) to talk to backend
 app.add_middleware(
@@ -16,21 +75,60 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "Server-Timing", "ETag"],
 )
 
+# Per-route latency histograms and the Server-Timing header (ASTA_METRICS)
+if metrics.ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+
+# Async read endpoints take precedence over the sync ones below when enabled
+if session.ASYNC_ENABLED:
+    app.include_router(async_routes.router)
+
+# NDJSON bulk import and NDJSON/CSV export of tasks and logs
+app.include_router(bulk_routes.router)
+# Per-user change feed (cursor/long-poll and SSE)
+app.include_router(change_feed.router)
+
+@app.exception_handler(InferenceSaturated)
+def inference_saturated_handler(request: Request, exc: InferenceSaturated):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
 @app.get("/")
 def root():
     return {"message": "Hello from ASTA MVP"}
 
+@app.get("/health")
+def health():
+    return {
+        "status": "ok",
+        "nlp": nlp_registry.registry.status(),
+        "nlp_cache": nlp_processor.cache_stats(),
+        "inference": {**get_inference_executor().stats(), "pending": get_parse_batcher().pending},
+        "log_writer": log_writer.writer.stats() if log_writer.writer is not None else None,
+        "reminders": reminders.scheduler.stats() if reminders.scheduler is not None else None,
+    }
+
+@app.get("/metrics")
+def read_metrics():
+    """Prometheus text exposition of this process's timings (ASTA_METRICS)."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 
 # ---------------- User endpoints ----------------
 @app.post("/users/", response_model=schemas.User)
 def create_user(user: schemas.UserCreate, db: Session = Depends(session.get_db)):
-    # Prevent duplicate usernames
-    existing = crud.get_user_by_username(db, user.username)
-    if existing:
+    # The unique index rejects duplicate usernames; no SELECT beforehand
+    try:
+        with session.unit_of_work(db):
+            return crud.create_user(db, username=user.username)
+    except IntegrityError:
         raise HTTPException(status_code=400, detail="Username already exists")
-    return crud.create_user(db, username=user.username)
 
 @app.get("/users/{user_id}", response_model=schemas.User)
 def read_user(user_id: int, db: Session = Depends(session.get_db)):
@@ -41,7 +139,7 @@ def read_user(user_id: int, db: Session = Depends(session.get_db)):
 
 @app.get("/users/", response_model=list[schemas.User])
 def read_users(skip: int = 0, limit: int = 100, db: Session = Depends(session.get_db)):
-    return crud.get_users(db, skip=skip, limit=limit)
+    return rows_response(USERS, crud.get_users(db, skip=skip, limit=limit))
 
 
 # ---------------- Task endpoints ----------------
@@ -50,30 +148,56 @@ def create_task(task: schemas.TaskCreate, db: Session = Depends(session.get_db))
     # In MVP mode: fallback to single user (ID=1)
     user_id = task.user_id or 1
 
-    db_task = crud.create_task(
-        db=db,
-        title=task.title,
-        description=task.description,
-        due_date=task.due_date,
-        user_id=task.user_id
-    )
-    # Automatically log the task creation
-    crud.create_log(
-        db=db,
-        user_id=task.user_id,
-        event_type="task_created",
-        content=f"Task '{task.title}' created"
-    )
+    # Task and its audit log are committed together
+    with session.unit_of_work(db):
+        db_task = crud.create_task(
+            db=db,
+            title=task.title,
+            description=task.description,
+            due_date=task.due_date,
+            user_id=user_id
+        )
+        # Automatically log the task creation
+        crud.create_log(
+            db=db,
+            user_id=user_id,
+            event_type="task_created",
+            content=f"Task '{task.title}' created"
+        )
     return db_task
 
+# List endpoints take `?after=<id>` (the X-Next-Cursor of the previous page)
+# and send an ETag: polling with If-None-Match costs a 304 until the list's
+# owner (everyone, for /tasks/ and /logs/) writes something.
 @app.get("/tasks/", response_model=list[schemas.Task])
-def read_tasks(skip: int = 0, limit: int = 10, db: Session = Depends(session.get_db)):
-    return crud.get_tasks(db=db, skip=skip, limit=limit)
+def read_tasks(request: Request, after: Optional[int] = None, skip: int = 0, limit: int = 10, db: Session = Depends(session.get_db)):
+    version = crud.list_version(db)
+    etag, response = conditional.lookup(request, version)
+    if response is None:
+        tasks = crud.get_tasks(db=db, skip=skip, limit=limit, after=after)
+        response = conditional.store(etag, version, rows_response(TASKS, tasks, limit))
+    return response
 
 @app.get("/users/{user_id}/tasks", response_model=list[schemas.Task])
-def read_user_tasks(user_id: int, skip: int = 0, limit: int = 100, db: Session = Depends(session.get_db)):
-    # MVP: ignore user filtering, return all tasks
-    return crud.get_tasks(db=db, skip=skip, limit=limit)
+def read_user_tasks(user_id: int, request: Request, after: Optional[int] = None, skip: int = 0, limit: int = 100, db: Session = Depends(session.get_db)):
+    version = crud.list_version(db, user_id)
+    etag, response = conditional.lookup(request, version)
+    if response is None:
+        tasks = crud.get_tasks_for_user(db=db, user_id=user_id, skip=skip, limit=limit, after=after)
+        response = conditional.store(etag, version, rows_response(TASKS, tasks, limit))
+    return response
+
+@app.get("/users/{user_id}/agenda", response_model=list[schemas.Task])
+def read_user_agenda(user_id: int, request: Request, window: str = Query("today", pattern="^(today|week)$"), limit: int = 100, db: Session = Depends(session.get_db)):
+    """Pending tasks due today or within the next week, soonest first."""
+    start, end = agenda_window(window)
+    version = crud.list_version(db, user_id)
+    # The window moves at midnight even if nothing was written
+    etag, response = conditional.lookup(request, version, start.date().isoformat())
+    if response is None:
+        tasks = crud.get_agenda(db=db, user_id=user_id, start=start, end=end, limit=limit)
+        response = conditional.store(etag, version, rows_response(TASKS, tasks))
+    return response
 
 @app.put("/tasks/{task_id}/complete", response_model=schemas.Task)
 def complete_task(task_id: int, db: Session = Depends(session.get_db)):
@@ -81,17 +205,16 @@ def complete_task(task_id: int, db: Session = Depends(session.get_db)):
     if not db_task:
         raise HTTPException(status_code=404, detail="Task not found")
 
-    db_task.status = "completed"
-    db.commit()
-    db.refresh(db_task)
+    with session.unit_of_work(db):
+        crud.complete_task(db, db_task)
 
-    # Log completion
-    crud.create_log(
-        db=db,
-        user_id=1,  # MVP fallback
-        event_type="task_completed",
-        content=f"Task '{db_task.title}' marked complete"
-    )
+        # Log completion
+        crud.create_log(
+            db=db,
+            user_id=db_task.user_id or 1,  # MVP fallback
+            event_type="task_completed",
+            content=f"Task '{db_task.title}' marked complete"
+        )
 
     return db_task
 
@@ -99,33 +222,131 @@ def complete_task(task_id: int, db: Session = Depends(session.get_db)):
 @app.post("/logs/", response_model=schemas.Log)
 def create_log(log: schemas.LogCreate, db: Session = Depends(session.get_db)):
     # MVP: default user_id to 1 if not provided
-    user_id = log.iser_id or 1
-    return crud.create_log(db=db, user_id=user_id, event_type=log.event_type, content=log.content)
+    user_id = log.user_id or 1
+    with session.unit_of_work(db):
+        return crud.create_log(db=db, user_id=user_id, event_type=log.event_type, content=log.content)
 
+# Logs are listed newest first
 @app.get("/logs/", response_model=list[schemas.Log])
-def read_logs(skip: int = 0, limit: int = 100, db: Session = Depends(session.get_db)):
-    return crud.get_logs(db, skip=skip, limit=limit)
+def read_logs(request: Request, after: Optional[int] = None, skip: int = 0, limit: int = 100, db: Session = Depends(session.get_db)):
+    version = crud.list_version(db)
+    etag, response = conditional.lookup(request, version)
+    if response is None:
+        logs = crud.get_logs(db, skip=skip, limit=limit, after=after)
+        response = conditional.store(etag, version, rows_response(LOGS, logs, limit))
+    return response
 
 @app.get("/users/{user_id}/logs", response_model=list[schemas.Log])
-def read_user_logs(user_id: int, skip: int = 0, limit: int = 100, db: Session = Depends(session.get_db)):
-    if not crud.get_user(db, user_id):
+def read_user_logs(user_id: int, request: Request, after: Optional[int] = None, skip: int = 0, limit: int = 100, db: Session = Depends(session.get_db)):
+    if not crud.get_user_ref(db, user_id):
         raise HTTPException(status_code=404, detail="User not found")
-    return crud.get_logs_for_user(db=db, user_id=user_id, skip=skip, limit=limit)
+    version = crud.list_version(db, user_id)
+    etag, response = conditional.lookup(request, version)
+    if response is None:
+        logs = crud.get_logs_for_user(db=db, user_id=user_id, skip=skip, limit=limit, after=after)
+        response = conditional.store(etag, version, rows_response(LOGS, logs, limit))
+    return response
+
+@app.get("/users/{user_id}/logs/stats", response_model=list[schemas.LogStat])
+def read_user_log_stats(user_id: int, request: Request, days: int = Query(30, ge=1, le=366), db: Session = Depends(session.get_db)):
+    """Log counts per UTC day and event type over the last `days` days, from the daily rollups."""
+    today = datetime.utcnow().date()
+    start = today - timedelta(days=days - 1)
+    version = crud.list_version(db, user_id)
+    etag, response = conditional.lookup(request, version, today.isoformat())
+    if response is None:
+        stats = crud.get_log_stats(db, user_id=user_id, start=start, today=today)
+        response = conditional.store(etag, version, rows_response(LOG_STATS, stats))
+    return response
+
+# ---------------- Search endpoints ----------------
+@app.get("/users/{user_id}/tasks/search", response_model=list[schemas.Task])
+def search_user_tasks(user_id: int, request: Request, q: str = Query(..., min_length=1, max_length=200),
+                      status: Optional[str] = None, limit: int = Query(20, ge=1, le=100), db: Session = Depends(session.get_db)):
+    """Tasks whose title matches q (full-text, or fuzzy on PostgreSQL), best match first."""
+    version = crud.list_version(db, user_id)
+    etag, response = conditional.lookup(request, version)
+    if response is None:
+        tasks = crud.search_tasks(db, user_id=user_id, q=q, status=status, limit=limit)
+        response = conditional.store(etag, version, rows_response(TASKS, tasks))
+    return response
+
+@app.get("/users/{user_id}/logs/search", response_model=list[schemas.Log])
+def search_user_logs(user_id: int, request: Request, q: str = Query(..., min_length=1, max_length=200),
+                     limit: int = Query(50, ge=1, le=200), db: Session = Depends(session.get_db)):
+    """Log entries whose content matches q, newest first."""
+    version = crud.list_version(db, user_id)
+    etag, response = conditional.lookup(request, version)
+    if response is None:
+        logs = crud.search_logs(db, user_id=user_id, q=q, limit=limit)
+        response = conditional.store(etag, version, rows_response(LOGS, logs))
+    return response
 
 # ---------- NLP Endpoints ----------
 
+@app.post("/nlp/intents/reload", dependencies=[Depends(require_admin)])
+def reload_intents():
+    """
+    Rebuild the intent matcher from ASTA_INTENTS_PATH without a restart.
+
+    Under backend.serve each worker has its own matcher, so the table is
+    checked here and the master is sent SIGHUP: it rebuilds the matcher and
+    replaces every worker with one forked from it.
+    """
+    path = nlp_processor.INTENTS_PATH
+    try:
+        matcher = IntentMatcher(load_intents(path)) if path else nlp_processor.get_matcher()
+    except (OSError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Cannot load {path}: {e}")
+    master = os.getenv("ASTA_MASTER_PID")
+    if master:
+        os.kill(int(master), signal.SIGHUP)
+        return JSONResponse(status_code=202, content={"intents": matcher.intents, "reload": "workers"})
+    nlp_processor.reload_intents()
+    return {"intents": matcher.intents}
+
+# NLP handlers are async: inference runs on the dedicated inference executor
+# (via the micro-batcher) and DB work on Starlette's threadpool, so neither
+# blocks the event loop and NLP bursts can't occupy the CRUD threadpool slots
+# while they wait for the models.
+
+async def parse_one(text: str):
+    # Concurrent requests are coalesced into one batch by the micro-batcher;
+    # "nlp" covers queueing plus the shared batch
+    with metrics.timer("nlp"):
+        return await asyncio.wrap_future(get_parse_batcher().submit(text))
+
+def entity_spans(result) -> list:
+    return [schemas.EntitySpan(**span._asdict()) for span in result.spans]
+
+def parse_output(result) -> schemas.NLPParseOutput:
+    return schemas.NLPParseOutput(intent=result.intent, entities=result.entities, spans=entity_spans(result))
+
 @app.post("/nlp/parse", response_model=schemas.NLPParseOutput)
-def parse_text(input_data: schemas.NLPInput):
+async def parse_text(input_data: schemas.NLPInput):
     """
     Debug endpoint: Returns intent + entities from user input
     without performing any action.
     """
-    result = nlp_processor.parse_input(input_data.text)
-    return schemas.NLPParseOutput(intent=result["intent"], entities=result["entities"])
+    result = await parse_one(input_data.text)
+    return model_response(parse_output(result))
+
+
+@app.post("/nlp/parse/batch", response_model=schemas.NLPBatchParseOutput)
+async def parse_text_batch(input_data: schemas.NLPBatchInput):
+    """
+    Batch variant of /nlp/parse: runs all texts through spaCy and the
+    classifier in a single pass.
+    """
+    with metrics.timer("nlp"):
+        results = await get_inference_executor().run(nlp_processor.parse_batch, input_data.texts)
+    return model_response(schemas.NLPBatchParseOutput(results=[
+        parse_output(r) for r in results
+    ]))
 
 
 @app.post("/nlp/act", response_model=schemas.NLPActOutput)
-def act_on_text(input_data: schemas.NLPInput, db: Session = Depends(session.get_db)):
+async def act_on_text(input_data: schemas.NLPInput, db: Session = Depends(session.get_db)):
     """
     Main NLP endpoint: interprets user input, performs CRUD if needed,
     and always logs the interaction.
@@ -134,8 +355,104 @@ def act_on_text(input_data: schemas.NLPInput, db: Session = Depends(session.get_
         input_data.user_id = 1
 
     # Run NLP processor
-    result = nlp_processor.parse_input(input_data.text)
-    intent, entities = result["intent"], result["entities"]
+    result = await parse_one(input_data.text)
+    output = await run_in_threadpool(perform_action, db, input_data.text, input_data.user_id, result)
+    return model_response(output)
+
+
+@app.post("/nlp/act/batch", response_model=schemas.NLPBatchActOutput)
+async def act_on_text_batch(input_data: schemas.NLPBatchInput, db: Session = Depends(session.get_db)):
+    """
+    Batch variant of /nlp/act. Texts are parsed together, then acted on in
+    order; a failing item is reported in its own result instead of aborting
+    the rest.
+    """
+    user_id = input_data.user_id or 1
+    with metrics.timer("nlp"):
+        results = await get_inference_executor().run(nlp_processor.parse_batch, input_data.texts)
+    return model_response(await run_in_threadpool(perform_actions, db, input_data.texts, user_id, results))
+
+
+def perform_actions(db: Session, texts, user_id: int, results) -> schemas.NLPBatchActOutput:
+    outputs = []
+    for text, result in zip(texts, results):
+        try:
+            outputs.append(perform_action(db, text, user_id, result))
+        except HTTPException as e:
+            outputs.append(schemas.NLPActOutput(
+                intent=result.intent,
+                entities=result.entities,
+                spans=entity_spans(result),
+                action="error",
+                message=e.detail["message"] if isinstance(e.detail, dict) else str(e.detail),
+            ))
+    return schemas.NLPBatchActOutput(results=outputs)
+
+
+def agenda_window_for(result) -> Optional[str]:
+    """Map DATE entities like "today" or "this week" onto an agenda window."""
+    window = None
+    for span in result.all("DATE"):
+        if "week" in span.value:
+            return "week"
+        if "today" in span.value or "tonight" in span.value:
+            window = "today"
+    return window
+
+
+# A delete/complete that names a task by title only acts on one whose title
+# equals the reference (case-insensitively), or on a single search hit at
+# least this similar to it (difflib ratio); anything else asks for the ID.
+TASK_MATCH_THRESHOLD = float(os.getenv("ASTA_TASK_MATCH_THRESHOLD", "0.85"))
+TASK_CANDIDATES = 5
+
+
+def resolve_task_id(db: Session, text: str, user_id: int, result, status: Optional[str] = None):
+    """
+    (task_id, None, []) for the task a delete/complete request names: its ID,
+    or else the user's task titled like the rest of the text ("delete the
+    meeting task"). (None, reason, candidates) when that isn't one task, with
+    the tasks it might have meant. An ID may still name another user's task:
+    the caller looks it up scoped to user_id.
+    """
+    if result.task_id is not None:
+        return result.task_id, None, []
+    reference = task_reference(text, result.spans)
+    if not reference:
+        return None, "No task ID found in text", []
+    matches = crud.search_tasks(db, user_id=user_id, q=reference, status=status, limit=TASK_CANDIDATES)
+    if not matches:
+        return None, f"No task matching '{reference}'", []
+    wanted = reference.casefold()
+    exact = [t for t in matches if t.title.casefold() == wanted]
+    if len(exact) == 1:
+        return exact[0].id, None, []
+    if exact:
+        return None, f"Several tasks are titled '{reference}'; use the task ID", exact
+    if len(matches) == 1 and SequenceMatcher(None, wanted, matches[0].title.casefold()).ratio() >= TASK_MATCH_THRESHOLD:
+        return matches[0].id, None, []
+    return None, f"No task is titled '{reference}'; use the task ID of one of the candidates", matches
+
+
+def unresolved_task(reason: str, candidates) -> HTTPException:
+    """400 when nothing matched, 409 listing the candidates when it was unclear which task was meant."""
+    if not candidates:
+        return HTTPException(status_code=400, detail=reason)
+    return HTTPException(status_code=409, detail={
+        "message": reason,
+        "candidates": [{"id": t.id, "title": t.title} for t in candidates],
+    })
+
+
+def perform_action(db: Session, text: str, user_id: int, result) -> schemas.NLPActOutput:
+    """
+    Perform the CRUD action for an already parsed input and log it.
+
+    The action and its log entry are one unit of work with a single commit.
+    Expected failures (unknown task, missing ID) still commit their error log
+    before the HTTP error is raised.
+    """
+    intent, entities = result.intent, result.entities
 
     action = None
     created_task = None
@@ -143,143 +460,168 @@ def act_on_text(input_data: schemas.NLPInput, db: Session = Depends(session.get_
     deleted_task_id = None
     message = None
     log = None
+    error = None
 
     # Handle intents
     try:
-        if intent == "create_task":
-            # Title cleaning
-            title = clean_title(input_data.text, entities)
+        with session.unit_of_work(db):
+            if intent == "create_task":
+                # Title cleaning
+                title = clean_title(text, entities, result.spans)
 
-            # Date parsing
-            due_date, all_day = parse_due_date(entities)
+                # Date parsing: the first DATE/TIME mentioned is the due date
+                due_date, all_day = parse_due_date(result.first_entities())
 
-            created_task = crud.create_task(
-                db=db,
-                title=title or "Untitled Task",
-                description=None,
-                due_date=due_date,
-                all_day=all_day,
-                user_id=input_data.user_id
-            )
-            action = "task_created"
-
-            log_content = f"Task '{created_task.title}' created"
-            if due_date:
-                log_content += f" with due date {due_date}"
-            else:
-                log_content += " (no due date parsed)"
+                created_task = crud.create_task(
+                    db=db,
+                    title=title or "Untitled Task",
+                    description=None,
+                    due_date=due_date,
+                    all_day=all_day,
+                    user_id=user_id
+                )
+                action = "task_created"
 
-            log = crud.create_log(
-                db=db,
-                user_id=input_data.user_id,
-                event_type="task_created",
-                content=log_content
-            )
+                log_content = f"Task '{created_task.title}' created"
+                if due_date:
+                    log_content += f" with due date {due_date}"
+                else:
+                    log_content += " (no due date parsed)"
 
-        elif intent == "get_tasks":
-            retrieved_tasks = crud.get_tasks(db=db, skip=0, limit=100)
-            action = "tasks_retrieved"
+                log = crud.create_log(
+                    db=db,
+                    user_id=user_id,
+                    event_type="task_created",
+                    content=log_content
+                )
 
-            log = crud.create_log(
-                db=db,
-                user_id=input_data.user_id,
-                event_type="conversation",
-                content="User requested tasks"
-            )
+            elif intent == "get_tasks":
+                window = agenda_window_for(result)
+                if window:
+                    # "what do I have today" only reads the indexed due-date range
+                    start, end = agenda_window(window)
+                    retrieved_tasks = crud.get_agenda(db=db, user_id=user_id, start=start, end=end)
+                else:
+                    retrieved_tasks = crud.get_tasks_for_user(db=db, user_id=user_id, limit=100)
+                action = "tasks_retrieved"
 
-        elif intent == "delete_task":
-            import re
-            match = re.search(r"\d+", input_data.text)
-            if match:
-                task_id = int(match.group())
-                db_task = crud.get_task(db=db, task_id=task_id)
-                if db_task:
-                    crud.delete_task(db=db, task_id=task_id)
-                    deleted_task_id = task_id
-                    action = "task_deleted"
+                log = crud.create_log(
+                    db=db,
+                    user_id=user_id,
+                    event_type="conversation",
+                    content="User requested tasks"
+                )
 
+            elif intent == "find_task":
+                reference = task_reference(text, result.spans)
+                if reference:
+                    retrieved_tasks = crud.search_tasks(db=db, user_id=user_id, q=reference)
+                    action = "tasks_found"
                     log = crud.create_log(
                         db=db,
-                        user_id=input_data.user_id,
-                        event_type="task_deleted",
-                        content=f"Task with ID {task_id} deleted"
+                        user_id=user_id,
+                        event_type="conversation",
+                        content=f"User searched tasks for '{reference}'"
                     )
                 else:
                     log = crud.create_log(
                         db=db,
-                        user_id=input_data.user_id,
+                        user_id=user_id,
                         event_type="error",
-                        content=f"Attempted to delete non-existent task ID {task_id}"
+                        content="Nothing to search for in find request"
                     )
-                    raise HTTPException(status_code=404, detail="Task not found")
-            else:
-                 log = crud.create_log(
-                     db=db,
-                     user_id=input_data.user_id,
-                     event_type="error",
-                     content="No task ID found in delete request"
-                 )
-                 raise HTTPException(status_code=400, detail="No task ID found in text")
-
-        elif intent == "complete_task":
-            task_id_str = entities.get("TASK_ID")
-            if task_id_str:
-                task_id = int(task_id_str)
-                db_task = crud.get_task(db=db, task_id=task_id)
-                if db_task:
-                    db_task.status = "completed"
-                    db.commit()
-                    db.refresh(db_task)
-
-                    action = "task_completed"
-
+                    error = HTTPException(status_code=400, detail="Nothing to search for in text")
+
+            elif intent == "delete_task":
+                task_id, reason, candidates = resolve_task_id(db, text, user_id, result)
+                if task_id is not None:
+                    if crud.delete_task(db=db, task_id=task_id, user_id=user_id):
+                        deleted_task_id = task_id
+                        action = "task_deleted"
+
+                        log = crud.create_log(
+                            db=db,
+                            user_id=user_id,
+                            event_type="task_deleted",
+                            content=f"Task with ID {task_id} deleted"
+                        )
+                    else:
+                        log = crud.create_log(
+                            db=db,
+                            user_id=user_id,
+                            event_type="error",
+                            content=f"Attempted to delete non-existent task ID {task_id}"
+                        )
+                        error = HTTPException(status_code=404, detail="Task not found")
+                else:
                     log = crud.create_log(
                         db=db,
-                        user_id=input_data.user_id or 1,
-                        event_type="task_completed",
-                        content=f"Task '{db_task.title}' marked complete"
+                        user_id=user_id,
+                        event_type="error",
+                        content=f"No task found for delete request: {reason}"
                     )
+                    error = unresolved_task(reason, candidates)
+
+            elif intent == "complete_task":
+                task_id, reason, candidates = resolve_task_id(db, text, user_id, result, status="pending")
+                if task_id is not None:
+                    db_task = crud.get_task(db=db, task_id=task_id, user_id=user_id)
+                    if db_task:
+                        crud.complete_task(db, db_task)
+                        action = "task_completed"
+
+                        log = crud.create_log(
+                            db=db,
+                            user_id=user_id,
+                            event_type="task_completed",
+                            content=f"Task '{db_task.title}' marked complete"
+                        )
+                    else:
+                        log = crud.create_log(
+                            db=db,
+                            user_id=user_id,
+                            event_type="error",
+                            content=f"Attempted to complete non-existent task ID {task_id}"
+                        )
+                        error = HTTPException(status_code=404, detail="Task not found")
                 else:
                     log = crud.create_log(
                         db=db,
-                        user_id=input_data.user_id or 1,
+                        user_id=user_id,
                         event_type="error",
-                        content=f"Attempted to complete non-existent task ID {task_id}"
+                        content=f"No task found for complete request: {reason}"
                     )
-                    raise HTTPException(status_code=404, detail="Task not found")
+                    error = unresolved_task(reason, candidates)
+
             else:
+                action = "no_crud"
+                message = "This input was logged as a conversation but did not trigger an action."
                 log = crud.create_log(
                     db=db,
-                    user_id=input_data.user_id or 1,
-                    event_type="error",
-                    content="No task ID found in complete request"
+                    user_id=user_id,
+                    event_type="conversation",
+                    content=f"User said: {text}"
                 )
-                raise HTTPException(status_code=400, detail="No task ID found in text")
-
-        else:
-            action = "no_crud"
-            message = "This input was logged as a conversation but did not trigger an action."
-            log = crud.create_log(
-                db=db,
-                user_id=input_data.user_id,
-                event_type="conversation",
-                content=f"User said: {input_data.text}"
-            )
 
     except Exception as e:
-        # Global catch to ensure at least one log entry exists
-        if not log:
-            log = crud.create_log(
+        # The failed unit of work was rolled back; record the error on its own
+        # so at least one log entry exists for this interaction
+        with session.unit_of_work(db):
+            crud.create_log(
                 db=db,
-                user_id=input_data.user_id,
+                user_id=user_id,
                 event_type="error",
                 content=f"Unhandled error: {str(e)}"
             )
         raise
 
+    if error:
+        raise error
+
     return schemas.NLPActOutput(
         intent=intent,
         entities=entities,
+        spans=entity_spans(result),
         action=action or "error",
         task=created_task,
         tasks=retrieved_tasks,
@@ -0,0 +1,12 @@
+from fastapi import Response
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def set_next_cursor(response: Response, rows, limit: int):
+    """
+    Advertise the cursor for the next page: pass it back as `?after=`.
+    A short page means there is nothing more to fetch.
+    """
+    if rows and len(rows) >= limit:
+        response.headers[NEXT_CURSOR_HEADER] = str(rows[-1].id)
+    return rows
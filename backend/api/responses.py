@@ -0,0 +1,34 @@
+"""
+Pre-serialized JSON responses for the list and NLP endpoints.
+
+Returning a Response skips FastAPI's per-item response_model pass (validate,
+dump to dicts, json.dumps); each payload is instead validated and encoded to
+JSON bytes in one pydantic-core call through a TypeAdapter built once at
+import. response_model stays on the routes for the OpenAPI schema.
+"""
+from typing import List
+
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+from backend.api import schemas
+from backend.api.pagination import set_next_cursor
+
+TASKS = TypeAdapter(List[schemas.Task])
+LOGS = TypeAdapter(List[schemas.Log])
+USERS = TypeAdapter(List[schemas.User])
+LOG_STATS = TypeAdapter(List[schemas.LogStat])
+
+
+def rows_response(adapter: TypeAdapter, rows, limit: int = None) -> Response:
+    """JSON list of ORM objects or column rows; `limit` adds the next-page cursor."""
+    body = adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
+    response = Response(content=body, media_type="application/json")
+    if limit is not None:
+        set_next_cursor(response, rows, limit)
+    return response
+
+
+def model_response(model: BaseModel) -> Response:
+    """An already-built pydantic model, encoded without re-validation."""
+    return Response(content=model.model_dump_json(), media_type="application/json")
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field, validator
-from datetime import datetime
-from typing import Dict, Optional, List
+from datetime import date, datetime
+from typing import Dict, Optional, List, Union
 
 # Task schemas
 class TaskBase(BaseModel):
@@ -14,6 +14,7 @@ class TaskCreate(TaskBase):
 class Task(TaskBase):
     id: int
     status: str
+    all_day: bool = False
     user_id: Optional[int] = None
 
     class Config:
@@ -42,25 +43,72 @@ class LogCreate(LogBase):
     user_id: int
 
 class Log(LogBase):
-    id: int
+    id: Optional[int] = None  # None until the async log writer has stored it
     user_id: int
     timestamp: datetime
 
     class Config:
         from_attributes = True # make Pydantic accept ORM objects
 
+class LogStat(BaseModel):
+    day: date
+    event_type: str
+    count: int
+
+    class Config:
+        from_attributes = True
+
+# Bulk import schemas (one NDJSON line each)
+class TaskImport(TaskBase):
+    user_id: Optional[int] = None
+    status: str = "pending"
+    all_day: bool = False
+
+class LogImport(LogBase):
+    user_id: int
+    timestamp: Optional[datetime] = None
+
+class BulkImportOutput(BaseModel):
+    inserted: int
+
+# Change feed schemas
+class Change(BaseModel):
+    seq: int = Field(validation_alias="id")
+    entity: str
+    entity_id: Optional[int] = None
+    op: str
+    data: Optional[dict] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class ChangeFeed(BaseModel):
+    changes: List[Change]
+    cursor: int  # pass back as ?since=
+    more: bool = False  # a full page; ask again right away
+
 # NLP schemas
 class NLPInput(BaseModel):
     text: str = Field(..., min_length=2, description="User input must not be empty")
     user_id: Optional[int] = None  # For /nlp/act
 
+class EntitySpan(BaseModel):
+    label: str
+    start: int
+    end: int
+    text: str
+    value: Union[int, str]
+
 class NLPParseOutput(BaseModel):
     intent: str
-    entities: Dict[str, str]
+    entities: Dict[str, str]  # last span per label, kept for older clients
+    spans: List[EntitySpan] = []
 
 class NLPActOutput(BaseModel):
     intent: str
     entities: Dict[str, str]
+    spans: List[EntitySpan] = []
     action: str
     task: Optional["Task"] = None
     tasks: Optional[List["Task"]] = None
@@ -70,3 +118,14 @@ class NLPActOutput(BaseModel):
 
     class Config:
         from_attributes = True
+
+# Batch NLP schemas
+class NLPBatchInput(BaseModel):
+    texts: List[str] = Field(..., min_length=1, max_length=256, description="Texts to process in one batch")
+    user_id: Optional[int] = None  # For /nlp/act/batch
+
+class NLPBatchParseOutput(BaseModel):
+    results: List[NLPParseOutput]
+
+class NLPBatchActOutput(BaseModel):
+    results: List[NLPActOutput]
@@ -0,0 +1,98 @@
+"""
+Date resolution benchmark: resolve_date (fast path + memo + English-only
+dateparser fallback) against the plain dateparser call parse_due_date used
+to make, over a corpus of DATE/TIME entity strings.
+
+    python -m backend.benchmarks.dates
+
+Reports median per-expression latency for the old call, a cold resolve_date
+(empty memo) and a warm one, plus every expression whose output differs.
+Outputs are compared at a fixed morning and evening reference time, cold
+and with the memo filled in the morning, so results that depend on the
+time of day ("5 pm" after 17:00 is tomorrow) are checked too.
+"""
+import json
+import statistics
+import time
+from datetime import datetime
+
+import dateparser
+
+from backend.utils import date_utils
+
+CORPUS = [
+    "tomorrow", "today", "tomorrow 5 pm", "tomorrow at 5 pm", "today 9am", "5 pm", "5pm", "at 5:30 pm",
+    "17:00", "noon", "friday", "on monday", "sunday at noon", "in 2 hours", "in 30 minutes", "in an hour",
+    "in 3 days", "in a week", "next week", "next friday", "this weekend", "September 30", "the 15th",
+    "end of the month", "tonight", "yesterday", "5:00:00 pm", "today at 5 pm",
+]
+# Before and after the clock times in CORPUS
+MORNING = datetime(2026, 10, 16, 9, 0)
+EVENING = datetime(2026, 10, 16, 18, 0)
+
+
+def _median_us(fn, rounds: int) -> float:
+    samples = []
+    for _ in range(rounds):
+        for expr in CORPUS:
+            start = time.perf_counter()
+            fn(expr)
+            samples.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(samples)
+
+
+def _legacy(expr, now):
+    return dateparser.parse(expr, settings={"PREFER_DATES_FROM": "future", "RELATIVE_BASE": now})
+
+
+def mismatches() -> dict:
+    """{"<check> <expr>": [dateparser, resolve_date]} for every differing output."""
+    found = {}
+    for check, now in (("morning", MORNING), ("evening", EVENING)):
+        for expr in CORPUS:
+            date_utils.clear_memo()
+            expected, got = _legacy(expr, now), date_utils.resolve_date(expr, now)
+            if expected != got:
+                found[f"{check} {expr}"] = [str(expected), str(got)]
+    # Memo filled in the morning, read in the evening
+    date_utils.clear_memo()
+    for expr in CORPUS:
+        date_utils.resolve_date(expr, MORNING)
+    for expr in CORPUS:
+        expected, got = _legacy(expr, EVENING), date_utils.resolve_date(expr, EVENING)
+        if expected != got:
+            found[f"memo {expr}"] = [str(expected), str(got)]
+    return found
+
+
+def run(rounds: int = 20) -> dict:
+    now = MORNING
+
+    def legacy(expr):
+        return _legacy(expr, now)
+
+    def cold(expr):
+        date_utils.clear_memo()
+        return date_utils.resolve_date(expr, now)
+
+    def warm(expr):
+        return date_utils.resolve_date(expr, now)
+
+    found = mismatches()
+
+    legacy_us = _median_us(legacy, rounds)
+    cold_us = _median_us(cold, rounds)
+    warm_us = _median_us(warm, rounds)
+    return {
+        "expressions": len(CORPUS),
+        "legacy_median_us": round(legacy_us, 2),
+        "cold_median_us": round(cold_us, 2),
+        "warm_median_us": round(warm_us, 2),
+        "cold_speedup": round(legacy_us / cold_us, 1),
+        "warm_speedup": round(legacy_us / warm_us, 1),
+        "mismatches": found,
+    }
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
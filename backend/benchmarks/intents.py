@@ -0,0 +1,76 @@
+"""
+Rule-path intent benchmark: per-message cost of the compiled IntentMatcher
+against the old substring scan, and how many messages each one leaves for
+the transformer fallback.
+
+    python -m backend.benchmarks.intents
+"""
+import json
+import time
+
+from backend.nlp.intent_matcher import IntentMatcher
+from backend.nlp.nlp_processor import ASTA_INTENTS
+
+# The table and algorithm detect_intent used before the compiled matcher
+LEGACY_INTENTS = {
+    "create_task": ["remind", "add", "schedule", "create"],
+    "get_tasks": ["show", "list", "tasks", "what do I", "fetch"],
+    "delete_task": ["delete", "remove", "cancel"],
+}
+
+CORPUS = [
+    "Remind me tomorrow at 5 pm to study math.",
+    "Show me my tasks for today.",
+    "Delete the meeting task.",
+    "How are you today?",
+    "What do I have today?",
+    "Add buy milk to my list",
+    "Update my address on the bank website",
+    "Mark task 3 as done",
+    "I finished the report",
+    "Schedule a call with Sam on Friday",
+    "Cancel task 12",
+    "Don't forget to water the plants",
+    "What's on my agenda this week?",
+    "Thanks, that was helpful!",
+    "Please remove the dentist appointment",
+    "create a new task to renew my passport next month",
+]
+
+
+def legacy_intent(text: str):
+    lowered = text.lower()
+    for intent, keywords in LEGACY_INTENTS.items():
+        if any(keyword in lowered for keyword in keywords):
+            return intent
+    return None
+
+
+def _per_message_us(fn, corpus, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for text in corpus:
+            fn(text)
+    return (time.perf_counter() - start) / (rounds * len(corpus)) * 1e6
+
+
+def run(rounds: int = 2000) -> dict:
+    build_start = time.perf_counter()
+    matcher = IntentMatcher(ASTA_INTENTS)
+    build_ms = (time.perf_counter() - build_start) * 1000
+
+    legacy = [legacy_intent(t) for t in CORPUS]
+    compiled = [matcher.best(t) for t in CORPUS]
+    return {
+        "messages": len(CORPUS),
+        "matcher_build_ms": round(build_ms, 3),
+        "legacy_us_per_message": round(_per_message_us(legacy_intent, CORPUS, rounds), 2),
+        "compiled_us_per_message": round(_per_message_us(matcher.best, CORPUS, rounds), 2),
+        "legacy_fallback_rate": sum(i is None for i in legacy) / len(CORPUS),
+        "compiled_fallback_rate": sum(i is None for i in compiled) / len(CORPUS),
+        "changed": {t: [old, new] for t, old, new in zip(CORPUS, legacy, compiled) if old != new},
+    }
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
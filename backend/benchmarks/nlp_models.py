@@ -0,0 +1,82 @@
+"""
+Compares the original model setup (full spaCy pipeline, fp32 DistilBERT,
+untruncated input) with the tuned one (NER-only pipeline, int8 dynamic
+quantization, capped sequence length): per-message latency of each stage and
+how often the tuned outputs agree with the original ones.
+
+    python -m backend.benchmarks.nlp_models
+
+Needs spaCy, torch, transformers and the en_core_web_sm model installed.
+"""
+import json
+import statistics
+import time
+
+from backend.nlp.registry import ModelRegistry
+
+CORPUS = [
+    "Remind me tomorrow at 5 pm to study math.",
+    "How are you today?",
+    "Meeting with Sarah at Google on Friday at 10am",
+    "I really hated how that call went yesterday",
+    "Pay the electricity bill by September 30",
+    "This assistant is great, thanks!",
+    "Book flights to Paris for the second week of June",
+    "Ugh, I forgot my keys again",
+    "Call mom on Sunday evening",
+    "Nothing much, just relaxing this weekend",
+]
+
+
+def _timed(fn, texts, rounds):
+    samples = []
+    outputs = []
+    for _ in range(rounds):
+        for text in texts:
+            start = time.perf_counter()
+            outputs.append(fn(text))
+            samples.append((time.perf_counter() - start) * 1000)
+    return outputs[:len(texts)], {
+        "p50_ms": round(statistics.median(samples), 3),
+        "mean_ms": round(statistics.fmean(samples), 3),
+    }
+
+
+def _ents(nlp):
+    return lambda text: [(e.label_, e.start_char, e.end_char) for e in nlp(text).ents]
+
+
+def _label(classifier):
+    return lambda text: classifier.predict([text])[0]
+
+
+def run(rounds: int = 20) -> dict:
+    baseline = ModelRegistry(mode="full", spacy_pipeline="full", quantize=False, max_length=512,
+                             classifier="transformer")
+    tuned = ModelRegistry(classifier="transformer")
+    baseline.warm_up(freeze=False)
+    tuned.warm_up(freeze=False)
+
+    base_ents, base_ner = _timed(_ents(baseline.spacy()), CORPUS, rounds)
+    tuned_ents, tuned_ner = _timed(_ents(tuned.spacy()), CORPUS, rounds)
+    base_labels, base_cls = _timed(_label(baseline.classifier()), CORPUS, rounds)
+    tuned_labels, tuned_cls = _timed(_label(tuned.classifier()), CORPUS, rounds)
+
+    return {
+        "tuned_config": tuned.status(),
+        "spacy": {
+            "baseline": base_ner,
+            "tuned": tuned_ner,
+            "entity_agreement": sum(a == b for a, b in zip(base_ents, tuned_ents)) / len(CORPUS),
+        },
+        "classifier": {
+            "baseline": base_cls,
+            "tuned": tuned_cls,
+            "label_agreement": sum(a == b for a, b in zip(base_labels, tuned_labels)) / len(CORPUS),
+        },
+        "load_seconds": {"baseline": baseline.load_seconds, "tuned": tuned.load_seconds},
+    }
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
@@ -0,0 +1,325 @@
+"""
+Release benchmark: latency percentiles and throughput for the NLP pipeline
+stages, the HTTP endpoints and the DB write paths, written as one JSON
+report so releases can be compared.
+
+    python -m backend.benchmarks.suite --out bench.json
+    python -m backend.benchmarks.suite --models real --compare baseline.json
+
+Runs against ASTA_DATABASE_URL, or a fresh SQLite file when it isn't set
+(point it at a local Postgres to measure that). With --models mock (the
+default) spaCy and the classifier are replaced by cheap regex stand-ins, so
+the numbers isolate the app's own overhead; --models real loads the
+configured models. The NLP result cache is off unless --cache is given.
+
+--compare exits with status 1 when any p95 grew by more than --tolerance
+(default 20%) over the baseline report.
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+PIPELINE_CORPUS = [
+    "Remind me tomorrow at 5 pm to study math.",
+    "Show me my tasks for today",
+    "Delete task 3",
+    "Mark task 2 as done",
+    "Add a task to call mom on Sunday at noon",
+    "How are you today?",
+    "Note to self: renew the passport by Friday",
+    "What's on my agenda this week?",
+]
+
+# (method, path, json body) per endpoint; NLP texts rotate through the corpus
+ENDPOINTS = {
+    "GET /tasks/": ("GET", "/tasks/?limit=10", None),
+    "GET /users/1/tasks": ("GET", "/users/1/tasks?limit=50", None),
+    "GET /users/1/agenda": ("GET", "/users/1/agenda?window=week", None),
+    "GET /logs/": ("GET", "/logs/?limit=50", None),
+    "POST /tasks/": ("POST", "/tasks/", {"title": "bench task", "user_id": 1}),
+    "POST /nlp/parse": ("POST", "/nlp/parse", "text"),
+    "POST /nlp/act": ("POST", "/nlp/act", "text"),
+    "POST /nlp/parse/batch": ("POST", "/nlp/parse/batch", "texts"),
+}
+
+TABLE_SIZES = (1_000, 10_000, 100_000)
+
+
+# ---------- Stats ----------
+def summarize(samples, elapsed: float = None) -> dict:
+    """p50/p95/p99/mean in ms from per-operation seconds, plus throughput."""
+    ordered = sorted(samples)
+    n = len(ordered)
+
+    def pct(p):
+        return round(ordered[min(n - 1, int(n * p))] * 1000, 3)
+
+    report = {"n": n, "p50_ms": pct(0.50), "p95_ms": pct(0.95), "p99_ms": pct(0.99),
+              "mean_ms": round(sum(ordered) / n * 1000, 3)}
+    if elapsed:
+        report["ops_per_sec"] = round(n / elapsed, 1)
+    return report
+
+
+def _timed(fn, args_list, rounds: int) -> dict:
+    samples = []
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for args in args_list:
+            t = time.perf_counter()
+            fn(*args)
+            samples.append(time.perf_counter() - t)
+    return summarize(samples, time.perf_counter() - start)
+
+
+# ---------- Mock models ----------
+_MOCK_ENTS = re.compile(
+    r"(?P<TIME>\b\d{1,2}(?::\d{2})? ?[ap]m\b|\bnoon\b)"
+    r"|(?P<DATE>\b(?:today|tomorrow|tonight|this week|(?:mon|tues|wednes|thurs|fri|satur|sun)day)\b)",
+    re.I,
+)
+
+
+class _MockNLP:
+    """Regex stand-in for the spaCy pipeline: DATE/TIME entities and tokens."""
+
+    def __call__(self, text):
+        ents = [SimpleNamespace(label_=m.lastgroup, start_char=m.start(), end_char=m.end(), text=m.group())
+                for m in _MOCK_ENTS.finditer(text)]
+        tokens = [SimpleNamespace(text=m.group(), idx=m.start(), is_digit=m.group().isdigit())
+                  for m in re.finditer(r"\w+|[^\w\s]", text)]
+        return _MockDoc(ents, tokens)
+
+    def pipe(self, texts, batch_size=None):
+        return (self(text) for text in texts)
+
+
+class _MockDoc:
+    def __init__(self, ents, tokens):
+        self.ents = ents
+        self._tokens = tokens
+
+    def __iter__(self):
+        return iter(self._tokens)
+
+
+class _MockClassifier:
+    version = "mock"
+
+    def predict(self, texts, batch_size=None):
+        return ["general_chat" for _ in texts]
+
+
+def install_models(kind: str):
+    from backend.nlp.registry import registry
+    if kind == "mock":
+        registry._spacy = _MockNLP()
+        registry._classifier = _MockClassifier()
+    registry.warm_up(freeze=False)
+    return registry
+
+
+# ---------- NLP pipeline stages ----------
+def bench_pipeline(rounds: int) -> dict:
+    from backend.nlp import nlp_processor
+    from backend.nlp.registry import registry
+    from backend.nlp.utils import clean_title
+    from backend.utils import date_utils
+
+    nlp = registry.spacy()
+    classifier = registry.classifier()
+    parsed = [nlp_processor.parse_input(text) for text in PIPELINE_CORPUS]
+    texts = [(text,) for text in PIPELINE_CORPUS]
+
+    def parse_dates(result):
+        date_utils.clear_memo()
+        date_utils.parse_due_date(result.first_entities())
+
+    stages = {
+        "rules": _timed(nlp_processor.match_intents, texts, rounds),
+        "spacy_ner": _timed(nlp, texts, rounds),
+        "classifier": _timed(lambda text: classifier.predict([text]), texts, rounds) if classifier is not None else None,
+        "date_parsing": _timed(parse_dates, [(r,) for r in parsed], rounds),
+        "date_parsing_memo": _timed(lambda r: date_utils.parse_due_date(r.first_entities()), [(r,) for r in parsed], rounds),
+        "title_cleaning": _timed(lambda t, r: clean_title(t, r.entities, r.spans), list(zip(PIPELINE_CORPUS, parsed)), rounds),
+        "parse_input": _timed(nlp_processor.parse_input, texts, rounds),
+        "parse_batch": _timed(nlp_processor.parse_batch, [(PIPELINE_CORPUS,)], rounds),
+    }
+    return {name: stats for name, stats in stages.items() if stats is not None}
+
+
+# ---------- Endpoints ----------
+async def _drive(client, method, path, body, requests: int, concurrency: int) -> dict:
+    latencies = []
+    counter = iter(range(requests))
+
+    def payload(i):
+        if body == "text":
+            return {"text": PIPELINE_CORPUS[i % len(PIPELINE_CORPUS)], "user_id": 1}
+        if body == "texts":
+            return {"texts": PIPELINE_CORPUS, "user_id": 1}
+        return body
+
+    async def worker():
+        for i in counter:
+            t = time.perf_counter()
+            response = await client.request(method, path, json=payload(i))
+            # Expected NLP outcomes (e.g. deleting a missing task) still count
+            if response.status_code >= 500:
+                response.raise_for_status()
+            latencies.append(time.perf_counter() - t)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - start)
+
+
+async def _bench_endpoints(requests: int, concurrency: int) -> dict:
+    import httpx
+    from backend.api.main import app
+
+    report = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name, (method, path, body) in ENDPOINTS.items():
+            report[name] = await _drive(client, method, path, body, requests, concurrency)
+    return {"concurrency": concurrency, "endpoints": report}
+
+
+def bench_endpoints(requests: int, concurrency: int) -> dict:
+    return asyncio.run(_bench_endpoints(requests, concurrency))
+
+
+# ---------- DB write paths ----------
+def _fill(db, models, bulk, size: int):
+    # Grow both tables to `size` rows with bulk inserts
+    for model, make in (
+        (models.Task, lambda i: {"title": f"task {i}", "description": None, "due_date": None,
+                                 "all_day": False, "status": "pending", "user_id": 1}),
+        (models.Log, lambda i: {"user_id": 1, "event_type": "conversation", "content": f"message {i}",
+                                "timestamp": datetime.utcnow()}),
+    ):
+        have = db.query(model).count()
+        for start in range(have, size, bulk.CHUNK_SIZE):
+            bulk.insert_rows(db, model, [make(i) for i in range(start, min(size, start + bulk.CHUNK_SIZE))])
+            db.commit()
+
+
+def bench_writes(ops: int, sizes) -> dict:
+    from backend.db import bulk, crud, models, session
+
+    report = {}
+    db = session.SessionLocal()
+    try:
+        for size in sizes:
+            _fill(db, models, bulk, size)
+
+            def create(i):
+                with session.unit_of_work(db):
+                    crud.create_task(db, title=f"bench {i}", user_id=1)
+                    crud.create_log(db, user_id=1, event_type="task_created", content=f"bench {i}")
+
+            def bulk_chunk():
+                now = datetime.utcnow()
+                rows = [{"user_id": 1, "event_type": "bench", "content": "bulk", "timestamp": now}] * bulk.CHUNK_SIZE
+                with session.unit_of_work(db):
+                    bulk.insert_rows(db, models.Log, rows)
+
+            chunks = max(1, ops // bulk.CHUNK_SIZE)
+            bulk_stats = _timed(bulk_chunk, [()] * chunks, 1)
+            bulk_stats["rows_per_sec"] = round(bulk_stats["ops_per_sec"] * bulk.CHUNK_SIZE, 1)
+            report[str(size)] = {
+                "create_task_with_log": _timed(create, [(i,) for i in range(ops)], 1),
+                "bulk_insert_logs": bulk_stats,
+            }
+    finally:
+        db.close()
+    return report
+
+
+# ---------- Comparison ----------
+def _p95s(report: dict, prefix: str = ""):
+    for key, value in report.items():
+        if isinstance(value, dict):
+            if "p95_ms" in value:
+                yield prefix + key, value["p95_ms"]
+            else:
+                yield from _p95s(value, f"{prefix}{key}/")
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> list:
+    """Entries whose p95 grew by more than `tolerance` (a fraction) over the baseline."""
+    before = dict(_p95s(baseline))
+    regressions = []
+    for name, p95 in _p95s(report):
+        old = before.get(name)
+        if old and p95 > old * (1 + tolerance):
+            regressions.append({"name": name, "baseline_p95_ms": old, "p95_ms": p95})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--models", choices=("mock", "real"), default="mock")
+    parser.add_argument("--cache", action="store_true", help="keep the NLP result cache on")
+    parser.add_argument("--rounds", type=int, default=50, help="passes over the corpus per pipeline stage")
+    parser.add_argument("--requests", type=int, default=500, help="requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--write-ops", type=int, default=500, help="writes per table size")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(TABLE_SIZES))
+    parser.add_argument("--only", nargs="+", choices=("pipeline", "endpoints", "writes"))
+    parser.add_argument("--out", help="write the JSON report here as well as to stdout")
+    parser.add_argument("--compare", help="baseline JSON report to check for p95 regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    # Settings are read at import time, so they go in before the app loads
+    if "ASTA_DATABASE_URL" not in os.environ:
+        path = os.path.join(tempfile.mkdtemp(prefix="asta-bench-"), "bench.sqlite3")
+        os.environ["ASTA_DATABASE_URL"] = f"sqlite:///{path}"
+    os.environ["ASTA_NLP_WARMUP"] = "lazy"
+    if not args.cache:
+        os.environ["ASTA_NLP_CACHE"] = "off"
+
+    from backend.benchmarks.db_load import seed
+    seed(tasks=100, logs=100)
+    registry = install_models(args.models)
+
+    sections = args.only or ["pipeline", "endpoints", "writes"]
+    report = {
+        "config": {
+            "database": os.environ["ASTA_DATABASE_URL"].split("://", 1)[0],
+            "models": args.models, "cache": args.cache, "nlp": registry.status(),
+            "python": sys.version.split()[0],
+        },
+    }
+    if "pipeline" in sections:
+        report["pipeline"] = bench_pipeline(args.rounds)
+    if "endpoints" in sections:
+        report["endpoints"] = bench_endpoints(args.requests, args.concurrency)
+    if "writes" in sections:
+        report["writes"] = bench_writes(args.write_ops, args.sizes)
+
+    status = 0
+    if args.compare:
+        with open(args.compare) as f:
+            report["regressions"] = compare(report, json.load(f), args.tolerance)
+        status = 1 if report["regressions"] else 0
+
+    output = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output)
+    print(output)
+    sys.exit(status)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Title cleaning benchmark: the old clean_title (lowercase, per-entity
+str.replace, regexes rebuilt per call) against the precompiled
+offset-based TitleCleaner, on short and long messages.
+
+    python -m backend.benchmarks.titles
+"""
+import json
+import re
+import time
+
+from backend.nlp.utils import clean_title
+
+
+def legacy_clean_title(text, entities):
+    title = text.lower()
+    title = re.sub(r"\b(remind me|please remind|note to self)\b", "", title)
+    for v in entities.values():
+        if v:
+            title = title.replace(v.lower(), "")
+    title = re.sub(r"\b(on|at|by|to)\b", "", title)
+    return title.strip().capitalize() or "Untitled Task"
+
+
+def _case(text, ents):
+    spans = []
+    for label, value in ents:
+        start = text.index(value)
+        spans.append([label, start, start + len(value), value])
+    return text, {label: value for label, value in ents}, spans
+
+
+CASES = [
+    _case("Remind me tomorrow at 5 pm to study math.", [("DATE", "tomorrow"), ("TIME", "5 pm")]),
+    _case("Remind me to talk to Sam about the address on Monday", [("PERSON", "Sam"), ("DATE", "Monday")]),
+    _case("Schedule the quarterly planning review with the whole product and design team, bring the "
+          "roadmap drafts, the hiring plan, the budget spreadsheet and the customer interview notes "
+          "so we can go through every open item on Friday at 10am",
+          [("DATE", "Friday"), ("TIME", "10am"), ("DATE", "quarterly")]),
+]
+
+
+def _per_call_us(fn, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for args in CASES:
+            fn(*args)
+    return (time.perf_counter() - start) / (rounds * len(CASES)) * 1e6
+
+
+def run(rounds: int = 5000) -> dict:
+    return {
+        "legacy_us_per_call": round(_per_call_us(lambda t, e, s: legacy_clean_title(t, e), rounds), 2),
+        "cleaner_us_per_call": round(_per_call_us(lambda t, e, s: clean_title(t, e, s), rounds), 2),
+        "titles": [
+            {"legacy": legacy_clean_title(t, e), "cleaner": clean_title(t, e, s)} for t, e, s in CASES
+        ],
+    }
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
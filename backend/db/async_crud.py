@@ -0,0 +1,54 @@
+"""
+AsyncSession variants of the read paths in crud.py, used by
+backend.api.async_routes when ASTA_DB_ASYNC=1. Signatures mirror crud.py and
+the statements are crud's own builders, so only the execution differs.
+
+Writes have no async variant: under ASTA_DB_ASYNC=1 creates, updates and
+deletes (and the NLP actions) still go through crud on the sync engine.
+"""
+from sqlalchemy.ext.asyncio import AsyncSession
+from . import changes, crud, models, read_cache
+
+# ---------- Users ----------
+async def get_user(db: AsyncSession, user_id: int):
+    return await db.get(models.User, user_id)
+
+async def get_user_by_username(db: AsyncSession, username: str):
+    return (await db.execute(crud.user_by_username_statement(username))).scalars().first()
+
+# ---------- Cached reads ----------
+async def get_user_ref(db: AsyncSession, user_id: int):
+    ref = read_cache.users.get(user_id)
+    if ref is None:
+        ref = (await db.execute(crud.user_ref_statement(user_id))).first()
+        if ref is not None:
+            read_cache.users.set(user_id, ref)
+    return ref
+
+async def list_version(db: AsyncSession, user_id: int = None):
+    version = read_cache.get_version(user_id)
+    if version is None:
+        generation = read_cache.generation()
+        version = changes.head_version((await db.execute(changes.head_statement(user_id))).first())
+        read_cache.set_version(user_id, version, generation)
+    return version
+
+# ---------- Tasks ----------
+async def get_task(db: AsyncSession, task_id: int, user_id: int = None):
+    return crud._owned(await db.get(models.Task, task_id), user_id)
+
+async def get_tasks(db: AsyncSession, skip: int = 0, limit: int = 10, after: int = None):
+    return (await db.execute(crud.tasks_statement(skip, limit, after))).all()
+
+async def get_tasks_for_user(db: AsyncSession, user_id: int, skip: int = 0, limit: int = 100, after: int = None):
+    return (await db.execute(crud.user_tasks_statement(user_id, skip, limit, after))).all()
+
+async def get_agenda(db: AsyncSession, user_id: int, start, end, limit: int = 100):
+    return (await db.execute(crud.agenda_statement(user_id, start, end, limit))).all()
+
+# ---------- Logs ----------
+async def get_logs(db: AsyncSession, skip: int = 0, limit: int = 100, after: int = None):
+    return (await db.execute(crud.logs_statement(skip, limit, after))).all()
+
+async def get_logs_for_user(db: AsyncSession, user_id: int, skip: int = 0, limit: int = 100, after: int = None):
+    return (await db.execute(crud.user_logs_statement(user_id, skip, limit, after))).all()
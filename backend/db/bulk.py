@@ -0,0 +1,103 @@
+"""
+Bulk load and dump of tasks and logs, used by backend.api.bulk_routes.
+
+insert_rows writes a chunk of plain dicts in the caller's transaction: with
+COPY on PostgreSQL (psycopg2), otherwise as one executemany INSERT.
+export_chunks streams a table through a server-side cursor (yield_per), so
+memory stays flat however many rows there are.
+"""
+import csv
+import io
+import json
+import os
+from datetime import datetime
+
+from sqlalchemy import insert, select
+from . import models
+
+# Rows per INSERT/COPY on import and per fetched batch on export
+CHUNK_SIZE = int(os.getenv("ASTA_BULK_CHUNK_SIZE", "1000"))
+# Set to 0 to always use executemany INSERTs, even on PostgreSQL
+USE_COPY = os.getenv("ASTA_BULK_COPY", "1") == "1"
+
+IMPORT_COLUMNS = {
+    models.Task: ("title", "description", "due_date", "all_day", "status", "user_id"),
+    models.Log: ("user_id", "event_type", "content", "timestamp"),
+}
+EXPORT_COLUMNS = {
+    models.Task: ("id",) + IMPORT_COLUMNS[models.Task],
+    models.Log: ("id",) + IMPORT_COLUMNS[models.Log],
+}
+
+
+# ---------- Import ----------
+def _can_copy(db) -> bool:
+    dialect = db.get_bind().dialect
+    return USE_COPY and dialect.name == "postgresql" and dialect.driver == "psycopg2"
+
+# COPY text format: tab-separated, backslash escapes, \N for NULL
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+def _copy_field(value) -> str:
+    return "\\N" if value is None else str(value).translate(_COPY_ESCAPES)
+
+def _copy(db, model, rows):
+    columns = IMPORT_COLUMNS[model]
+    buf = io.StringIO()
+    for row in rows:
+        buf.write("\t".join(_copy_field(row.get(c)) for c in columns) + "\n")
+    buf.seek(0)
+    # The session's own DBAPI connection, so COPY joins its transaction
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {model.__tablename__} ({', '.join(columns)}) FROM STDIN", buf)
+    finally:
+        cursor.close()
+
+def insert_rows(db, model, rows) -> int:
+    """Insert dicts keyed by IMPORT_COLUMNS[model]; the caller commits."""
+    if not rows:
+        return 0
+    if _can_copy(db):
+        _copy(db, model, rows)
+    else:
+        db.execute(insert(model), rows)
+    return len(rows)
+
+
+# ---------- Export ----------
+def _json_default(value):
+    return value.isoformat()
+
+def _ndjson(columns, rows) -> str:
+    return "".join(json.dumps(dict(zip(columns, row)), default=_json_default) + "\n" for row in rows)
+
+def _csv_field(value):
+    # Datetimes as in NDJSON (isoformat), not str()'s space-separated form
+    return value.isoformat() if isinstance(value, datetime) else value
+
+def _csv(columns, rows) -> str:
+    buf = io.StringIO()
+    csv.writer(buf).writerows([_csv_field(v) for v in row] for row in rows)
+    return buf.getvalue()
+
+def export_chunks(session_factory, model, user_id: int = None, fmt: str = "ndjson"):
+    """
+    Yield `model`'s rows (oldest first, optionally one user's) as NDJSON or
+    CSV text, CHUNK_SIZE rows at a time. Opens its own session because it
+    outlives the request handler.
+    """
+    columns = EXPORT_COLUMNS[model]
+    encode = _csv if fmt == "csv" else _ndjson
+    db = session_factory()
+    try:
+        stmt = select(*(getattr(model, c) for c in columns)).order_by(model.id)
+        if user_id is not None:
+            stmt = stmt.where(model.user_id == user_id)
+        if fmt == "csv":
+            yield ",".join(columns) + "\r\n"
+        result = db.execute(stmt.execution_options(yield_per=CHUNK_SIZE))
+        for rows in result.partitions():
+            yield encode(columns, rows)
+    finally:
+        db.close()
@@ -0,0 +1,232 @@
+"""
+Per-user change feed.
+
+crud mutators call record() so every task/log change adds a row to the
+`changes` table in the same transaction. A row's id is its sequence number:
+clients remember the last one they applied and ask for everything after it.
+Task changes carry the task as the API returns it; log changes only
+reference the log by entity_id and since() fills in its current fields, so
+log contents aren't copied into the feed.
+
+record() only queues the row. When the session commits, all queued rows
+are inserted with one statement, which on PostgreSQL first takes a
+transaction-level advisory lock on each of their users. One user's writers
+therefore commit one at a time and their sequence numbers become visible in
+order; a reader that has seen sequence N can never later be handed a
+smaller one. (SQLite serializes all writers anyway.) Creating a task and
+its log is then three statements and the commit.
+
+After a commit, subscribers (see subscribe()) are told which users changed,
+e.g. to wake up SSE streams in this process. Other processes notice by
+polling the table.
+
+Rows older than ASTA_CHANGES_RETENTION_HOURS are pruned by
+db.log_retention (prune()); a reader whose cursor falls before what is left
+gets "reset" changes instead, i.e. reloads its lists.
+"""
+import logging
+import os
+from datetime import datetime
+
+from sqlalchemy import cast, column, delete, event, func, insert, select, true, values
+from sqlalchemy.orm import Session
+from . import models
+
+logger = logging.getLogger(__name__)
+
+# The feed is for clients catching up, not history: a client away longer
+# than this reloads its lists
+RETENTION_HOURS = int(os.getenv("ASTA_CHANGES_RETENTION_HOURS", "72"))
+
+_PENDING_KEY = "asta_pending_changes"
+_LOCKED_KEY = "asta_locked_users"
+_CHANGED_KEY = "asta_changed_users"
+# First key of the two-int advisory lock; the second is the user id
+_LOCK_NAMESPACE = 0x41535441  # "ASTA"
+
+# Rows deleted per transaction by prune()
+PRUNE_BATCH = 10000
+
+_subscribers = []
+
+
+def task_data(task) -> dict:
+    """A task as schemas.Task serializes it."""
+    return {
+        "id": task.id, "title": task.title, "description": task.description,
+        "due_date": task.due_date.isoformat() if task.due_date else None,
+        "all_day": bool(task.all_day), "status": task.status, "user_id": task.user_id,
+    }
+
+def log_data(log) -> dict:
+    """A log as schemas.Log serializes it."""
+    return {
+        "id": log.id, "user_id": log.user_id, "event_type": log.event_type, "content": log.content,
+        "timestamp": log.timestamp.isoformat() if log.timestamp else None,
+    }
+
+
+def record(db, user_id, entity: str, op: str, entity_id: int = None, data: dict = None):
+    """Queue a change row for `user_id`, written when db commits; no-op for ownerless rows."""
+    if user_id is None:
+        return
+    db.info.setdefault(_PENDING_KEY, []).append(
+        {"user_id": user_id, "entity": entity, "entity_id": entity_id, "op": op, "data": data}
+    )
+
+_COLUMNS = ("user_id", "entity", "entity_id", "op", "data", "created_at")
+
+def _locked_insert(rows, user_ids):
+    """
+    INSERT ... SELECT of rows that takes the users' advisory locks (in user
+    order) before the rows, and so their sequence numbers, exist.
+    """
+    table = models.Change.__table__
+    locks = select(*(func.pg_advisory_xact_lock(_LOCK_NAMESPACE, user_id) for user_id in user_ids)).cte("locks")
+    new = values(
+        *(column(name, table.c[name].type) for name in _COLUMNS), column("n", table.c.id.type), name="new_changes"
+    ).data([tuple(row[name] for name in _COLUMNS) + (n,) for n, row in enumerate(rows)])
+    source = (
+        # Typed, so a column that is NULL in every row isn't taken for text
+        select(*(cast(new.c[name], table.c[name].type) for name in _COLUMNS))
+        .select_from(new.join(locks, true()))
+        .order_by(new.c.n)
+    )
+    return insert(table).from_select(_COLUMNS, source)
+
+
+# ---------- Reading ----------
+def latest(db, user_id: int) -> int:
+    """The user's newest sequence number, or 0."""
+    return db.execute(
+        select(func.max(models.Change.id)).where(models.Change.user_id == user_id)
+    ).scalar() or 0
+
+def head_statement(user_id: int = None):
+    stmt = select(models.Change.id, models.Change.created_at).order_by(models.Change.id.desc()).limit(1)
+    if user_id is not None:
+        stmt = stmt.where(models.Change.user_id == user_id)
+    return stmt
+
+def head_version(row):
+    return (row.id, row.created_at) if row else (0, None)
+
+def head(db, user_id: int = None):
+    """(sequence, created_at) of the newest change, the user's or anyone's; (0, None) if none."""
+    return head_version(db.execute(head_statement(user_id)).first())
+
+def oldest(db) -> int:
+    """The lowest sequence number still in the table, or 0."""
+    return db.execute(select(func.min(models.Change.id))).scalar() or 0
+
+def _with_log_data(db, rows):
+    # Log upserts reference their log; fill in its fields on detached rows
+    ids = [row.entity_id for row in rows if row.entity == "log" and row.op == "upsert"]
+    if not ids:
+        return rows
+    logs = {log.id: log for log in db.execute(select(models.Log).where(models.Log.id.in_(ids))).scalars()}
+    for row in rows:
+        if row.entity == "log" and row.op == "upsert":
+            db.expunge(row)
+            log = logs.get(row.entity_id)
+            # None once the log has been archived
+            row.data = log_data(log) if log is not None else None
+    return rows
+
+def since(db, user_id: int, after: int, limit: int = 500):
+    """
+    The user's changes with a sequence number above `after`, oldest first;
+    a "reset" per entity if some of them may have been pruned.
+    """
+    if after + 1 < oldest(db):
+        seq = latest(db, user_id)
+        if seq > after:
+            now = datetime.utcnow()
+            return [
+                models.Change(id=seq, user_id=user_id, entity=entity, op="reset", created_at=now)
+                for entity in ("task", "log")
+            ]
+    return _with_log_data(db, db.execute(
+        select(models.Change)
+        .where(models.Change.user_id == user_id, models.Change.id > after)
+        .order_by(models.Change.id)
+        .limit(limit)
+    ).scalars().all())
+
+def tail(db, entity: str, after: int, limit: int = 1000):
+    """Everyone's changes to `entity` after `after`, oldest first (a primary-key range scan)."""
+    return db.execute(
+        select(models.Change)
+        .where(models.Change.id > after, models.Change.entity == entity)
+        .order_by(models.Change.id)
+        .limit(limit)
+    ).scalars().all()
+
+
+# ---------- Retention ----------
+def prune(engine, before: datetime) -> int:
+    """
+    Delete the changes created before `before`, PRUNE_BATCH rows per
+    transaction. The newest row is always kept, so oldest() still tells
+    readers where the retained feed starts.
+    """
+    Change = models.Change
+    with engine.connect() as conn:
+        first, newest = conn.execute(select(func.min(Change.id), func.max(Change.id))).one()
+        upto = conn.execute(select(func.max(Change.id)).where(Change.created_at < before)).scalar()
+    if upto is None:
+        return 0
+    upto = min(upto, newest - 1)
+    pruned = 0
+    start = first - 1
+    while start < upto:
+        end = min(start + PRUNE_BATCH, upto)
+        with engine.begin() as conn:
+            pruned += conn.execute(delete(Change).where(Change.id > start, Change.id <= end)).rowcount
+        start = end
+    return pruned
+
+
+# ---------- Session integration ----------
+# Listeners on Session itself, so every session (request, log writer,
+# retention job) writes its queued rows and takes its locks the same way
+def subscribe(callback):
+    """Call callback(user_ids) after each commit that recorded changes."""
+    _subscribers.append(callback)
+
+@event.listens_for(Session, "before_commit")
+def _before_commit(db):
+    pending = db.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    now = datetime.utcnow()
+    rows = [dict(change, created_at=now) for change in pending]
+    users = sorted({row["user_id"] for row in rows})
+    locked = db.info.setdefault(_LOCKED_KEY, set())
+    to_lock = [user_id for user_id in users if user_id not in locked]
+    if to_lock and db.get_bind().dialect.name == "postgresql":
+        # Once per user and transaction, in the same statement as the rows
+        db.execute(_locked_insert(rows, to_lock))
+    else:
+        db.execute(insert(models.Change.__table__), rows)
+    locked.update(to_lock)
+    db.info.setdefault(_CHANGED_KEY, set()).update(users)
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(db):
+    db.info.pop(_LOCKED_KEY, None)
+    users = db.info.pop(_CHANGED_KEY, None)
+    if not users:
+        return
+    for callback in _subscribers:
+        try:
+            callback(users)
+        except Exception:
+            logger.exception("Change subscriber failed")
+
+@event.listens_for(Session, "after_soft_rollback")
+def _after_rollback(db, transaction):
+    if transaction.parent is not None:
+        return
+    for key in (_PENDING_KEY, _LOCKED_KEY, _CHANGED_KEY):
+        db.info.pop(key, None)
@@ -1,58 +1,242 @@
-from sqlalchemy.orm import Session
-from . import models
+from datetime import datetime, time, timedelta
+from sqlalchemy import Date, func, select
+from sqlalchemy.orm import Session, selectinload
+from backend.utils.metrics import timed
+from . import changes, log_writer, models, read_cache, search
+
+# Mutators only add/flush: the caller's unit of work (session.unit_of_work)
+# commits once per request. Flushing sends the INSERT ... RETURNING that fills
+# in the primary key, so no refresh is needed afterwards. Task and log
+# mutators also record a row in the owner's change feed (db.changes).
+
+# ---------- Pagination ----------
+# Listings are keyset-paginated: `after` is the id of the last row of the
+# previous page. Tasks are listed oldest first, logs newest first. `skip`
+# (OFFSET) is only kept for old clients.
+#
+# List reads select only the columns of schemas.Task / schemas.Log and return
+# plain rows (attribute access like the ORM objects, no identity map).
+TASK_COLUMNS = (
+    models.Task.id, models.Task.title, models.Task.description, models.Task.due_date,
+    models.Task.all_day, models.Task.status, models.Task.user_id,
+)
+LOG_COLUMNS = (models.Log.id, models.Log.user_id, models.Log.event_type, models.Log.content, models.Log.timestamp)
+
+def _page(stmt, column, after=None, skip: int = 0, limit: int = 100, descending: bool = False):
+    if after is not None:
+        stmt = stmt.where(column < after if descending else column > after)
+    elif skip:
+        stmt = stmt.offset(skip)
+    return stmt.order_by(column.desc() if descending else column).limit(limit)
+
+# ---------- Read statements ----------
+# Built here once and executed by both the sync functions below and their
+# AsyncSession twins in db.async_crud, so the two can't drift apart.
+USER_REF_COLUMNS = (models.User.id, models.User.username)
+
+def user_by_username_statement(username: str):
+    return select(models.User).where(models.User.username == username)
+
+def user_ref_statement(user_id: int):
+    return select(*USER_REF_COLUMNS).where(models.User.id == user_id)
+
+def tasks_statement(skip: int = 0, limit: int = 10, after: int = None):
+    return _page(select(*TASK_COLUMNS), models.Task.id, after, skip, limit)
+
+def user_tasks_statement(user_id: int, skip: int = 0, limit: int = 100, after: int = None):
+    stmt = select(*TASK_COLUMNS).where(models.Task.user_id == user_id)
+    return _page(stmt, models.Task.id, after, skip, limit)
+
+def agenda_statement(user_id: int, start, end, limit: int = 100):
+    return (
+        select(*TASK_COLUMNS)
+        .where(
+            models.Task.user_id == user_id,
+            models.Task.status == "pending",
+            models.Task.due_date >= start,
+            models.Task.due_date < end,
+        )
+        .order_by(models.Task.due_date, models.Task.id)
+        .limit(limit)
+    )
+
+def logs_statement(skip: int = 0, limit: int = 100, after: int = None):
+    return _page(select(*LOG_COLUMNS), models.Log.id, after, skip, limit, descending=True)
+
+def user_logs_statement(user_id: int, skip: int = 0, limit: int = 100, after: int = None):
+    stmt = select(*LOG_COLUMNS).where(models.Log.user_id == user_id)
+    return _page(stmt, models.Log.id, after, skip, limit, descending=True)
 
 # ---------- Users ----------
+@timed("crud.get_user")
 def get_user(db: Session, user_id: int):
-    return db.query(models.User).filter(models.User.id == user_id).first()
+    return db.get(models.User, user_id)
 
+@timed("crud.get_user_by_username")
 def get_user_by_username(db: Session, username: str):
-    return db.query(models.User).filter(models.User.username == username).first()
+    return db.execute(user_by_username_statement(username)).scalars().first()
 
+@timed("crud.get_users")
 def get_users(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.User).offset(skip).limit(limit).all()
+    # Tasks of the whole page in one extra query instead of one per user
+    return (
+        db.query(models.User).options(selectinload(models.User.tasks))
+        .order_by(models.User.id).offset(skip).limit(limit).all()
+    )
 
+@timed("crud.create_user")
 def create_user(db: Session, username: str):
-    user = models.User(username=username)
+    user = models.User(username=username, tasks=[])
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    db.flush()
     return user
 
+# ---------- Cached reads ----------
+# Read-through over db.read_cache (see there for invalidation). The cached
+# values are plain rows and tuples, never ORM objects: those belong to the
+# session that loaded them.
+
+@timed("crud.get_user_ref")
+def get_user_ref(db: Session, user_id: int):
+    """A user's (id, username) row, or None; for checks that don't need the User."""
+    ref = read_cache.users.get(user_id)
+    if ref is None:
+        ref = db.execute(user_ref_statement(user_id)).first()
+        if ref is not None:
+            read_cache.users.set(user_id, ref)
+    return ref
+
+@timed("crud.list_version")
+def list_version(db: Session, user_id: int = None):
+    """
+    (sequence, modified) of the user's newest change, or everyone's for
+    None. Every task/log write moves it, so it versions the list endpoints.
+    """
+    version = read_cache.get_version(user_id)
+    if version is None:
+        generation = read_cache.generation()
+        version = changes.head(db, user_id)
+        read_cache.set_version(user_id, version, generation)
+    return version
+
 # ---------- Tasks ----------
-def create_task(db: Session, title: str, description: str = None, due_date=None, user_id: int = None):
+@timed("crud.create_task")
+def create_task(db: Session, title: str, description: str = None, due_date=None, all_day: bool = False, user_id: int = None):
     # Create the task with optional user_id
-    task = models.Task(title=title, description=description, due_date=due_date, user_id=user_id)
+    task = models.Task(
+        title=title, description=description, due_date=due_date, all_day=all_day,
+        status="pending", user_id=user_id,
+    )
     db.add(task)
-    db.commit()
-    db.refresh(task)
+    db.flush()
+    changes.record(db, user_id, "task", "upsert", task.id, changes.task_data(task))
     return task
 
-def get_task(db: Session, task_id: int):
-    return db.query(models.Task).filter(models.Task.id == task_id).first()
+def _owned(task, user_id):
+    # Like the per-user listings: with a user_id, another user's task is not found
+    if task is not None and user_id is not None and task.user_id != user_id:
+        return None
+    return task
+
+@timed("crud.get_task")
+def get_task(db: Session, task_id: int, user_id: int = None):
+    return _owned(db.get(models.Task, task_id), user_id)
+
+@timed("crud.get_tasks")
+def get_tasks(db: Session, skip: int = 0, limit: int = 10, after: int = None):
+    return db.execute(tasks_statement(skip, limit, after)).all()
 
-def get_tasks(db: Session, skip: int = 0, limit: int = 10):
-    return db.query(models.Task).offset(skip).limit(limit).all()
+@timed("crud.get_tasks_for_user")
+def get_tasks_for_user(db: Session, user_id: int, skip: int = 0, limit: int = 100, after: int = None):
+    return db.execute(user_tasks_statement(user_id, skip, limit, after)).all()
 
-def get_tasks_for_user(db: Session, user_id: int, skip: int = 0, limit: int = 100):
-    return db.query(models.Task).filter(models.Task.user_id == user_id).offset(skip).limit(limit).all()
+@timed("crud.get_agenda")
+def get_agenda(db: Session, user_id: int, start, end, limit: int = 100):
+    """Pending tasks of a user due in [start, end); a range scan on ix_tasks_user_status_due."""
+    return db.execute(agenda_statement(user_id, start, end, limit)).all()
 
-def delete_task(db: Session, task_id: int):
-    task = db.query(models.Task).filter(models.Task.id == task_id).first()
+@timed("crud.complete_task")
+def complete_task(db: Session, task: models.Task):
+    task.status = "completed"
+    db.flush()
+    changes.record(db, task.user_id, "task", "upsert", task.id, changes.task_data(task))
+    return task
+
+@timed("crud.delete_task")
+def delete_task(db: Session, task_id: int, user_id: int = None):
+    task = _owned(db.get(models.Task, task_id), user_id)
     if task:
         db.delete(task)
-        db.commit()
+        db.flush()
+        changes.record(db, task.user_id, "task", "delete", task_id)
     return task
 
 # ---------- Logs ----------
+@timed("crud.create_log")
 def create_log(db: Session, user_id: int, event_type: str, content: str):
-    log = models.Log(user_id=user_id, event_type=event_type, content=content)
+    log = models.Log(user_id=user_id, event_type=event_type, content=content, timestamp=datetime.utcnow())
+    writer = log_writer.writer
+    if writer is not None and writer.has_room():
+        # Bulk-inserted by the background writer once db commits, together with
+        # its change-feed row. The returned object carries the final field
+        # values but no id yet.
+        log_writer.defer(db, {
+            "user_id": user_id, "event_type": event_type,
+            "content": content, "timestamp": log.timestamp,
+        })
+        return log
     db.add(log)
-    db.commit()
-    db.refresh(log)
+    db.flush()
+    changes.record(db, user_id, "log", "upsert", log.id)
     return log
 
-def get_logs(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Log).offset(skip).limit(limit).all()
+@timed("crud.get_logs")
+def get_logs(db: Session, skip: int = 0, limit: int = 100, after: int = None):
+    return db.execute(logs_statement(skip, limit, after)).all()
+
+@timed("crud.get_logs_for_user")
+def get_logs_for_user(db: Session, user_id: int, skip: int = 0, limit: int = 100, after: int = None):
+    return db.execute(user_logs_statement(user_id, skip, limit, after)).all()
+
+@timed("crud.get_log_stats")
+def get_log_stats(db: Session, user_id: int, start, today):
+    """
+    A user's log counts per UTC day and event type from `start` through
+    `today`: log_rollups for the days db.log_retention has rolled up, a
+    live count over the (few) newer days.
+    """
+    Rollup = models.LogRollup
+    rolled_until = db.execute(select(func.max(Rollup.day))).scalar()
+    live_from = start if rolled_until is None else max(start, rolled_until + timedelta(days=1))
+    rolled = db.execute(
+        select(Rollup.day, Rollup.event_type, Rollup.count)
+        .where(Rollup.user_id == user_id, Rollup.day >= start, Rollup.day < live_from)
+    ).all()
+    day = func.date(models.Log.timestamp, type_=Date).label("day")
+    live = db.execute(
+        select(day, models.Log.event_type, func.count().label("count"))
+        .where(models.Log.user_id == user_id, models.Log.timestamp >= datetime.combine(live_from, time.min))
+        .group_by(day, models.Log.event_type)
+    ).all() if live_from <= today else []
+    return sorted(rolled + live, key=lambda row: (row.day, row.event_type))
+
+# ---------- Search ----------
+@timed("crud.search_tasks")
+def search_tasks(db: Session, user_id: int, q: str, status: str = None, limit: int = 20):
+    """A user's tasks whose title matches q, best match first (see db.search)."""
+    if not q.strip():
+        return []
+    condition, order_by = search.task_match(db.get_bind().dialect.name, q)
+    stmt = select(*TASK_COLUMNS).where(models.Task.user_id == user_id, condition)
+    if status is not None:
+        stmt = stmt.where(models.Task.status == status)
+    return db.execute(stmt.order_by(*order_by).limit(limit)).all()
 
-def get_logs_for_user(db: Session, user_id: int, skip: int = 0, limit: int = 100):
-    return db.query(models.Log).filter(models.Log.user_id == user_id).offset(skip).limit(limit).all()
+@timed("crud.search_logs")
+def search_logs(db: Session, user_id: int, q: str, limit: int = 50):
+    """A user's logs whose content matches q, newest first."""
+    if not q.strip():
+        return []
+    condition, order_by = search.log_match(db.get_bind().dialect.name, q)
+    stmt = select(*LOG_COLUMNS).where(models.Log.user_id == user_id, condition)
+    return db.execute(stmt.order_by(*order_by).limit(limit)).all()
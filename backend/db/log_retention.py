@@ -0,0 +1,327 @@
+"""
+Log storage maintenance: monthly partitions, daily rollups, retention.
+
+    python -m backend.db.log_retention partition   # once, PostgreSQL only
+    python -m backend.db.log_retention run         # daily, e.g. from cron
+
+`partition` turns a plain `logs` table into one range-partitioned by month
+on `timestamp` (partitions logs_yYYYYmMM plus logs_default for anything
+outside them). The primary key becomes (id, timestamp), as PostgreSQL
+requires; the models.py indexes are re-created on the parent and so exist
+per partition. Each insert and each time-bounded read then only touches
+one month's table and indexes, however much history there is.
+
+`run`:
+1. creates the partitions for this month and the next
+   ASTA_LOG_PARTITIONS_AHEAD months;
+2. recomputes log_rollups (counts per UTC day, user and event type) from
+   the last rolled-up day, going back ASTA_LOG_ROLLUP_LOOKBACK_DAYS for
+   rows that arrived late, through yesterday;
+3. archives the months older than ASTA_LOG_RETENTION_MONTHS to
+   ASTA_LOG_ARCHIVE_DIR and removes them: such a partition is detached,
+   written out and dropped, so no DELETE runs over the live table. Rows
+   outside any month partition (in logs_default), and all rows without
+   partitions (SQLite, or before `partition`), are written out and deleted
+   by timestamp range. Every run that archives rows of a month adds a
+   segment: logs_YYYY_MM.ndjson.gz, then logs_YYYY_MM.1.ndjson.gz and so
+   on. Existing segments are never replaced or removed, so rows that
+   arrive late with an old timestamp (e.g. through /logs/bulk) are
+   archived next to the earlier ones.
+   Affected users get a "reset" log change so feed clients reload;
+4. prunes the change feed (db.changes) to its own, much shorter retention
+   (ASTA_CHANGES_RETENTION_HOURS). Log changes only reference their log, so
+   archived contents don't live on in the feed either way.
+
+The steps are idempotent: a run that stops halfway is finished by the next
+one (detached partitions that are still around get archived first). A run
+stopped between writing a segment and removing its rows writes them again
+in the next segment; archive readers should de-duplicate on id.
+"""
+import argparse
+import gzip
+import json
+import logging
+import os
+import re
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import Date, delete, func, insert, select, text
+from sqlalchemy.orm import Session
+from . import bulk, changes, models, session
+
+logger = logging.getLogger(__name__)
+
+RETENTION_MONTHS = int(os.getenv("ASTA_LOG_RETENTION_MONTHS", "12"))
+ARCHIVE_DIR = os.getenv("ASTA_LOG_ARCHIVE_DIR", "log_archive")
+PARTITIONS_AHEAD = int(os.getenv("ASTA_LOG_PARTITIONS_AHEAD", "2"))
+ROLLUP_LOOKBACK_DAYS = int(os.getenv("ASTA_LOG_ROLLUP_LOOKBACK_DAYS", "2"))
+
+ARCHIVE_COLUMNS = bulk.EXPORT_COLUMNS[models.Log]
+# Users per transaction when recording "reset" changes (one advisory lock each,
+# taken together at commit)
+RESET_BATCH = 100
+
+_PARTITION_NAME = re.compile(r"^logs_y(\d{4})m(\d{2})$")
+
+
+# ---------- Months ----------
+def month_start(value) -> datetime:
+    return datetime(value.year, value.month, 1)
+
+def add_months(month: datetime, n: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + n
+    return datetime(index // 12, index % 12 + 1, 1)
+
+def partition_name(month: datetime) -> str:
+    return f"logs_y{month.year:04d}m{month.month:02d}"
+
+def _month_of(name: str):
+    m = _PARTITION_NAME.match(name)
+    return datetime(int(m.group(1)), int(m.group(2)), 1) if m else None
+
+
+# ---------- Partitions (PostgreSQL) ----------
+def is_partitioned(conn) -> bool:
+    if conn.dialect.name != "postgresql":
+        return False
+    return conn.execute(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('logs'))"
+    )).scalar()
+
+def attached_partitions(conn) -> list:
+    return conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid"
+        " WHERE i.inhparent = to_regclass('logs')"
+    )).scalars().all()
+
+def detached_partitions(conn) -> list:
+    """Month tables no longer attached to logs: detached, not yet archived."""
+    attached = set(attached_partitions(conn))
+    names = conn.execute(text(
+        "SELECT tablename FROM pg_tables WHERE schemaname = current_schema()"
+    )).scalars().all()
+    return sorted(n for n in names if _PARTITION_NAME.match(n) and n not in attached)
+
+def create_partition(conn, month: datetime):
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF logs"
+        f" FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{add_months(month, 1):%Y-%m-%d}')"
+    ))
+
+def ensure_partitions(conn, now: datetime):
+    month = month_start(now)
+    for n in range(PARTITIONS_AHEAD + 1):
+        create_partition(conn, add_months(month, n))
+
+
+def partition_table(engine, now: datetime = None) -> bool:
+    """
+    Convert a plain logs table into a monthly-partitioned one, rows
+    included, in one transaction (the table is locked meanwhile).
+    False if it already is partitioned.
+    """
+    now = now or datetime.utcnow()
+    with engine.begin() as conn:
+        if conn.dialect.name != "postgresql":
+            raise RuntimeError("log partitioning needs PostgreSQL")
+        if is_partitioned(conn):
+            return False
+        conn.execute(text("LOCK TABLE logs IN ACCESS EXCLUSIVE MODE"))
+        first = conn.execute(text("SELECT min(timestamp) FROM logs")).scalar() or now
+        sequence = conn.execute(text("SELECT pg_get_serial_sequence('logs', 'id')")).scalar()
+
+        # Free the names the new table and its indexes take
+        conn.execute(text("ALTER TABLE logs RENAME TO logs_unpartitioned"))
+        conn.execute(text("ALTER INDEX IF EXISTS logs_pkey RENAME TO logs_unpartitioned_pkey"))
+        conn.execute(text(
+            "CREATE TABLE logs (LIKE logs_unpartitioned INCLUDING DEFAULTS, PRIMARY KEY (id, timestamp))"
+            " PARTITION BY RANGE (timestamp)"
+        ))
+        conn.execute(text("ALTER TABLE logs ADD FOREIGN KEY (user_id) REFERENCES users (id)"))
+        month = month_start(first)
+        while month <= add_months(month_start(now), PARTITIONS_AHEAD):
+            create_partition(conn, month)
+            month = add_months(month, 1)
+        conn.execute(text("CREATE TABLE logs_default PARTITION OF logs DEFAULT"))
+
+        conn.execute(text(
+            "INSERT INTO logs (id, user_id, event_type, content, timestamp)"
+            " SELECT id, user_id, event_type, content, coalesce(timestamp, now() AT TIME ZONE 'utc')"
+            " FROM logs_unpartitioned"
+        ))
+        if sequence:
+            conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY logs.id"))
+        conn.execute(text("DROP TABLE logs_unpartitioned"))
+        for index in models.Log.__table__.indexes:
+            index.create(conn)
+    return True
+
+
+# ---------- Rollups ----------
+def _rollup_rows(start: datetime, end: datetime):
+    day = func.date(models.Log.timestamp, type_=Date).label("day")
+    return (
+        select(day, models.Log.user_id, models.Log.event_type, func.count().label("count"))
+        .where(models.Log.timestamp >= start, models.Log.timestamp < end)
+        .group_by(day, models.Log.user_id, models.Log.event_type)
+    )
+
+def roll_up(engine, today: date) -> int:
+    """Recompute log_rollups from the last rolled-up day (minus the lookback) through yesterday."""
+    Rollup = models.LogRollup
+    with engine.connect() as conn:
+        last = conn.execute(select(func.max(Rollup.day))).scalar()
+        if last is None:
+            first = conn.execute(select(func.min(models.Log.timestamp))).scalar()
+            if first is None:
+                return 0
+            start = first.date()
+        else:
+            start = min(last + timedelta(days=1), today - timedelta(days=ROLLUP_LOOKBACK_DAYS))
+    days = 0
+    # A month per transaction, so a first run over years of logs isn't one huge statement
+    while start < today:
+        end = min(add_months(month_start(start), 1).date(), today)
+        with engine.begin() as conn:
+            conn.execute(delete(Rollup).where(Rollup.day >= start, Rollup.day < end))
+            conn.execute(insert(Rollup).from_select(
+                ["day", "user_id", "event_type", "count"],
+                _rollup_rows(datetime.combine(start, time.min), datetime.combine(end, time.min)),
+            ))
+        days += (end - start).days
+        start = end
+    return days
+
+
+# ---------- Archive ----------
+def _archive_path(month: datetime, segment: int) -> str:
+    suffix = f".{segment}" if segment else ""
+    return os.path.join(ARCHIVE_DIR, f"logs_{month.year:04d}_{month.month:02d}{suffix}.ndjson.gz")
+
+def _write_archive(conn, stmt, month: datetime):
+    """
+    Stream stmt's rows into a new gzipped NDJSON segment of the month's
+    archive; (row count, user ids, path), path None if there were no rows.
+    The segment takes the first free name, so an existing one is never
+    replaced.
+    """
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    count, users = 0, set()
+    tmp = os.path.join(ARCHIVE_DIR, f".logs_{month:%Y_%m}.{os.getpid()}.tmp")
+    result = conn.execution_options(stream_results=True).execute(stmt)
+    with gzip.open(tmp, "wt", encoding="utf-8") as f:
+        for rows in result.partitions(bulk.CHUNK_SIZE):
+            for row in rows:
+                f.write(json.dumps(dict(zip(ARCHIVE_COLUMNS, row)), default=lambda v: v.isoformat()) + "\n")
+                users.add(row.user_id)
+            count += len(rows)
+    if not count:
+        os.remove(tmp)
+        return 0, users, None
+    segment = 0
+    while True:
+        path = _archive_path(month, segment)
+        try:
+            os.link(tmp, path)  # fails instead of overwriting
+            break
+        except FileExistsError:
+            segment += 1
+    os.remove(tmp)
+    return count, users, path
+
+def _record_resets(engine, users):
+    users = sorted(u for u in users if u is not None)
+    for i in range(0, len(users), RESET_BATCH):
+        with Session(engine) as db:
+            for user_id in users[i:i + RESET_BATCH]:
+                changes.record(db, user_id, "log", "reset")
+            db.commit()
+
+def _snapshot(engine):
+    if engine.dialect.name == "postgresql":
+        engine = engine.execution_options(isolation_level="REPEATABLE READ")
+    return engine.begin()
+
+def archive_partitions(engine, cutoff: datetime) -> list:
+    """Detach, archive and drop the partitions of months before cutoff."""
+    with engine.begin() as conn:
+        for name in attached_partitions(conn):
+            month = _month_of(name)
+            if month is not None and add_months(month, 1) <= cutoff:
+                conn.execute(text(f"ALTER TABLE logs DETACH PARTITION {name}"))
+    archived = []
+    with engine.connect() as conn:
+        names = detached_partitions(conn)
+    for name in names:
+        month = _month_of(name)
+        with engine.connect() as conn:
+            columns = ", ".join(ARCHIVE_COLUMNS)
+            count, users, path = _write_archive(conn, text(f"SELECT {columns} FROM {name} ORDER BY id"), month)
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP TABLE {name}"))
+        _record_resets(engine, users)
+        if count:
+            logger.info("Archived %d log rows of %s to %s", count, name, path)
+            archived.append({"month": f"{month:%Y-%m}", "rows": count, "path": path})
+    return archived
+
+def archive_rows(engine, cutoff: datetime) -> list:
+    """
+    Archive and delete the rows before cutoff, a month at a time by
+    timestamp range: the whole retention for an unpartitioned table, the
+    rows that landed in logs_default for a partitioned one.
+    """
+    Log = models.Log
+    with engine.connect() as conn:
+        first = conn.execute(select(func.min(Log.timestamp))).scalar()
+    archived = []
+    month = month_start(first) if first is not None else cutoff
+    while month < cutoff:
+        end = add_months(month, 1)
+        in_month = (Log.timestamp >= month, Log.timestamp < end)
+        # One snapshot for the export and the DELETE, so rows committed in
+        # between are left for the next run instead of deleted unarchived
+        with _snapshot(engine) as conn:
+            stmt = select(*(getattr(Log, c) for c in ARCHIVE_COLUMNS)).where(*in_month).order_by(Log.id)
+            count, users, path = _write_archive(conn, stmt, month)
+            if count:
+                conn.execute(delete(Log).where(*in_month))
+        _record_resets(engine, users)
+        if count:
+            logger.info("Archived %d log rows of %s to %s", count, f"{month:%Y-%m}", path)
+            archived.append({"month": f"{month:%Y-%m}", "rows": count, "path": path})
+        month = end
+    return archived
+
+
+def run(engine, now: datetime = None) -> dict:
+    """Partitions ahead, rollups, then retention; returns what was done."""
+    now = now or datetime.utcnow()
+    with engine.begin() as conn:
+        partitioned = is_partitioned(conn)
+        if partitioned:
+            ensure_partitions(conn, now)
+    # Roll up before archiving, so the counts outlive the raw rows
+    days = roll_up(engine, now.date())
+    cutoff = add_months(month_start(now), -RETENTION_MONTHS)
+    archived = archive_partitions(engine, cutoff) if partitioned else []
+    # For a partitioned table, what is left before cutoff is in logs_default
+    archived += archive_rows(engine, cutoff)
+    pruned = changes.prune(engine, now - timedelta(hours=changes.RETENTION_HOURS))
+    return {"partitioned": partitioned, "rolled_up_days": days, "archived": archived, "pruned_changes": pruned}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=("partition", "run"))
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    if args.command == "partition":
+        print("Partitioned logs." if partition_table(session.engine) else "logs is already partitioned.")
+    else:
+        print(json.dumps(run(session.engine), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Opt-in background writer for the audit log (ASTA_ASYNC_LOGS=1).
+
+crud.create_log hands rows to the writer instead of inserting them in the
+request's transaction. Rows are only enqueued once that transaction commits
+(and dropped if it rolls back), then a background thread bulk-inserts them
+every ASTA_LOG_BATCH_SIZE rows or ASTA_LOG_FLUSH_MS milliseconds, whichever
+comes first. The change-feed rows for a batch (db.changes) are written in
+the batch's transaction, with the ids the INSERT returned, so the request's
+own transaction carries neither.
+"""
+import logging
+import os
+import queue
+import threading
+import time
+
+from sqlalchemy import event, insert
+from . import changes, models
+
+logger = logging.getLogger(__name__)
+
+# What to do when the queue is full:
+#   "sync"  - insert the row in the caller's transaction, as without the writer
+#   "block" - wait for space in the queue
+#   "drop"  - discard the row and count it
+OVERFLOW_POLICIES = ("sync", "block", "drop")
+
+_PENDING_KEY = "asta_pending_logs"
+_LOG_COLUMNS = (models.Log.id, models.Log.user_id)
+
+
+class LogWriter:
+    def __init__(self, session_factory, max_queue: int = 10000, batch_size: int = 500,
+                 flush_ms: float = 200, overflow: str = "sync"):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {OVERFLOW_POLICIES}")
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_ms / 1000.0
+        self.overflow = overflow
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._thread = None
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+
+    # ---------- Producer side ----------
+    def has_room(self) -> bool:
+        return self.overflow != "sync" or not self._queue.full()
+
+    def enqueue(self, rows):
+        for row in rows:
+            if self.overflow == "block":
+                self._queue.put(row)
+                continue
+            try:
+                self._queue.put_nowait(row)
+            except queue.Full:
+                # "sync" callers check has_room() first, so only a race lands here
+                self.dropped += 1
+
+    # ---------- Writer thread ----------
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="asta-log-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 10):
+        """Stop the thread after writing everything still queued."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join(timeout)
+            self._thread = None
+        self._drain()
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._take_batch()
+            if batch:
+                self._write(batch)
+
+    def _take_batch(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _drain(self):
+        while True:
+            batch = []
+            try:
+                while len(batch) < self.batch_size:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+            if not batch:
+                return
+            self._write(batch)
+
+    def _write(self, rows):
+        db = self.session_factory()
+        try:
+            # executemany; batched into multi-row INSERTs by the driver
+            logs = db.execute(
+                insert(models.Log).returning(*_LOG_COLUMNS, sort_by_parameter_order=True), rows
+            ).all()
+            for log in logs:
+                changes.record(db, log.user_id, "log", "upsert", log.id)
+            db.commit()
+            self.written += len(rows)
+            self.batches += 1
+        except Exception:
+            db.rollback()
+            self.failed += len(rows)
+            logger.exception("Failed to write %d audit log rows", len(rows))
+        finally:
+            db.close()
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self._queue.qsize(),
+            "queue_max": self._queue.maxsize,
+            "overflow": self.overflow,
+            "written": self.written,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+
+# ---------- Session integration ----------
+def defer(db, row: dict):
+    """Queue a log row to be handed to the writer when db commits."""
+    db.info.setdefault(_PENDING_KEY, []).append(row)
+
+def _after_commit(db):
+    rows = db.info.pop(_PENDING_KEY, None)
+    if rows and writer is not None:
+        writer.enqueue(rows)
+
+def _after_rollback(db):
+    db.info.pop(_PENDING_KEY, None)
+
+
+writer = None
+
+def configure(session_factory):
+    """Create the writer from env settings and hook it into session_factory."""
+    global writer
+    if os.getenv("ASTA_ASYNC_LOGS", "0") != "1":
+        return None
+    writer = LogWriter(
+        session_factory,
+        max_queue=int(os.getenv("ASTA_LOG_QUEUE_SIZE", "10000")),
+        batch_size=int(os.getenv("ASTA_LOG_BATCH_SIZE", "500")),
+        flush_ms=float(os.getenv("ASTA_LOG_FLUSH_MS", "200")),
+        overflow=os.getenv("ASTA_LOG_OVERFLOW", "sync"),
+    )
+    event.listen(session_factory, "after_commit", _after_commit)
+    event.listen(session_factory, "after_soft_rollback", lambda db, _tx: _after_rollback(db))
+    return writer
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import DDL, JSON, Boolean, Column, Date, Integer, String, DateTime, ForeignKey, Index, event, func, text
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql import false
 from datetime import datetime
 from .session import Base
 
@@ -20,6 +21,7 @@ class Task(Base):
     title = Column(String, nullable=False)
     description = Column(String, nullable=True)
     due_date = Column(DateTime, nullable=True)
+    all_day = Column(Boolean, nullable=False, default=False, server_default=false())
     status = Column(String, default="pending")
 
     # user_id is a foreign key referencing users.id; nullable=True to avoid breaking existing rows
@@ -39,3 +41,65 @@ class Log(Base):
 
     # Relationship back to user
     user = relationship("User", back_populates="logs")
+
+class Change(Base):
+    """
+    Per-user change feed: one row per task/log mutation, written in the same
+    transaction. `id` is the feed's sequence number (see db.changes).
+    """
+    __tablename__ = "changes"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    entity = Column(String, nullable=False)       # "task" | "log"
+    entity_id = Column(Integer, nullable=True)    # None for resets
+    op = Column(String, nullable=False)           # "upsert" | "delete" | "reset"
+    data = Column(JSON, nullable=True)            # the row as the API returns it, for upserts
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class LogRollup(Base):
+    """
+    Daily log counts per user and event type (UTC days), kept up to date by
+    db.log_retention so dashboards don't aggregate raw log rows.
+    """
+    __tablename__ = "log_rollups"
+
+    id = Column(Integer, primary_key=True)
+    day = Column(Date, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    event_type = Column(String, nullable=False)
+    count = Column(Integer, nullable=False)
+
+
+# ---------- Indexes ----------
+# (user_id, id) back the keyset-paginated per-user listings; the others serve
+# status/due-date filtering and time-range scans over the logs.
+Index("ix_tasks_user_id_id", Task.user_id, Task.id)
+Index("ix_tasks_user_status_due", Task.user_id, Task.status, Task.due_date)
+# Upcoming pending tasks of all users, for the reminder scheduler (db.reminders)
+Index(
+    "ix_tasks_pending_due", Task.due_date,
+    postgresql_where=Task.status == "pending", sqlite_where=Task.status == "pending",
+)
+Index("ix_logs_user_id_id", Log.user_id, Log.id)
+Index("ix_logs_user_timestamp", Log.user_id, Log.timestamp.desc())
+Index("ix_logs_timestamp", Log.timestamp)
+Index("ix_changes_user_id_id", Change.user_id, Change.id)
+Index("ix_log_rollups_user_day", LogRollup.user_id, LogRollup.day)
+Index("ix_log_rollups_day", LogRollup.day)
+
+# Full-text and trigram search (db.search), PostgreSQL only. Queries must use
+# these same expressions for the planner to pick the expression indexes.
+TS_CONFIG = text("'english'::regconfig")
+task_title_tsv = func.to_tsvector(TS_CONFIG, Task.title)
+log_content_tsv = func.to_tsvector(TS_CONFIG, Log.content)
+Index("ix_tasks_title_fts", task_title_tsv, postgresql_using="gin").ddl_if(dialect="postgresql")
+Index(
+    "ix_tasks_title_trgm", Task.title,
+    postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"},
+).ddl_if(dialect="postgresql")
+Index("ix_logs_content_fts", log_content_tsv, postgresql_using="gin").ddl_if(dialect="postgresql")
+event.listen(
+    Base.metadata, "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
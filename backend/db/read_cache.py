@@ -0,0 +1,98 @@
+"""
+Process-local read-through caches for hot reads that rarely change:
+
+- users:    (id, username) refs for existence checks
+- versions: the newest change-feed sequence per user (and overall), which
+            list endpoints turn into ETags
+- pages:    serialized list pages, keyed by ETag
+
+Commits in this process invalidate the affected users' versions right away
+(db.changes after-commit hook). Commits made by other worker processes are
+noticed once a cached version is older than ASTA_READ_CACHE_TTL seconds, so
+that is the longest a 304 can be stale for in a multi-worker setup. Pages
+never need invalidating: a new version means a new ETag. Users are never
+renamed or deleted, so their refs don't expire.
+
+ASTA_READ_CACHE=0 turns all three off.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from . import changes
+
+ENABLED = os.getenv("ASTA_READ_CACHE", "1") == "1"
+VERSION_TTL = float(os.getenv("ASTA_READ_CACHE_TTL", "1"))
+PAGE_CACHE_SIZE = int(os.getenv("ASTA_PAGE_CACHE_SIZE", "1024"))
+USER_CACHE_SIZE = int(os.getenv("ASTA_USER_CACHE_SIZE", "10000"))
+
+
+class LRU:
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        if not ENABLED:
+            return None
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if not ENABLED:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+users = LRU(USER_CACHE_SIZE)
+pages = LRU(PAGE_CACHE_SIZE)
+
+# scope (user id, or None for all users) -> (sequence, modified, fetched_at)
+_versions = {}
+_versions_lock = threading.Lock()
+# Bumped by every invalidation, so a version read from the database before a
+# commit can't be stored after that commit's invalidation has run
+_generation = 0
+
+
+def generation() -> int:
+    return _generation
+
+def get_version(scope):
+    """Cached (sequence, modified) for scope, or None when missing or too old."""
+    entry = _versions.get(scope) if ENABLED else None
+    if entry is None or time.monotonic() - entry[2] > VERSION_TTL:
+        return None
+    return entry[0], entry[1]
+
+def set_version(scope, head, since_generation: int):
+    """Cache a version read after generation() returned since_generation."""
+    if not ENABLED:
+        return
+    with _versions_lock:
+        if _generation == since_generation:
+            _versions[scope] = (head[0], head[1], time.monotonic())
+
+def invalidate(user_ids):
+    global _generation
+    with _versions_lock:
+        _generation += 1
+        for user_id in user_ids:
+            _versions.pop(user_id, None)
+        _versions.pop(None, None)
+
+
+changes.subscribe(invalidate)
@@ -0,0 +1,376 @@
+"""
+Due-date reminders (ASTA_REMINDERS=1).
+
+A background thread keeps the reminders that fire within the next
+ASTA_REMINDER_HORIZON_HOURS in a min-heap and sleeps until the earliest one,
+so memory and work follow the upcoming tasks, not the size of `tasks`:
+
+- the heap is filled by range scans over ix_tasks_pending_due, one slice of
+  the horizon at a time as the clock moves on. A reminder fires up to
+  ASTA_REMINDER_LEAD_MINUTES before its due date, and an all-day task's at
+  ASTA_REMINDER_ALL_DAY_AT on its day, so each scan widens the due-date
+  range by those offsets and keeps the tasks whose fire time is in the slice;
+- task writes made through crud reach it through the change feed: the thread
+  tails the `changes` table (a primary-key range scan) and applies each task
+  upsert, delete or reset to the heap. A commit in this process wakes it
+  right away; other processes' commits are seen within
+  ASTA_REMINDER_POLL_SECONDS.
+
+When a reminder is due the task is re-checked, a `reminder_due` log row is
+written for its owner (so it reaches the change feed like any other log) and
+the batch is handed to the sink: a JSON POST to ASTA_REMINDER_WEBHOOK if set,
+else nothing. Any callable taking a list of event dicts can stand in for it
+(e.g. scheduler.sink = events.append).
+
+Only one process fires: on PostgreSQL the scheduler holding a session-level
+advisory lock does the work and the others stand by. Elsewhere an exclusive
+flock() on ASTA_REMINDER_LOCK_FILE (by default the SQLite database path plus
+".reminders.lock") plays that part among the processes of one host, so
+e.g. backend.serve's workers on one SQLite file fire each reminder once.
+
+Due dates are naive local times (ASTA_TIMEZONE, as parse_due_date stores
+them); all-day tasks are reminded at ASTA_REMINDER_ALL_DAY_AT on their day.
+Reminders that fell due while no scheduler was running are not sent.
+"""
+import fcntl
+import heapq
+import json
+import logging
+import os
+import tempfile
+import threading
+import urllib.request
+from datetime import datetime, time as dtime, timedelta
+from typing import NamedTuple, Optional
+
+from sqlalchemy import func, select
+from . import changes, crud, models
+from .session import unit_of_work
+from backend.utils.date_utils import now_in
+
+logger = logging.getLogger(__name__)
+
+# pg_advisory_lock key held by the process that fires reminders
+_LEADER_LOCK = 0x41535452  # "ASTR"
+# Each tail re-reads this many sequence numbers behind the cursor: on
+# PostgreSQL, different users' commits can become visible out of id order
+LOOKBACK = 1000
+TAIL_PAGE = 1000
+
+
+class Reminder(NamedTuple):
+    fire_at: datetime
+    task_id: int
+    user_id: Optional[int]
+    title: str
+    due_date: datetime
+    all_day: bool
+
+    def event(self) -> dict:
+        return {
+            "task_id": self.task_id, "user_id": self.user_id, "title": self.title,
+            "due_date": self.due_date.isoformat(), "all_day": self.all_day,
+        }
+
+
+# ---------- Sinks ----------
+def null_sink(events):
+    pass
+
+class WebhookSink:
+    """POSTs each batch of reminder events to `url` as a JSON list."""
+
+    def __init__(self, url: str, timeout: float = 5.0):
+        self.url = url
+        self.timeout = timeout
+
+    def __call__(self, events):
+        request = urllib.request.Request(
+            self.url, data=json.dumps(events).encode(), method="POST",
+            headers={"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+class ReminderScheduler:
+    def __init__(self, session_factory, sink=null_sink, horizon_hours: float = 24, lead_minutes: float = 0,
+                 all_day_at: dtime = dtime(9), poll_seconds: float = 5, lock_file: str = None):
+        self.session_factory = session_factory
+        self.sink = sink
+        self.horizon = timedelta(hours=horizon_hours)
+        self.lead = timedelta(minutes=lead_minutes)
+        self.all_day_at = all_day_at
+        self.poll_seconds = poll_seconds
+        self.lock_file = lock_file
+        # A reminder that is at most this late when it reaches the heap still fires
+        self.late = timedelta(seconds=max(60.0, 2 * poll_seconds))
+        self._heap = []            # (fire_at, task_id); items not matching _entries are stale
+        self._entries = {}         # task_id -> Reminder
+        self._seen = {}            # task_id (or ("reset", user_id)) -> last change applied
+        self._start = None         # change-feed position the heap was first loaded at
+        self._cursor = None        # newest change applied
+        self._loaded_until = None  # reminders firing before this are in the heap
+        self._lock_conn = None
+        self._lock_fd = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self.fired = 0
+        self.sink_failures = 0
+
+    # ---------- Thread ----------
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="asta-reminders", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 10):
+        if self._thread is not None:
+            self._stop.set()
+            self._wake.set()
+            self._thread.join(timeout)
+            self._thread = None
+        self._resign()
+
+    def wake(self):
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.clear()
+            timeout = self.poll_seconds
+            try:
+                if self._lead():
+                    timeout = self._step()
+            except Exception:
+                logger.exception("Reminder scheduler step failed")
+            self._wake.wait(timeout)
+
+    def _step(self) -> float:
+        """One pass: load, apply changes, fire; returns how long to sleep."""
+        now = now_in()
+        with self.session_factory() as db:
+            if self._cursor is None:
+                # Take the cursor first: changes made while loading are re-applied
+                self._start = self._cursor = changes.head(db)[0]
+                self._loaded_until = now - timedelta(days=1)
+            if self._loaded_until - now < self.horizon / 2:
+                start, self._loaded_until = self._loaded_until, now + self.horizon
+                self._load(db, start, self._loaded_until, now)
+            self._tail(db, now)
+        now = now_in()
+        self._fire_due(now)
+        if not self._heap:
+            return self.poll_seconds
+        return min(max((self._heap[0][0] - now).total_seconds(), 0.0), self.poll_seconds)
+
+    # ---------- Leadership ----------
+    def _lead(self) -> bool:
+        engine = self.session_factory.kw["bind"]
+        if engine.dialect.name != "postgresql":
+            return self._lead_by_file(engine)
+        try:
+            if self._lock_conn is None:
+                conn = engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+                if not conn.execute(select(func.pg_try_advisory_lock(_LEADER_LOCK))).scalar():
+                    conn.close()
+                    return False
+                self._lock_conn = conn
+                logger.info("Reminder scheduler took the leader lock")
+            else:
+                self._lock_conn.execute(select(1))
+            return True
+        except Exception:
+            logger.exception("Reminder scheduler lost its leader lock")
+            self._resign()
+            return False
+
+    def _lead_by_file(self, engine) -> bool:
+        if self._lock_fd is None:
+            path = self.lock_file or _default_lock_file(engine)
+            if path is None:
+                return True  # an in-memory database lives in this process only
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                os.close(fd)
+                return False
+            self._lock_fd = fd
+            logger.info("Reminder scheduler took the leader lock %s", path)
+        return True
+
+    def _resign(self):
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)  # releases the flock
+            self._lock_fd = None
+        if self._lock_conn is not None:
+            try:
+                self._lock_conn.close()
+            except Exception:
+                pass
+            self._lock_conn = None
+        self._heap, self._entries, self._seen = [], {}, {}
+        self._start = self._cursor = self._loaded_until = None
+
+    # ---------- Heap ----------
+    def fire_time(self, due_date: datetime, all_day: bool) -> datetime:
+        if all_day:
+            due_date = datetime.combine(due_date.date(), self.all_day_at)
+        return due_date - self.lead
+
+    def due_range(self, start: datetime, end: datetime):
+        """The due dates of the reminders firing in [start, end)."""
+        # Timed: due = fire + lead. All-day: due falls on the day whose
+        # all_day_at - lead is the fire time, i.e. up to a day after that.
+        offset = timedelta(hours=self.all_day_at.hour, minutes=self.all_day_at.minute)
+        return start + self.lead - offset, end + self.lead + (timedelta(days=1) - offset)
+
+    def _schedule(self, task_id, user_id, title, due_date, all_day, status, now):
+        self._entries.pop(task_id, None)
+        if status != "pending" or due_date is None:
+            return
+        fire_at = self.fire_time(due_date, all_day)
+        if fire_at >= self._loaded_until:
+            return  # beyond the horizon: a later _load() picks it up
+        if fire_at < now - self.late:
+            return
+        self._entries[task_id] = Reminder(fire_at, task_id, user_id, title, due_date, bool(all_day))
+        heapq.heappush(self._heap, (fire_at, task_id))
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            # Drop the stale items left by rescheduled and removed tasks
+            self._heap = [(r.fire_at, r.task_id) for r in self._entries.values()]
+            heapq.heapify(self._heap)
+
+    def _load(self, db, start, end, now, user_id=None):
+        """Schedule the pending tasks firing in [start, end); a range scan on ix_tasks_pending_due."""
+        Task = models.Task
+        due_from, due_until = self.due_range(start, end)
+        stmt = select(Task.id, Task.user_id, Task.title, Task.due_date, Task.all_day).where(
+            Task.status == "pending", Task.due_date >= due_from, Task.due_date < due_until,
+        )
+        if user_id is not None:
+            stmt = stmt.where(Task.user_id == user_id)
+        for row in db.execute(stmt.execution_options(yield_per=1000)):
+            # The widened due-date range overlaps the neighbouring slices
+            if start <= self.fire_time(row.due_date, row.all_day) < end:
+                self._schedule(row.id, row.user_id, row.title, row.due_date, row.all_day, "pending", now)
+
+    def _tail(self, db, now):
+        after = max(self._cursor - LOOKBACK, self._start)
+        while True:
+            rows = changes.tail(db, "task", after, TAIL_PAGE)
+            for change in rows:
+                key = change.entity_id if change.op != "reset" else ("reset", change.user_id)
+                if change.id <= self._seen.get(key, 0):
+                    continue
+                self._seen[key] = change.id
+                self._apply(db, change, now)
+            if rows:
+                after = rows[-1].id
+                self._cursor = max(self._cursor, after)
+            if len(rows) < TAIL_PAGE:
+                break
+        if len(self._seen) > 4 * LOOKBACK:
+            floor = self._cursor - LOOKBACK
+            self._seen = {key: seq for key, seq in self._seen.items() if seq > floor}
+
+    def _apply(self, db, change, now):
+        if change.op == "upsert":
+            data = change.data
+            due_date = datetime.fromisoformat(data["due_date"]) if data.get("due_date") else None
+            self._schedule(change.entity_id, data["user_id"], data["title"], due_date,
+                           data["all_day"], data["status"], now)
+        elif change.op == "delete":
+            self._entries.pop(change.entity_id, None)
+        elif change.op == "reset":
+            # Bulk import: reload the user's slice of the horizon
+            for task_id in [t for t, r in self._entries.items() if r.user_id == change.user_id]:
+                del self._entries[task_id]
+            self._load(db, now - timedelta(days=1), self._loaded_until, now, user_id=change.user_id)
+
+    # ---------- Firing ----------
+    def _fire_due(self, now):
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            fire_at, task_id = heapq.heappop(self._heap)
+            reminder = self._entries.get(task_id)
+            if reminder is not None and reminder.fire_at == fire_at:
+                del self._entries[task_id]
+                due.append(reminder)
+        if due:
+            self._send(due)
+
+    def _send(self, reminders):
+        Task = models.Task
+        events = []
+        with self.session_factory() as db, unit_of_work(db):
+            # A change this process hasn't tailed yet may have moved or closed the task
+            current = {
+                row.id: row for row in db.execute(
+                    select(Task.id, Task.due_date, Task.all_day)
+                    .where(Task.id.in_([r.task_id for r in reminders]), Task.status == "pending")
+                )
+            }
+            for reminder in reminders:
+                row = current.get(reminder.task_id)
+                if row is None or row.due_date != reminder.due_date or bool(row.all_day) != reminder.all_day:
+                    continue
+                when = "today" if reminder.all_day else f"at {reminder.due_date:%Y-%m-%d %H:%M}"
+                crud.create_log(
+                    db=db,
+                    user_id=reminder.user_id,
+                    event_type="reminder_due",
+                    content=f"Task '{reminder.title}' is due {when}",
+                )
+                events.append(reminder.event())
+        self.fired += len(events)
+        if events:
+            try:
+                self.sink(events)
+            except Exception:
+                self.sink_failures += len(events)
+                logger.exception("Reminder sink failed for %d reminders", len(events))
+
+    def stats(self) -> dict:
+        return {
+            "leader": self._cursor is not None,
+            "scheduled": len(self._entries),
+            "next": self._heap[0][0].isoformat() if self._heap else None,
+            "loaded_until": self._loaded_until.isoformat() if self._loaded_until else None,
+            "fired": self.fired,
+            "sink_failures": self.sink_failures,
+        }
+
+
+def _default_lock_file(engine):
+    database = engine.url.database
+    if engine.dialect.name != "sqlite":
+        return os.path.join(tempfile.gettempdir(), f"asta-reminders-{database}.lock")
+    if not database or database == ":memory:" or database.startswith("file:"):
+        return None
+    return database + ".reminders.lock"
+
+
+scheduler = None
+
+def configure(session_factory):
+    """Create the scheduler from env settings; commits in this process wake it."""
+    global scheduler
+    if os.getenv("ASTA_REMINDERS", "0") != "1":
+        return None
+    webhook = os.getenv("ASTA_REMINDER_WEBHOOK")
+    hour, minute = os.getenv("ASTA_REMINDER_ALL_DAY_AT", "09:00").split(":")
+    scheduler = ReminderScheduler(
+        session_factory,
+        sink=WebhookSink(webhook) if webhook else null_sink,
+        horizon_hours=float(os.getenv("ASTA_REMINDER_HORIZON_HOURS", "24")),
+        lead_minutes=float(os.getenv("ASTA_REMINDER_LEAD_MINUTES", "0")),
+        all_day_at=dtime(int(hour), int(minute)),
+        poll_seconds=float(os.getenv("ASTA_REMINDER_POLL_SECONDS", "5")),
+        lock_file=os.getenv("ASTA_REMINDER_LOCK_FILE"),
+    )
+    changes.subscribe(lambda user_ids: scheduler.wake())
+    return scheduler
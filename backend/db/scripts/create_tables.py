@@ -1,6 +1,87 @@
+"""
+Create the schema, or bring an existing database up to date:
+
+    python -m backend.db.scripts.create_tables
+
+Safe to re-run. create_all() only adds missing tables (changes,
+log_rollups), so afterwards this adds the columns and indexes that
+existing tables are missing:
+- tasks.all_day, BOOLEAN NOT NULL DEFAULT false (a metadata-only change on
+  PostgreSQL 11+, no table rewrite);
+- every index declared in db.models that isn't there yet (the per-user
+  keyset and agenda indexes, the reminder scheduler's partial index, the
+  change feed's, and on PostgreSQL the full-text/trigram search indexes
+  after CREATE EXTENSION pg_trgm).
+On PostgreSQL the indexes are built with CREATE INDEX CONCURRENTLY, so
+writes to large tasks/logs tables aren't blocked while they build (except on
+a partitioned logs table, which doesn't support it); one left invalid by an
+interrupted run is dropped and rebuilt.
+"""
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateIndex
 from backend.db.session import engine, Base
 from backend.db import models
 
+# (table, column, DDL type and default) added to tables created before the column
+COLUMNS = [
+    ("tasks", "all_day", "BOOLEAN NOT NULL DEFAULT {false}"),
+]
+
+
+def upgrade(bind=engine) -> list:
+    """Create what's missing; returns what was added, e.g. ["tasks.all_day", "ix_tasks_pending_due"]."""
+    Base.metadata.create_all(bind=bind)
+    postgres = bind.dialect.name == "postgresql"
+    added = []
+
+    with bind.begin() as conn:
+        inspector = inspect(conn)
+        for table, column, ddl in COLUMNS:
+            if column not in {c["name"] for c in inspector.get_columns(table)}:
+                ddl = ddl.format(false="false" if postgres else "0")
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+                added.append(f"{table}.{column}")
+
+    inspector = inspect(bind)
+    invalid, partitioned = set(), set()
+    if postgres:
+        with bind.connect() as conn:
+            # Left behind by an interrupted CREATE INDEX CONCURRENTLY
+            invalid = set(conn.execute(text(
+                "SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid WHERE NOT i.indisvalid"
+            )).scalars())
+            # logs after `python -m backend.db.log_retention partition`
+            partitioned = set(conn.execute(text("SELECT relname FROM pg_class WHERE relkind = 'p'")).scalars())
+    missing = [
+        index
+        for table in Base.metadata.sorted_tables
+        for index in sorted(table.indexes, key=lambda i: i.name)
+        if (index.name in invalid or index.name not in {i["name"] for i in inspector.get_indexes(table.name)})
+        and (index._ddl_if is None or index._ddl_if.dialect in (None, bind.dialect.name))
+    ]
+    if not missing:
+        return added
+    if postgres:
+        # CONCURRENTLY can't run inside a transaction block, nor on a partitioned table
+        with bind.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            for index in missing:
+                if index.name in invalid:
+                    conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index.name}"))
+                options = index.dialect_options["postgresql"]
+                options["concurrently"] = index.table.name not in partitioned
+                try:
+                    conn.execute(CreateIndex(index))
+                finally:
+                    options["concurrently"] = False
+                added.append(index.name)
+    else:
+        with bind.begin() as conn:
+            for index in missing:
+                conn.execute(CreateIndex(index))
+                added.append(index.name)
+    return added
+
+
 if __name__ == "__main__":
-    Base.metadata.create_all(bind=engine)
-    print("Tables created/checked.")
+    added = upgrade()
+    print("Added: " + ", ".join(added) if added else "Tables created/checked.")
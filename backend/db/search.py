@@ -0,0 +1,41 @@
+"""
+Task and log search.
+
+On PostgreSQL a task matches when its title matches the query as full text
+(to_tsvector @@ websearch_to_tsquery, GIN index ix_tasks_title_fts) or
+when the query is word-similar to part of it (pg_trgm `q <% title`, GIN
+index ix_tasks_title_trgm), so inflections, partial words and typos still
+find it. Tasks are ranked by ts_rank + word_similarity. Logs match on
+full text only (ix_logs_content_fts) and come newest first.
+
+Other databases (SQLite in development and tests) fall back to requiring
+every query word somewhere in the text (case-insensitive LIKE), newest
+first, without an index.
+"""
+from sqlalchemy import and_, func, literal, or_
+from . import models
+
+
+def _like_all(column, q: str):
+    words = [w.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") for w in q.split()]
+    return and_(*(column.ilike(f"%{w}%", escape="\\") for w in words))
+
+
+def task_match(dialect: str, q: str):
+    """(condition, order_by) selecting tasks whose title matches q, best first."""
+    Task = models.Task
+    if dialect == "postgresql":
+        tsquery = func.websearch_to_tsquery(models.TS_CONFIG, q)
+        condition = or_(models.task_title_tsv.op("@@")(tsquery), literal(q).op("<%")(Task.title))
+        rank = func.ts_rank(models.task_title_tsv, tsquery) + func.word_similarity(q, Task.title)
+        return condition, (rank.desc(), Task.id.desc())
+    return _like_all(Task.title, q), (Task.id.desc(),)
+
+
+def log_match(dialect: str, q: str):
+    """(condition, order_by) selecting logs whose content matches q, newest first."""
+    Log = models.Log
+    if dialect == "postgresql":
+        tsquery = func.websearch_to_tsquery(models.TS_CONFIG, q)
+        return models.log_content_tsv.op("@@")(tsquery), (Log.id.desc(),)
+    return _like_all(Log.content, q), (Log.id.desc(),)
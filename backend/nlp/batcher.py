@@ -0,0 +1,131 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List
+
+from backend.nlp.executor import InferenceExecutor, InferenceSaturated, get_inference_executor
+
+
+class MicroBatcher:
+    """
+    Collects single items submitted from concurrent requests and runs them
+    through `batch_fn` together.
+
+    A background thread takes the first pending item, then keeps gathering
+    more for up to `max_wait_ms` (or until `max_batch_size` is reached)
+    before calling `batch_fn(items)` once. Callers get a Future per item:
+    sync code calls `.result()`, async code wraps it with
+    `asyncio.wrap_future`.
+
+    Batches run on `executor` when one is given, so the next batch can be
+    collected while the previous one is still being inferred. At most
+    `max_pending` items may wait at once; submit() raises InferenceSaturated
+    beyond that.
+    """
+
+    def __init__(self, batch_fn: Callable[[List], List], max_batch_size: int = 32, max_wait_ms: float = 5.0,
+                 max_pending: int = None, executor: InferenceExecutor = None):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_pending = max_pending
+        self.executor = executor
+        self._queue: "queue.Queue" = queue.Queue()
+        self._pending = 0
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="asta-nlp-batcher", daemon=True)
+                self._thread.start()
+
+    def submit(self, item) -> Future:
+        self._ensure_started()
+        with self._lock:
+            if self.max_pending is not None and self._pending >= self.max_pending:
+                raise InferenceSaturated(self.executor.retry_after if self.executor else 1)
+            self._pending += 1
+        future: Future = Future()
+        future.add_done_callback(self._done)
+        self._queue.put((item, future))
+        return future
+
+    def _done(self, _future):
+        with self._lock:
+            self._pending -= 1
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        try:
+            # Drain whatever is already queued without waiting
+            while len(batch) < self.max_batch_size:
+                batch.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+
+        # Then wait a few milliseconds for concurrent requests to join
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run_batch(self, live):
+        items = [item for item, _ in live]
+        futures = [f for _, f in live]
+        try:
+            results = self.batch_fn(items)
+        except Exception as e:
+            for f in futures:
+                f.set_exception(e)
+            return
+        for f, result in zip(futures, results):
+            f.set_result(result)
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            live = [(item, f) for item, f in batch if f.set_running_or_notify_cancel()]
+            if not live:
+                continue
+            if self.executor is not None:
+                # Blocks while every inference worker is busy; meanwhile new
+                # items pile up and form a larger next batch.
+                self.executor.submit(self._run_batch, live)
+            else:
+                self._run_batch(live)
+
+
+_parse_batcher = None
+_parse_batcher_lock = threading.Lock()
+
+def get_parse_batcher() -> MicroBatcher:
+    """Process-wide batcher in front of nlp_processor.parse_batch."""
+    global _parse_batcher
+    if _parse_batcher is None:
+        with _parse_batcher_lock:
+            if _parse_batcher is None:
+                from backend.nlp import nlp_processor
+                _parse_batcher = MicroBatcher(
+                    nlp_processor.parse_batch,
+                    max_batch_size=nlp_processor.BATCH_SIZE,
+                    max_wait_ms=float(os.getenv("ASTA_NLP_BATCH_WAIT_MS", "5")),
+                    max_pending=int(os.getenv("ASTA_NLP_MAX_PENDING", "256")),
+                    executor=get_inference_executor(),
+                )
+    return _parse_batcher
@@ -0,0 +1,172 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+_WS_RE = re.compile(r"\s+")
+
+
+def normalize(text: str) -> str:
+    """
+    Cache key form of a message. Only whitespace is normalized: case and
+    punctuation change what spaCy tags as entities, so they stay.
+    """
+    return _WS_RE.sub(" ", text).strip()
+
+
+class CacheBackend:
+    """Interface for NLP result caches. Values must be JSON-serializable."""
+
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {}
+
+
+class MemoryCache(CacheBackend):
+    """In-process LRU cache with a per-entry TTL."""
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        return {
+            "backend": "memory",
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class SQLiteCache(CacheBackend):
+    """
+    Cache stored in a local SQLite file, so every worker on the host shares
+    the same entries. Expired rows are ignored on read and pruned on write
+    once the table grows past maxsize.
+    """
+
+    def __init__(self, path: str, maxsize: int = 100000, ttl: float = 3600):
+        self.path = path
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._local = threading.local()
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+
+    def _conn(self):
+        # Opened on first use in each thread, and again in a forked worker:
+        # a SQLite connection must not cross fork(), so nothing is opened
+        # here at import time or in the constructor
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS nlp_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)"
+            )
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key):
+        row = self._conn().execute(
+            "SELECT value FROM nlp_cache WHERE key = ? AND expires > ?", (key, time.time())
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key, value):
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO nlp_cache (key, value, expires) VALUES (?, ?, ?)",
+            (key, json.dumps(value), time.time() + self.ttl),
+        )
+        self._writes += 1
+        if self._writes % 1000 == 0:
+            self._prune(conn)
+
+    def _prune(self, conn):
+        conn.execute("DELETE FROM nlp_cache WHERE expires <= ?", (time.time(),))
+        conn.execute(
+            "DELETE FROM nlp_cache WHERE key IN ("
+            " SELECT key FROM nlp_cache ORDER BY expires DESC LIMIT -1 OFFSET ?)",
+            (self.maxsize,),
+        )
+
+    def clear(self):
+        self._conn().execute("DELETE FROM nlp_cache")
+
+    def stats(self):
+        size = self._conn().execute("SELECT COUNT(*) FROM nlp_cache").fetchone()[0]
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "size": size,
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def cache_from_env() -> Optional[CacheBackend]:
+    """
+    ASTA_NLP_CACHE selects the backend: "memory" (default), "sqlite" or "off".
+    """
+    kind = os.getenv("ASTA_NLP_CACHE", "memory")
+    ttl = float(os.getenv("ASTA_NLP_CACHE_TTL", "3600"))
+    size = int(os.getenv("ASTA_NLP_CACHE_SIZE", "10000"))
+    if kind == "off":
+        return None
+    if kind == "sqlite":
+        return SQLiteCache(os.getenv("ASTA_NLP_CACHE_PATH", "asta_nlp_cache.sqlite3"), maxsize=size, ttl=ttl)
+    return MemoryCache(maxsize=size, ttl=ttl)
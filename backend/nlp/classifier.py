@@ -0,0 +1,355 @@
+"""
+Intent classifiers for text that no intent rule matched (see
+nlp_processor.detect_intent). The registry picks one with ASTA_CLASSIFIER.
+
+"linear" (the default) is a multinomial logistic regression in NumPy over
+hashed features of the text:
+- word unigrams and bigrams, plus the character 3-grams of each word with
+  boundary marks, so typos and inflections still share features;
+- hashed with CRC32 (stable across processes, unlike hash()) into
+  N_FEATURES buckets, binary and L2-normalised.
+Scoring a batch is one gather-and-sum over the (N_FEATURES x intents)
+weight matrix, a few microseconds per text. Predictions below
+ASTA_CLASSIFIER_MIN_CONFIDENCE fall back to general_chat, and so do
+delete_task and complete_task (MUTATING_INTENTS) unless
+ASTA_CLASSIFIER_MUTATING_MIN_CONFIDENCE is set and reached: chat such as
+"never mind" or "forget it" reads like the delete templates, and a
+misheard chat line must not remove or close a task.
+
+It is trained offline:
+
+    python -m backend.nlp.classifier train --out intent_model.npz [--examples labelled.jsonl]
+    python -m backend.nlp.classifier evaluate --model intent_model.npz --examples held_out.jsonl
+
+from the built-in templated examples and JSONL files of
+{"text": ..., "intent": ...} lines. Only hand-labelled text belongs in
+those: labelling logged messages with the intent rules would just teach the
+model to copy them. The report holds out whole templates (--holdout), so
+it scores sentence patterns the model hasn't seen rather than fresh fills of
+the ones it has; `evaluate` without --examples scores those templates too.
+ASTA_INTENT_MODEL_PATH points the registry at the result; without it a
+model is trained from all the built-in examples when the registry loads
+(well under a second, BUILTIN_VERSION identifies it).
+
+"transformer" is the DistilBERT SST-2 sentiment model the fallback used to
+be (general_chat_positive/negative); "module:factory" plugs in any callable
+returning an IntentClassifier.
+"""
+import argparse
+import json
+import random
+import re
+import statistics
+import time
+import zlib
+from itertools import chain
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+N_FEATURES = 2 ** 18
+CHAT_INTENT = "general_chat"
+# Intents that change existing tasks; see LinearIntentClassifier.mutating_min_confidence
+MUTATING_INTENTS = frozenset({"delete_task", "complete_task"})
+# Bump when the built-in examples or the training defaults change: the
+# registry's version (part of the NLP result cache key) includes it
+BUILTIN_VERSION = 1
+
+_WORD = re.compile(r"[a-z0-9']+")
+
+
+def features(text: str, n_features: int = N_FEATURES) -> List[int]:
+    """Sorted, de-duplicated feature buckets of text."""
+    words = _WORD.findall(text.lower())
+    grams = [f"w:{w}" for w in words]
+    grams += [f"b:{a} {b}" for a, b in zip(words, words[1:])]
+    for word in words:
+        padded = f"<{word}>"
+        grams += [f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2)]
+    return sorted({zlib.crc32(g.encode()) % n_features for g in grams})
+
+
+def _scores(weights: np.ndarray, bias: np.ndarray, rows: Sequence[List[int]]) -> np.ndarray:
+    # Sum each row's weight vectors in one np.add.reduceat over the gathered rows
+    lengths = np.fromiter((len(r) for r in rows), dtype=np.int64, count=len(rows))
+    out = np.tile(bias, (len(rows), 1))
+    present = lengths > 0
+    if present.any():
+        indices = np.fromiter(chain.from_iterable(rows), dtype=np.int64, count=int(lengths.sum()))
+        starts = (np.cumsum(lengths) - lengths)[present]
+        sums = np.add.reduceat(weights[indices], starts, axis=0)
+        out[present] += sums / np.sqrt(lengths[present])[:, None]
+    return out
+
+def _softmax(z: np.ndarray) -> np.ndarray:
+    z = z - z.max(axis=1, keepdims=True)
+    e = np.exp(z)
+    return e / e.sum(axis=1, keepdims=True)
+
+
+class IntentClassifier:
+    """Maps texts to intents."""
+
+    def predict(self, texts: Sequence[str], batch_size: int = 32) -> List[str]:
+        raise NotImplementedError
+
+
+class LinearIntentClassifier(IntentClassifier):
+    """
+    Predictions below min_confidence become the fallback intent. MUTATING_INTENTS
+    need mutating_min_confidence instead, and with None (the default) are
+    never predicted.
+    """
+
+    def __init__(self, labels: Sequence[str], weights: np.ndarray, bias: np.ndarray,
+                 min_confidence: float = 0.5, fallback: str = CHAT_INTENT,
+                 mutating_min_confidence: Optional[float] = None):
+        self.labels = list(labels)
+        self.weights = weights.astype(np.float32, copy=False)
+        self.bias = bias.astype(np.float32, copy=False)
+        self.n_features = self.weights.shape[0]
+        self.min_confidence = min_confidence
+        self.fallback = fallback
+        self.mutating_min_confidence = mutating_min_confidence
+
+    def _accepts(self, label: str, p: float) -> bool:
+        if label in MUTATING_INTENTS:
+            return self.mutating_min_confidence is not None and p >= self.mutating_min_confidence
+        return p >= self.min_confidence
+
+    def probabilities(self, texts: Sequence[str]) -> np.ndarray:
+        rows = [features(t, self.n_features) for t in texts]
+        return _softmax(_scores(self.weights, self.bias, rows))
+
+    def predict(self, texts: Sequence[str], batch_size: int = 32) -> List[str]:
+        if not texts:
+            return []
+        probs = self.probabilities(texts)
+        best = probs.argmax(axis=1)
+        return [
+            self.labels[i] if self._accepts(self.labels[i], probs[n, i]) else self.fallback
+            for n, i in enumerate(best)
+        ]
+
+    # ---------- Persistence ----------
+    def save(self, path: str):
+        np.savez_compressed(path, weights=self.weights, bias=self.bias, labels=np.array(self.labels))
+
+    @classmethod
+    def load(cls, path: str, min_confidence: float = 0.5,
+             mutating_min_confidence: Optional[float] = None) -> "LinearIntentClassifier":
+        with np.load(path, allow_pickle=False) as data:
+            return cls([str(l) for l in data["labels"]], data["weights"], data["bias"], min_confidence,
+                       mutating_min_confidence=mutating_min_confidence)
+
+
+class SentimentClassifier(IntentClassifier):
+    """A transformers text-classification pipeline as general_chat_<label>."""
+
+    def __init__(self, pipeline):
+        self.pipeline = pipeline
+
+    def predict(self, texts: Sequence[str], batch_size: int = 32) -> List[str]:
+        return [f"general_chat_{p['label'].lower()}" for p in self.pipeline(list(texts), batch_size=batch_size)]
+
+
+# ---------- Training ----------
+def train(examples: Sequence[Tuple[str, str]], n_features: int = N_FEATURES, epochs: int = 30,
+          learning_rate: float = 5.0, l2: float = 1e-4, batch_size: int = 32, seed: int = 0,
+          min_confidence: float = 0.5, mutating_min_confidence: Optional[float] = None) -> LinearIntentClassifier:
+    """Mini-batch SGD on the softmax cross-entropy; only the touched weight rows are updated."""
+    labels = sorted({intent for _, intent in examples})
+    label_index = {label: i for i, label in enumerate(labels)}
+    rows = [features(text, n_features) for text, _ in examples]
+    y = np.array([label_index[intent] for _, intent in examples])
+    weights = np.zeros((n_features, len(labels)), dtype=np.float32)
+    bias = np.zeros(len(labels), dtype=np.float32)
+    rng = np.random.default_rng(seed)
+
+    for epoch in range(epochs):
+        lr = learning_rate / (1 + 0.1 * epoch)
+        order = rng.permutation(len(rows))
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            batch_rows = [rows[i] for i in batch]
+            grad = _softmax(_scores(weights, bias, batch_rows))
+            grad[np.arange(len(batch)), y[batch]] -= 1
+            grad /= len(batch)
+            bias -= lr * grad.sum(axis=0)
+
+            lengths = np.array([len(r) for r in batch_rows])
+            if not lengths.sum():
+                continue
+            indices = np.fromiter(chain.from_iterable(batch_rows), dtype=np.int64, count=int(lengths.sum()))
+            row_of = np.repeat(np.arange(len(batch)), lengths)
+            scale = (1 / np.sqrt(lengths))[row_of][:, None]
+            touched = np.unique(indices)
+            weights[touched] *= 1 - lr * l2
+            np.add.at(weights, indices, -lr * grad[row_of] * scale)
+    return LinearIntentClassifier(labels, weights, bias, min_confidence,
+                                  mutating_min_confidence=mutating_min_confidence)
+
+
+def evaluate(model: IntentClassifier, examples: Sequence[Tuple[str, str]], rounds: int = 3) -> dict:
+    """Accuracy, per-intent precision/recall and single/batched latency."""
+    texts = [text for text, _ in examples]
+    expected = [intent for _, intent in examples]
+    predicted = model.predict(texts)
+    report = {}
+    for label in sorted(set(expected) | set(predicted)):
+        tp = sum(p == e == label for p, e in zip(predicted, expected))
+        n_predicted, n_expected = predicted.count(label), expected.count(label)
+        report[label] = {
+            "precision": round(tp / n_predicted, 3) if n_predicted else None,
+            "recall": round(tp / n_expected, 3) if n_expected else None,
+            "support": n_expected,
+        }
+    single = []
+    for _ in range(rounds):
+        for text in texts:
+            start = time.perf_counter()
+            model.predict([text])
+            single.append((time.perf_counter() - start) * 1e6)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        model.predict(texts)
+    batched = (time.perf_counter() - start) * 1e6 / (rounds * len(texts))
+    return {
+        "examples": len(texts),
+        "accuracy": round(sum(p == e for p, e in zip(predicted, expected)) / len(texts), 3),
+        "intents": report,
+        "latency_us": {
+            "single_p50": round(statistics.median(single), 1),
+            "single_p99": round(sorted(single)[int(len(single) * 0.99)], 1),
+            "batched_per_text": round(batched, 1),
+        },
+    }
+
+
+# ---------- Training data ----------
+_THINGS = [
+    "buy milk", "call mom", "pay the rent", "submit the report", "book the dentist appointment",
+    "water the plants", "email Sarah", "renew my passport", "pick up the kids", "study math",
+    "clean the kitchen", "prepare the slides", "fix the bike", "send the invoice", "walk the dog",
+]
+_WHEN = ["", " tomorrow", " at 5 pm", " on friday", " next week", " tonight", " this afternoon", " by monday"]
+_TEMPLATES = {
+    "create_task": [
+        "i need to {thing}{when}", "i have to {thing}{when}", "gotta {thing}{when}", "need to {thing}{when}",
+        "make sure i {thing}{when}", "ping me to {thing}{when}", "i should {thing}{when}",
+        "put {thing} on my list", "can you help me remember to {thing}{when}", "{thing}{when}",
+        "set a reminder to {thing}{when}", "i must {thing}{when}",
+    ],
+    "get_tasks": [
+        "what's coming up{when}", "anything due{when}", "what have i got{when}", "what's my schedule{when}",
+        "am i busy{when}", "what's pending", "what is left to do", "what do i need to do{when}",
+        "read me my reminders", "any plans{when}", "give me my to-dos", "what's on my plate{when}",
+    ],
+    "delete_task": [
+        "forget about {thing}", "never mind {thing}", "scrap {thing}", "i don't need to {thing} anymore",
+        "no need to {thing} anymore", "erase {thing}", "take {thing} off my list", "ditch {thing}",
+        "throw out the {thing} task", "i won't {thing} after all",
+    ],
+    "complete_task": [
+        "{thing} is taken care of", "i took care of {thing}", "{thing} is sorted", "got {thing} out of the way",
+        "i managed to {thing}", "wrapped up {thing}", "{thing} is all set", "i did {thing}",
+        "crossed {thing} off", "just did {thing}", "{thing} is finished",
+    ],
+    "find_task": [
+        "which task was about {thing}", "is there a task about {thing}", "do i have anything about {thing}",
+        "have i got a reminder about {thing}", "pull up {thing}", "locate {thing}",
+        "where's the {thing} task", "did i save something about {thing}",
+    ],
+}
+_CHAT = [
+    "hello", "hi there", "hey", "how are you", "how are you today?", "good morning", "good night",
+    "thanks a lot", "thank you", "tell me a joke", "what's the weather like", "i'm tired",
+    "i feel great today", "who are you", "what can you do", "that was helpful", "nice", "ok", "cool",
+    "lol", "i love this app", "this is annoying", "see you later", "what time is it", "how was your day",
+    "i'm bored", "you're awesome", "not bad", "sure", "yes", "no", "maybe later", "bye",
+    "i really hated how that call went yesterday", "nothing much, just relaxing this weekend",
+    "ugh, i forgot my keys again", "this assistant is great, thanks!", "what's your name",
+    "i had a long day", "do you like music", "that's funny", "hmm", "good job", "i'm so happy",
+    "it's raining again", "what's new", "how's it going", "i'm hungry", "sounds good", "great, thanks",
+]
+
+def _split(items: Sequence, holdout: float) -> Tuple[list, list]:
+    # Every k-th item is held out, k = 1 / holdout
+    if holdout <= 0:
+        return list(items), []
+    k = max(2, round(1 / holdout))
+    return ([x for i, x in enumerate(items) if i % k != k - 1],
+            [x for i, x in enumerate(items) if i % k == k - 1])
+
+def builtin_examples(per_intent: int = 80, seed: int = 0,
+                     holdout: float = 0.0) -> Tuple[List[Tuple[str, str]], List[Tuple[str, str]]]:
+    """
+    Templated examples for each task intent plus general chat, deterministic
+    for a seed, as (train, held_out). With holdout > 0 about that fraction
+    of each intent's templates and of the chat lines only fill held_out, so
+    no held-out example shares a template with a training one.
+    """
+    rng = random.Random(seed)
+    chat, chat_held_out = _split(_CHAT, holdout)
+    parts = ([(text, CHAT_INTENT) for text in chat], [(text, CHAT_INTENT) for text in chat_held_out])
+    for intent, templates in _TEMPLATES.items():
+        for part, subset in zip(parts, _split(templates, holdout)):
+            combos = sorted({t.format(thing=th, when=w) for t in subset for th in _THINGS for w in _WHEN})
+            part += [(text, intent) for text in rng.sample(combos, min(per_intent, len(combos)))]
+    return parts
+
+def load_examples(path: str) -> List[Tuple[str, str]]:
+    with open(path) as f:
+        return [(row["text"], row["intent"]) for row in map(json.loads, f) if row.get("text")]
+
+
+def load(path: str = None, min_confidence: float = 0.5,
+         mutating_min_confidence: Optional[float] = None) -> LinearIntentClassifier:
+    """The model saved at path, or one trained on the built-in examples."""
+    if path:
+        return LinearIntentClassifier.load(path, min_confidence, mutating_min_confidence)
+    return train(builtin_examples()[0], min_confidence=min_confidence,
+                 mutating_min_confidence=mutating_min_confidence)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    train_cmd = sub.add_parser("train")
+    train_cmd.add_argument("--out", required=True)
+    train_cmd.add_argument("--examples", action="append", default=[], help="JSONL of {text, intent}; repeatable")
+    train_cmd.add_argument("--no-builtin", action="store_true")
+    train_cmd.add_argument("--holdout", type=float, default=0.2,
+                           help="fraction of the templates and examples held out for the report (0: train on all)")
+    train_cmd.add_argument("--epochs", type=int, default=30)
+    train_cmd.add_argument("--feature-bits", type=int, default=18)
+    eval_cmd = sub.add_parser("evaluate")
+    eval_cmd.add_argument("--model", help="saved model (default: trained on the non-held-out built-in templates)")
+    eval_cmd.add_argument("--examples", action="append", default=[],
+                          help="JSONL of {text, intent} (default: the held-out built-in templates)")
+    eval_cmd.add_argument("--holdout", type=float, default=0.2)
+    args = parser.parse_args()
+
+    if args.command == "evaluate":
+        train_set, held_out = builtin_examples(holdout=args.holdout)
+        # A --model trained with --holdout 0 has seen the built-in templates
+        model = load(args.model) if args.model else train(train_set)
+        examples = list(chain.from_iterable(load_examples(p) for p in args.examples)) or held_out
+        print(json.dumps(evaluate(model, examples), indent=2))
+        return
+
+    train_set, held_out = ([], []) if args.no_builtin else builtin_examples(holdout=args.holdout)
+    for path in args.examples:
+        examples = load_examples(path)
+        random.Random(0).shuffle(examples)
+        cut = int(len(examples) * (1 - args.holdout))
+        train_set += examples[:cut]
+        held_out += examples[cut:]
+    model = train(train_set, n_features=2 ** args.feature_bits, epochs=args.epochs)
+    model.save(args.out)
+    report = evaluate(model, held_out) if held_out else {}
+    print(json.dumps({"trained_on": len(train_set), "saved": args.out, "held_out": report}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class InferenceSaturated(Exception):
+    """Raised when the inference queue is full; maps to HTTP 429."""
+
+    def __init__(self, retry_after: int = 1):
+        super().__init__("NLP inference queue is full")
+        self.retry_after = retry_after
+
+
+def _default_workers() -> int:
+    # Each worker runs torch with ASTA_TORCH_THREADS intra-op threads, so keep
+    # workers * threads within the number of cores.
+    torch_threads = int(os.getenv("ASTA_TORCH_THREADS", "1"))
+    return max(1, (os.cpu_count() or 1) // max(1, torch_threads))
+
+
+class InferenceExecutor:
+    """
+    Dedicated thread pool for model inference, separate from Starlette's
+    default threadpool so NLP bursts cannot starve the CRUD endpoints.
+
+    At most `max_workers + max_queue` jobs are admitted at once. try_submit()
+    raises InferenceSaturated beyond that; submit() blocks instead, which is
+    what the micro-batcher uses internally.
+    """
+
+    def __init__(self, max_workers: int = None, max_queue: int = None, retry_after: int = None):
+        self.max_workers = max_workers or _default_workers()
+        self.max_queue = max_queue if max_queue is not None else self.max_workers * 4
+        self.retry_after = retry_after or 1
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="asta-inference")
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_queue)
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def _submit(self, fn, *args) -> Future:
+        with self._lock:
+            self._in_flight += 1
+        future = self._pool.submit(fn, *args)
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, _future):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def submit(self, fn, *args) -> Future:
+        self._slots.acquire()
+        return self._submit(fn, *args)
+
+    def try_submit(self, fn, *args) -> Future:
+        if not self._slots.acquire(blocking=False):
+            raise InferenceSaturated(self.retry_after)
+        return self._submit(fn, *args)
+
+    async def run(self, fn, *args):
+        """Run fn(*args) on the inference pool and await the result."""
+        return await asyncio.wrap_future(self.try_submit(fn, *args))
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+        }
+
+    def shutdown(self, wait: bool = True):
+        self._pool.shutdown(wait=wait)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def get_inference_executor() -> InferenceExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                workers = os.getenv("ASTA_INFERENCE_WORKERS")
+                queue = os.getenv("ASTA_INFERENCE_QUEUE")
+                _executor = InferenceExecutor(
+                    max_workers=int(workers) if workers else None,
+                    max_queue=int(queue) if queue else None,
+                    retry_after=int(os.getenv("ASTA_INFERENCE_RETRY_AFTER", "1")),
+                )
+    return _executor
@@ -0,0 +1,105 @@
+import hashlib
+import json
+import re
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+# A keyword is either a phrase ("remind me") or a (phrase, weight) pair
+Keyword = Union[str, Tuple[str, float]]
+
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+class IntentMatcher:
+    """
+    Word-boundary keyword matcher compiled once from an intent table.
+
+    All phrases are folded into one regex alternation (longest phrases first),
+    so a message is matched by a single left-to-right scan in the regex
+    engine. At every position only the longest phrase counts, so
+    "delete tasks" doesn't also score "tasks", and "add" never matches inside
+    "address".
+
+    match() returns every matching intent with its summed phrase weights,
+    best first; ties go to the intent listed first in the table. `digest`
+    identifies what the table matches, the same in every process.
+    """
+
+    def __init__(self, intents: Dict[str, Iterable[Keyword]]):
+        self.intents = list(intents)
+        self._order = {intent: i for i, intent in enumerate(self.intents)}
+        self._phrases: Dict[str, List[Tuple[str, float]]] = {}
+        for intent, keywords in intents.items():
+            for keyword in keywords:
+                phrase, weight = (keyword, 1.0) if isinstance(keyword, str) else keyword
+                tokens = tokenize(phrase)
+                if tokens:
+                    self._phrases.setdefault(" ".join(tokens), []).append((intent, float(weight)))
+
+        alternation = "|".join(
+            r"\s+".join(re.escape(t) for t in phrase.split())
+            for phrase in sorted(self._phrases, key=len, reverse=True)
+        )
+        self._pattern = re.compile(rf"(?<![a-z0-9'])(?:{alternation})(?![a-z0-9'])") if alternation else None
+        table = json.dumps([self.intents, sorted(self._phrases.items())])
+        self.digest = hashlib.blake2s(table.encode(), digest_size=8).hexdigest()
+
+    def match(self, text: str) -> List[Tuple[str, float]]:
+        if self._pattern is None:
+            return []
+        scores: Dict[str, float] = {}
+        for m in self._pattern.finditer(text.lower()):
+            phrase = m.group()
+            entries = self._phrases.get(phrase) or self._phrases[" ".join(phrase.split())]
+            for intent, weight in entries:
+                scores[intent] = scores.get(intent, 0.0) + weight
+        if len(scores) < 2:
+            return list(scores.items())
+        return sorted(scores.items(), key=lambda kv: (-kv[1], self._order[kv[0]]))
+
+    def best(self, text: str) -> Optional[str]:
+        matches = self.match(text)
+        return matches[0][0] if matches else None
+
+
+def _is_weight(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _keyword(intent: str, entry) -> Keyword:
+    if isinstance(entry, str):
+        return entry
+    if isinstance(entry, list) and len(entry) == 2 and isinstance(entry[0], str) and _is_weight(entry[1]):
+        return entry[0], entry[1]
+    raise ValueError(f"{intent}: {entry!r} is not a phrase or a [phrase, weight] pair")
+
+
+def load_intents(path: str) -> Dict[str, List[Keyword]]:
+    """
+    Read an intent table from JSON. Each intent maps either to a list of
+    phrases (or [phrase, weight] pairs) or to a {phrase: weight} object:
+
+        {"create_task": ["remind", "add"], "get_tasks": {"show": 1, "tasks": 0.5}}
+
+    Raises ValueError for anything else, so a malformed table is rejected
+    before it replaces the current one.
+    """
+    with open(path) as f:
+        raw = json.load(f)
+    if not isinstance(raw, dict):
+        raise ValueError("the table must be an object mapping intents to phrases")
+    intents = {}
+    for intent, keywords in raw.items():
+        if isinstance(keywords, dict):
+            for phrase, weight in keywords.items():
+                if not _is_weight(weight):
+                    raise ValueError(f"{intent}: weight of {phrase!r} is not a number")
+            intents[intent] = [(phrase, weight) for phrase, weight in keywords.items()]
+        elif isinstance(keywords, list):
+            intents[intent] = [_keyword(intent, entry) for entry in keywords]
+        else:
+            raise ValueError(f"{intent}: expected a list of phrases or a {{phrase: weight}} object")
+    return intents
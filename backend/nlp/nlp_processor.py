@@ -1,50 +1,195 @@
-import spacy
-from transformers import pipeline
+import os
+import threading
+from typing import List
 
-# Load spaCy for entities
-nlp_spacy = spacy.load("en_core_web_sm")
+from backend.nlp import cache as nlp_cache
+from backend.nlp.intent_matcher import IntentMatcher, load_intents
+from backend.nlp.registry import registry
+from backend.nlp.result import ParseResult
+from backend.utils.metrics import timed, timer
 
-# Hugging Face pipeline (still useful, fallback sentiment check)
-intent_classifier = pipeline("text-classification", model="distilbert-base-uncased-finetuned-sst-2-english")
+# Models are loaded by the registry (lazily or during app warm-up), never at
+# import time. spaCy is used for entities; the registry's IntentClassifier
+# (backend.nlp.classifier) labels text no rule matched and is absent in
+# rules-only mode.
 
-# Minimal ASTA intents
+# Intent returned for unmatched text when no classifier is configured
+FALLBACK_INTENT = "general_chat"
+
+# Batch size used for spaCy's nlp.pipe and the intent classifier
+BATCH_SIZE = int(os.getenv("ASTA_NLP_BATCH_SIZE", "32"))
+
+# Minimal ASTA intents. Phrases match on word boundaries; nouns get a lower
+# weight than verbs so "delete the tasks" resolves to delete_task.
+# Can be overridden with a JSON file (see intent_matcher.load_intents).
 ASTA_INTENTS = {
-    "create_task": ["remind", "add", "schedule", "create"],
-    "get_tasks": ["show", "list", "tasks", "what do I", "fetch"],
-    "delete_task": ["delete", "remove", "cancel"],
+    "create_task": ["remind", "remind me", "reminder", "add", "schedule", "create", "new task",
+                    "don't forget", "dont forget", "note to self"],
+    "get_tasks": ["show", "list", ("tasks", 0.5), ("task list", 1.0), "what do i", "what do i have",
+                  "what's on", "whats on", "fetch", "agenda", "todo", "to do list"],
+    "delete_task": ["delete", "remove", "cancel", "drop", "get rid of"],
+    "complete_task": ["complete", "completed", "done", "finish", "finished", "mark", "check off", "tick off"],
+    "find_task": ["find", "search", "search for", "look up", "look for", "where is"],
 }
 
-def extract_entities(text: str):
-    doc = nlp_spacy(text)
+INTENTS_PATH = os.getenv("ASTA_INTENTS_PATH")
+
+_matcher = None
+_matcher_lock = threading.Lock()
+
+def reload_intents(path: str = None) -> IntentMatcher:
+    """
+    (Re)build the compiled intent matcher from `path`, ASTA_INTENTS_PATH or
+    the built-in table, and swap it in. Safe to call while serving.
+    """
+    global _matcher
+    path = path or INTENTS_PATH
+    intents = load_intents(path) if path else ASTA_INTENTS
+    matcher = IntentMatcher(intents)
+    with _matcher_lock:
+        _matcher = matcher
+    return matcher
+
+def get_matcher() -> IntentMatcher:
+    if _matcher is None:
+        reload_intents()
+    return _matcher
+
+def match_intents(text: str):
+    """All rule-matched intents for text with their scores, best first."""
+    return get_matcher().match(text)
+
+# ---------- Result cache ----------
+# parse results are cached on the whitespace-normalized text plus the model
+# version and the digest of the intent table, so a shared (SQLite) cache never
+# serves results of another table, in another worker or after a restart. Only raw entity text is cached; dates are resolved afterwards by
+# parse_due_date, so "tomorrow" stays relative to the current day.
+result_cache = nlp_cache.cache_from_env()
+
+# Bump when the shape of cached results changes (the intent table is in the key)
+RESULT_FORMAT = 5
+
+def _cache_key(kind: str, text: str) -> str:
+    intents = get_matcher().digest
+    return f"{kind}|{RESULT_FORMAT}|{registry.version}|{intents}|{nlp_cache.normalize(text)}"
+
+def _cached(kind: str, text: str, compute):
+    if result_cache is None:
+        return compute(text)
+    key = _cache_key(kind, text)
+    value = result_cache.get(key)
+    if value is None:
+        value = compute(text)
+        result_cache.set(key, value)
+    return value
+
+def cache_stats() -> dict:
+    return result_cache.stats() if result_cache is not None else {"backend": "off"}
+
+def _entities_from_doc(doc):
     entities = {}
     for ent in doc.ents:
         entities[ent.label_] = ent.text
     return entities
 
+def _rule_intent(text: str):
+    return get_matcher().best(text)
+
+def extract_entities(text: str):
+    return dict(_cached("entities", text, _extract_entities))
+
+@timed("extract_entities")
+def _extract_entities(text: str):
+    return _entities_from_doc(registry.spacy()(text))
+
 def detect_intent(text: str):
+    return _cached("intent", text, _detect_intent)
+
+@timed("detect_intent")
+def _detect_intent(text: str):
     # Rule-based mapping
-    lowered = text.lower()
-    for intent, keywords in ASTA_INTENTS.items():
-        if any(keyword in lowered for keyword in keywords):
-            return intent
-
-    # Fallback to Hugging Face sentiment model
-    result = intent_classifier(text)[0]['label']
-    return f"general_chat_{result.lower()}"
-
-def parse_input(text: str):
-    intent = detect_intent(text)
-    entities = extract_entities(text)
-    return {
-        "intent": intent,
-        "entities": entities
-    }
+    intent = _rule_intent(text)
+    if intent:
+        return intent
+
+    intent_classifier = registry.classifier()
+    if intent_classifier is None:
+        return FALLBACK_INTENT
+    with timer("classifier"):
+        return intent_classifier.predict([text])[0]
+
+def parse_input(text: str) -> ParseResult:
+    """
+    Returns a ParseResult: the intent, every entity span and the task ID.
+    """
+    return ParseResult.from_row(_cached("parse", text, _parse_input))
+
+def _parse_input(text: str):
+    intent = _detect_intent(text)
+    with timer("extract_entities"):
+        doc = registry.spacy()(text)
+    return ParseResult.from_doc(intent, doc).to_row()
+
+# ---------- Batched inference ----------
+@timed("detect_intent_batch")
+def detect_intents(texts: List[str]) -> List[str]:
+    intents = [_rule_intent(t) for t in texts]
+
+    # Only texts that missed every rule go through the classifier, in one batch
+    fallback = [i for i, intent in enumerate(intents) if intent is None]
+    if not fallback:
+        return intents
+
+    intent_classifier = registry.classifier()
+    if intent_classifier is None:
+        for i in fallback:
+            intents[i] = FALLBACK_INTENT
+    else:
+        with timer("classifier_batch"):
+            predictions = intent_classifier.predict([texts[i] for i in fallback], batch_size=BATCH_SIZE)
+        for i, prediction in zip(fallback, predictions):
+            intents[i] = prediction
+    return intents
+
+def _docs(texts: List[str]):
+    return registry.spacy().pipe(texts, batch_size=BATCH_SIZE)
+
+def extract_entities_batch(texts: List[str]) -> List[dict]:
+    return [_entities_from_doc(doc) for doc in _docs(texts)]
+
+def parse_batch(texts: List[str]) -> List[ParseResult]:
+    """
+    Batched equivalent of parse_input: one nlp.pipe pass and at most one
+    classifier call for the texts that aren't already cached.
+    """
+    if not texts:
+        return []
+    results = [None] * len(texts)
+    keys = [None] * len(texts)
+    if result_cache is not None:
+        for i, text in enumerate(texts):
+            keys[i] = _cache_key("parse", text)
+            results[i] = result_cache.get(keys[i])
+
+    misses = [i for i, r in enumerate(results) if r is None]
+    if misses:
+        miss_texts = [texts[i] for i in misses]
+        intents = detect_intents(miss_texts)
+        with timer("extract_entities_batch"):
+            docs = list(_docs(miss_texts))
+        for i, intent, doc in zip(misses, intents, docs):
+            results[i] = ParseResult.from_doc(intent, doc).to_row()
+            if result_cache is not None:
+                result_cache.set(keys[i], results[i])
+
+    return [ParseResult.from_row(r) for r in results]
 
 if __name__ == "__main__":
     samples = [
         "Remind me tomorrow at 5 pm to study math.",
         "Show me my tasks for today.",
         "Delete the meeting task.",
+        "Find the dentist appointment.",
         "How are you today?"
     ]
     for s in samples:
@@ -0,0 +1,193 @@
+import gc
+import importlib
+import os
+import threading
+import time
+
+# "full" loads spaCy + the fallback intent classifier, "rules-only" skips
+# the classifier fallback.
+NLP_MODE = os.getenv("ASTA_NLP_MODE", "full")
+
+# When to load the models:
+#   "background" - start loading in a thread at app startup (default)
+#   "blocking"   - load during startup, before the app accepts requests
+#   "import"     - load when this module is imported (for pre-fork servers,
+#                  e.g. gunicorn --preload, so workers share the weights)
+#   "lazy"       - load on first use
+WARMUP = os.getenv("ASTA_NLP_WARMUP", "background")
+
+SPACY_MODEL = os.getenv("ASTA_SPACY_MODEL", "en_core_web_sm")
+
+# Classifier for text no intent rule matches (see backend.nlp.classifier):
+#   "linear"      - hashed n-gram linear model over the ASTA intents (default),
+#                   loaded from ASTA_INTENT_MODEL_PATH or trained at load time
+#   "transformer" - the CLASSIFIER_MODEL sentiment pipeline, answering
+#                   general_chat_positive / general_chat_negative
+#   "none"        - always nlp_processor.FALLBACK_INTENT
+#   "pkg.module:factory" - any callable returning an IntentClassifier
+CLASSIFIER = os.getenv("ASTA_CLASSIFIER", "linear")
+INTENT_MODEL_PATH = os.getenv("ASTA_INTENT_MODEL_PATH")
+# Linear predictions less confident than this fall back to general_chat
+CLASSIFIER_MIN_CONFIDENCE = float(os.getenv("ASTA_CLASSIFIER_MIN_CONFIDENCE", "0.5"))
+# delete_task / complete_task need this much; unset, the linear model never
+# predicts them and only the intent rules can
+_mutating = os.getenv("ASTA_CLASSIFIER_MUTATING_MIN_CONFIDENCE")
+CLASSIFIER_MUTATING_MIN_CONFIDENCE = float(_mutating) if _mutating else None
+CLASSIFIER_MODEL = os.getenv("ASTA_CLASSIFIER_MODEL", "distilbert-base-uncased-finetuned-sst-2-english")
+
+# torch intra-op threads per inference worker (see backend.nlp.executor)
+TORCH_THREADS = int(os.getenv("ASTA_TORCH_THREADS", "1"))
+
+# "ner" loads only the components that produce doc.ents, "full" the whole
+# pipeline. en_core_web_sm's NER has its own embedded tok2vec, so dropping the
+# shared tok2vec, tagger, parser etc. doesn't change the entities.
+SPACY_PIPELINE = os.getenv("ASTA_SPACY_PIPELINE", "ner")
+NER_EXCLUDE = ["tok2vec", "tagger", "morphologizer", "parser", "senter", "attribute_ruler", "lemmatizer"]
+
+# CPU inference mode for the transformer classifier: dynamic int8 quantization of the
+# Linear layers and a cap on the tokenized sequence length.
+CLASSIFIER_QUANTIZE = os.getenv("ASTA_CLASSIFIER_QUANTIZE", "1") == "1"
+CLASSIFIER_MAX_LENGTH = int(os.getenv("ASTA_CLASSIFIER_MAX_LENGTH", "64"))
+
+
+class ModelRegistry:
+    """
+    Process-wide holder for the NLP models. Each model is loaded at most once,
+    on first access or by warm_up(), and is read-only afterwards.
+    """
+
+    def __init__(self, mode: str = NLP_MODE, spacy_pipeline: str = SPACY_PIPELINE,
+                 quantize: bool = CLASSIFIER_QUANTIZE, max_length: int = CLASSIFIER_MAX_LENGTH,
+                 classifier: str = CLASSIFIER):
+        self.mode = mode
+        self.classifier_kind = classifier
+        self.spacy_pipeline = spacy_pipeline
+        self.quantize = quantize
+        self.max_length = max_length
+        self._spacy = None
+        self._classifier = None
+        self._version = None
+        self._lock = threading.Lock()
+        self.load_seconds = {}
+
+    @property
+    def rules_only(self) -> bool:
+        return self.mode == "rules-only"
+
+    def spacy(self):
+        if self._spacy is None:
+            with self._lock:
+                if self._spacy is None:
+                    start = time.perf_counter()
+                    import spacy
+                    exclude = NER_EXCLUDE if self.spacy_pipeline == "ner" else []
+                    self._spacy = spacy.load(SPACY_MODEL, exclude=exclude)
+                    self.load_seconds["spacy"] = time.perf_counter() - start
+        return self._spacy
+
+    def classifier(self):
+        """The fallback IntentClassifier, or None in rules-only mode or with ASTA_CLASSIFIER=none."""
+        if self.rules_only or self.classifier_kind == "none":
+            return None
+        if self._classifier is None:
+            with self._lock:
+                if self._classifier is None:
+                    start = time.perf_counter()
+                    self._classifier = self._load_classifier()
+                    self.load_seconds["classifier"] = time.perf_counter() - start
+        return self._classifier
+
+    def _load_classifier(self):
+        from backend.nlp import classifier as intent_classifier
+        if self.classifier_kind == "linear":
+            return intent_classifier.load(INTENT_MODEL_PATH, CLASSIFIER_MIN_CONFIDENCE,
+                                          CLASSIFIER_MUTATING_MIN_CONFIDENCE)
+        if self.classifier_kind == "transformer":
+            import torch
+            from transformers import pipeline
+            torch.set_num_threads(TORCH_THREADS)
+            classifier = pipeline(
+                "text-classification",
+                model=CLASSIFIER_MODEL,
+                device=-1,
+                truncation=True,
+                max_length=self.max_length,
+            )
+            if self.quantize:
+                classifier.model = torch.quantization.quantize_dynamic(
+                    classifier.model, {torch.nn.Linear}, dtype=torch.qint8
+                )
+            return intent_classifier.SentimentClassifier(classifier)
+        module, _, factory = self.classifier_kind.partition(":")
+        return getattr(importlib.import_module(module), factory)()
+
+    def _classifier_version(self) -> str:
+        if self.rules_only or self.classifier_kind == "none":
+            return "none"
+        if self.classifier_kind == "linear":
+            from backend.nlp.classifier import BUILTIN_VERSION
+            thresholds = f"{CLASSIFIER_MIN_CONFIDENCE}:{CLASSIFIER_MUTATING_MIN_CONFIDENCE}"
+            if not INTENT_MODEL_PATH:
+                return f"linear:builtin{BUILTIN_VERSION}:{thresholds}"
+            # A retrained model saved over the same path gets other keys
+            try:
+                st = os.stat(INTENT_MODEL_PATH)
+                model = f"{INTENT_MODEL_PATH}@{st.st_size}.{st.st_mtime_ns}"
+            except OSError:
+                model = INTENT_MODEL_PATH
+            return f"linear:{model}:{thresholds}"
+        if self.classifier_kind == "transformer":
+            return f"transformer:{CLASSIFIER_MODEL}:{'int8' if self.quantize else 'fp32'}:{self.max_length}"
+        return self.classifier_kind
+
+    @property
+    def version(self) -> str:
+        """
+        Identifies the models' outputs; part of the NLP result cache key.
+        Derived from configuration alone, so it is the same before and after
+        the models load and in every worker.
+        """
+        if self._version is None:
+            self._version = f"{self.mode}:{SPACY_MODEL}:{self.spacy_pipeline}:{self._classifier_version()}"
+        return self._version
+
+    @property
+    def ready(self) -> bool:
+        return self._spacy is not None and (
+            self.rules_only or self.classifier_kind == "none" or self._classifier is not None
+        )
+
+    def warm_up(self, freeze: bool = True):
+        """
+        Load every model and run one inference so lazy initialisation inside
+        spaCy/torch happens now rather than on the first request.
+
+        With freeze=True the loaded objects are moved to the permanent GC
+        generation, so forked workers don't touch (and copy) their pages
+        during collections.
+        """
+        self.spacy()("warm up")
+        classifier = self.classifier()
+        if classifier is not None:
+            classifier.predict(["warm up"])
+        if freeze:
+            gc.collect()
+            gc.freeze()
+
+    def status(self) -> dict:
+        return {
+            "mode": self.mode,
+            "spacy_pipeline": self.spacy_pipeline,
+            "classifier": self.classifier_kind,
+            "classifier_quantized": self.quantize,
+            "ready": self.ready,
+            "spacy_loaded": self._spacy is not None,
+            "classifier_loaded": self._classifier is not None,
+            "load_seconds": dict(self.load_seconds),
+        }
+
+
+registry = ModelRegistry()
+
+if WARMUP == "import":
+    registry.warm_up()
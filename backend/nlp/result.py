@@ -0,0 +1,106 @@
+"""
+Structured parse results.
+
+spaCy's entities are kept as spans (label, character offsets, text and a
+normalized value) so later stages - title cleaning, due dates, task IDs -
+reuse them instead of scanning the raw text again, and a message with two
+DATEs keeps both.
+"""
+import re
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+# Labels whose all-digit values are stored as ints
+NUMERIC_LABELS = frozenset({"CARDINAL", "TASK_ID"})
+# Numbers inside these spans are never taken for a task ID ("on 15 march",
+# "at 5 pm", "pay 50 dollars")
+NON_ID_LABELS = frozenset({"DATE", "TIME", "MONEY", "PERCENT", "QUANTITY", "ORDINAL"})
+# A bare number next to a month name is a day, even when tagged CARDINAL
+_MONTH = re.compile(r"^(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?$", re.I)
+
+
+class Span(NamedTuple):
+    label: str
+    start: int
+    end: int
+    text: str
+    value: Union[str, int]
+
+
+def normalize_value(label: str, text: str) -> Union[str, int]:
+    value = " ".join(text.lower().split())
+    if label in NUMERIC_LABELS and value.isdigit():
+        return int(value)
+    return value
+
+
+def _bare_number(tokens, spans) -> Optional[int]:
+    """The first number that isn't part of a date, time or amount."""
+    blocked = [(s.start, s.end) for s in spans if s.label in NON_ID_LABELS]
+    for i, tok in enumerate(tokens):
+        if not tok.is_digit or any(start <= tok.idx < end for start, end in blocked):
+            continue
+        neighbours = tokens[max(i - 1, 0):i] + tokens[i + 1:i + 2]
+        if any(_MONTH.match(n.text) for n in neighbours):
+            continue
+        return int(tok.text)
+    return None
+
+
+class ParseResult:
+    """
+    Intent plus entity spans for one message. Immutable once built, so cached
+    instances can be handed out without copying.
+    """
+
+    __slots__ = ("intent", "spans", "task_id", "_entities")
+
+    def __init__(self, intent: str, spans: Tuple[Span, ...] = (), task_id: Optional[int] = None):
+        self.intent = intent
+        self.spans = tuple(spans)
+        # The TASK_ID entity, or else the first number outside dates, times
+        # and amounts; found while the spaCy doc is at hand
+        self.task_id = task_id
+        self._entities = None
+
+    @classmethod
+    def from_doc(cls, intent: str, doc) -> "ParseResult":
+        spans = tuple(
+            Span(ent.label_, ent.start_char, ent.end_char, ent.text, normalize_value(ent.label_, ent.text))
+            for ent in doc.ents
+        )
+        task_id = next((s.value for s in spans if s.label == "TASK_ID" and isinstance(s.value, int)), None)
+        if task_id is None:
+            task_id = _bare_number(list(doc), spans)
+        return cls(intent, spans, task_id)
+
+    @property
+    def entities(self) -> Dict[str, str]:
+        """Backward-compatible {label: text} view; the last span of a label wins."""
+        if self._entities is None:
+            self._entities = {span.label: span.text for span in self.spans}
+        return dict(self._entities)
+
+    def first_entities(self) -> Dict[str, str]:
+        """{label: text} keeping the first span of each label."""
+        entities = {}
+        for span in self.spans:
+            entities.setdefault(span.label, span.text)
+        return entities
+
+    def all(self, label: str) -> List[Span]:
+        return [span for span in self.spans if span.label == label]
+
+    def first(self, label: str) -> Optional[Span]:
+        return next((span for span in self.spans if span.label == label), None)
+
+    # Compact JSON-friendly form for the result cache
+    def to_row(self) -> list:
+        return [self.intent, self.task_id, [list(span) for span in self.spans]]
+
+    @classmethod
+    def from_row(cls, row) -> "ParseResult":
+        intent, task_id, spans = row
+        return cls(intent, (Span(*span) for span in spans), task_id)
+
+    def __repr__(self):
+        return f"ParseResult(intent={self.intent!r}, spans={list(self.spans)!r}, task_id={self.task_id!r})"
@@ -1,79 +1,150 @@
+import json
+import os
 import re
-import dateparser
-from datetime import datetime, timedelta
-from typing import Dict, Optional, Tuple
+from typing import Dict, Optional, Sequence
 
-def clean_title(text: str, entities: Dict[str, str]) -> str:
+# Date resolution lives in backend.utils.date_utils; re-exported for callers
+# that import it from here.
+from backend.utils.date_utils import parse_due_date  # noqa: F401
+from backend.utils.metrics import timed
+
+# Default title-cleaning vocabulary; override with a JSON file named by
+# ASTA_TITLE_CONFIG: {"triggers": [...], "fillers": [...], "labels": [...]}
+TITLE_TRIGGERS = [
+    "remind me", "please remind", "note to self", "don't forget", "dont forget",
+    "add a task", "add task", "create a task", "create task", "new task", "please",
+]
+TITLE_FILLERS = ["on", "at", "by", "to", "in", "for"]
+# Entity labels cut out of titles; names, places etc. stay part of the title
+TITLE_ENTITY_LABELS = ["DATE", "TIME"]
+
+
+# Words around the task named in a delete/complete/find request
+# ("delete the meeting task" -> "meeting")
+REFERENCE_TRIGGERS = [
+    "delete", "remove", "cancel", "drop", "get rid of", "complete", "finish", "mark", "mark off",
+    "check off", "tick off", "as done", "as complete", "as completed", "as finished", "is done",
+    "find", "search for", "search", "look up", "look for", "where is", "please",
+]
+REFERENCE_FILLERS = ["the", "a", "an", "my", "task", "to", "do", "item", "for", "off", "done"]
+
+_EDGE_PUNCT = " \t\n,.;:!?"
+
+
+class TitleCleaner:
     """
-    Remove common intent phrases and entity words from task title.
+    Builds a task title from a message by cutting out the date/time entity
+    spans and the trigger phrases.
+
+    Entities are removed by their character offsets in one pass, so only the
+    exact text spaCy tagged goes (never a substring of another word). Trigger
+    phrases are matched on whole words. Filler words ("at", "to", ...) are
+    only dropped where they border a removed span or the start/end of the
+    title, so "talk to Sam" keeps its "to".
     """
-    title = text.lower()
 
-    # Remove trigger phrases
-    title = re.sub(r"\b(remind me|please remind|note to self)\b", "", title)
+    def __init__(self, triggers: Sequence[str] = TITLE_TRIGGERS, fillers: Sequence[str] = TITLE_FILLERS,
+                 labels: Sequence[str] = TITLE_ENTITY_LABELS):
+        self.labels = frozenset(labels)
+        self.fillers = frozenset(f.lower() for f in fillers)
+        # Trigger phrases as word tuples, indexed by first word, longest first
+        self._triggers: Dict[str, list] = {}
+        for phrase in sorted(triggers, key=lambda p: len(p.split()), reverse=True):
+            words = tuple(phrase.lower().split())
+            if words:
+                self._triggers.setdefault(words[0], []).append(words)
+
+    @classmethod
+    def from_config(cls, path: Optional[str]) -> "TitleCleaner":
+        if not path:
+            return cls()
+        with open(path) as f:
+            config = json.load(f)
+        return cls(
+            config.get("triggers", TITLE_TRIGGERS),
+            config.get("fillers", TITLE_FILLERS),
+            config.get("labels", TITLE_ENTITY_LABELS),
+        )
 
-    # Remove entity values (like Sunday, tomorrow)
-    for v in entities.values():
-        if v:
-            title = title.replace(v.lower(), "")
+    def _pieces(self, text: str, spans) -> list:
+        pieces, prev = [], 0
+        for start, end in sorted(spans):
+            if start >= prev:
+                pieces.append(text[prev:start])
+                prev = end
+        pieces.append(text[prev:])
+        return pieces
 
-    # Remove leftover filler words
-    title = re.sub(r"\b(on|at|by|to)\b", "", title)
+    def clean(self, text: str, spans: Sequence[Sequence[int]] = ()) -> str:
+        """`spans` are the (start_char, end_char) offsets of entities to remove."""
+        kept = []
+        for piece in self._pieces(text, spans):
+            words = self._drop_triggers(piece.split())
+            # Every piece starts at the title start or right after a span, and
+            # ends at the title end or right before one: drop fillers there
+            i, j = 0, len(words)
+            while i < j and words[i].strip(_EDGE_PUNCT).lower() in self.fillers:
+                i += 1
+            while j > i and words[j - 1].strip(_EDGE_PUNCT).lower() in self.fillers:
+                j -= 1
+            piece = " ".join(words[i:j]).strip(_EDGE_PUNCT)
+            if piece:
+                kept.append(piece)
+        title = " ".join(kept)
+        return title[:1].upper() + title[1:]
 
-    # Clean up extra spaces + capitalize first letter
-    return title.strip().capitalize() or "Untitled Task"
+    def _drop_triggers(self, words: list) -> list:
+        if not self._triggers:
+            return words
+        keys = [w.strip(_EDGE_PUNCT).lower() for w in words]
+        out, i, n = [], 0, len(words)
+        while i < n:
+            for phrase in self._triggers.get(keys[i], ()):
+                if tuple(keys[i:i + len(phrase)]) == phrase:
+                    i += len(phrase)
+                    break
+            else:
+                out.append(words[i])
+                i += 1
+        return out
 
 
-def parse_due_date(entities: Dict[str, str]) -> Tuple[Optional[datetime], bool]:
+title_cleaner = TitleCleaner.from_config(os.getenv("ASTA_TITLE_CONFIG"))
+reference_cleaner = TitleCleaner(REFERENCE_TRIGGERS, REFERENCE_FILLERS)
+
+
+def _value_spans(text: str, entities: Dict[str, str]):
+    # Offsets for callers that only have label -> text entities: first
+    # whole-word occurrence of each value
+    spans = []
+    for label, value in entities.items():
+        if value and label in title_cleaner.labels:
+            m = re.search(rf"(?<!\w){re.escape(value)}(?!\w)", text, re.I)
+            if m:
+                spans.append((m.start(), m.end()))
+    return spans
+
+
+@timed("task_reference")
+def task_reference(text: str, spans: Sequence = ()) -> str:
+    """
+    The words naming a task in a delete/complete/find request, for a title
+    search: "Mark the report as done" -> "report". Empty if nothing is left.
     """
-    Parse DATE/TIME entities and detect if it's all-day.
-    Returns (due_date: datetime | None, all_day: bool)
+    offsets = [(span[1], span[2]) for span in spans if span[0] in reference_cleaner.labels]
+    return reference_cleaner.clean(text, offsets)
+
+
+@timed("clean_title")
+def clean_title(text: str, entities: Dict[str, str], spans: Optional[Sequence] = None) -> str:
+    """
+    Remove common intent phrases and entity words from task title.
 
-    - Uses dateparser with preference for future dates.
-    - If DATE+TIME both present, parse the combined string.
-    - If only DATE present and no time pattern, mark all_day = True.
-    - If only TIME is present, attach to today; roll to tomorrow if that time already passed.
+    `spans` are the entity spans of a ParseResult (label, start_char,
+    end_char, ...); without them entity values are located in the text.
     """
-    all_day = False
-    due_date: Optional[datetime] = None
-
-    date_str = entities.get("DATE")
-    time_str = entities.get("TIME")
-
-    settings = {"PREFER_DATES_FROM": "future"}  # prefer future dates
-
-    # 1) If both DATE and TIME are present, parse them together
-    if date_str and time_str:
-        combined = f"{date_str} {time_str}"
-        parsed = dateparser.parse(combined, settings=settings)
-        if parsed:
-            due_date = parsed
-            all_day = False
-
-    # 2) If only DATE is present
-    elif date_str:
-        parsed = dateparser.parse(date_str, settings=settings)
-        if parsed:
-            due_date = parsed
-            # If no explicit time pattern in the DATE string, treat as all-day
-            has_time_pattern = bool(re.search(r"\d{1,2}(:\d{2})?\s*(am|pm)?", date_str, re.I))
-            if not has_time_pattern:
-                all_day = True
-
-    # 3) If only TIME is present
-    elif time_str:
-        parsed = dateparser.parse(time_str, settings=settings)
-        if parsed:
-            # If the parsed time (today at that time) is already past, roll to tomorrow
-            now = datetime.now()
-            if parsed < now:
-                parsed = parsed + timedelta(days=1)
-            due_date = parsed
-            all_day = False
-
-    # If parsed is still not None and it looks like midnight but user gave a time,
-    # ensure all_day is False (defensive)
-    if due_date and (time_str or (date_str and re.search(r"\d", date_str))):
-        all_day = all_day and not bool(time_str)
-
-    return due_date, all_day
+    if spans is None:
+        offsets = _value_spans(text, entities)
+    else:
+        offsets = [(span[1], span[2]) for span in spans if span[0] in title_cleaner.labels]
+    return title_cleaner.clean(text, offsets) or "Untitled Task"
@@ -0,0 +1,202 @@
+"""
+Production entry point: a pre-fork server for backend.api.main:app.
+
+    python -m backend.serve --workers 4 --port 8000
+
+The master process imports the app with ASTA_NLP_WARMUP=import, so spaCy
+and the classifier are loaded (and gc.freeze()d) once, then forks the
+workers. Each worker runs its own uvicorn event loop on the shared listening
+socket and reads the model weights through copy-on-write pages instead of
+loading a copy, so RSS grows by the per-worker heap, not by the models.
+
+Thread counts are split across workers before anything numeric is imported:
+each worker gets cores / workers torch and BLAS threads (--threads) and as
+many inference executor threads, so N workers never start N * cores
+threads. The master itself runs inference single-threaded during warm-up,
+which keeps OpenMP's thread pool uninitialized across fork().
+
+Signals to the master:
+    HUP          re-read the intent table (ASTA_INTENTS_PATH), then start a
+                 fresh set of workers and stop the old ones gracefully
+                 (in-flight requests finish). POST /nlp/intents/reload sends
+                 it, so every worker switches tables, not just the one that
+                 got the request. Like gunicorn --preload, the app and
+                 models are not re-imported: restart the master to pick up
+                 new code
+    TERM / INT   graceful shutdown
+Workers that die are replaced.
+"""
+import argparse
+import os
+import signal
+import socket
+import sys
+import time
+
+# Read by the NLP registry, the inference executor and the numeric libraries
+# at import time, so they are set before the app is imported
+_THREAD_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+
+
+def _bind(host: str, port: int, backlog: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _configure_threads(threads: int):
+    preload = os.environ.setdefault("ASTA_NLP_WARMUP", "import") == "import"
+    os.environ.setdefault("ASTA_INFERENCE_WORKERS", str(threads))
+    for var in _THREAD_VARS:
+        os.environ.setdefault(var, str(threads))
+    # A preloading master runs its warm-up single-threaded and the workers
+    # switch to `threads` after fork; otherwise each worker loads with them
+    os.environ["ASTA_TORCH_THREADS"] = "1" if preload else str(threads)
+
+
+class Master:
+    def __init__(self, app, sock: socket.socket, workers: int, threads: int, graceful_timeout: float,
+                 uvicorn_kwargs: dict):
+        self.app = app
+        self.sock = sock
+        self.workers = workers
+        self.threads = threads
+        self.graceful_timeout = graceful_timeout
+        self.uvicorn_kwargs = uvicorn_kwargs
+        self.children = set()
+        self._reload = False
+        self._stop = False
+
+    # ---------- Workers ----------
+    def _worker(self):
+        import uvicorn
+
+        for sig in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, signal.SIG_DFL)
+        if "torch" in sys.modules:
+            sys.modules["torch"].set_num_threads(self.threads)
+        # Connections inherited from the master must not be shared
+        from backend.db import session
+        session.engine.dispose(close=False)
+
+        config = uvicorn.Config(self.app, lifespan="on", **self.uvicorn_kwargs)
+        uvicorn.Server(config).run(sockets=[self.sock])
+
+    def spawn(self) -> int:
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                self._worker()
+            except BaseException:
+                import traceback
+                traceback.print_exc()
+                code = 1
+            finally:
+                os._exit(code)
+        self.children.add(pid)
+        return pid
+
+    def _signal(self, pids, sig):
+        for pid in pids:
+            try:
+                os.kill(pid, sig)
+            except ProcessLookupError:
+                pass
+
+    def _reap(self):
+        while True:
+            try:
+                pid, _status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            self.children.discard(pid)
+
+    def _wait_for(self, pids, timeout: float):
+        deadline = time.monotonic() + timeout
+        while pids & self.children and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.1)
+        self._signal(pids & self.children, signal.SIGKILL)
+        self._reap()
+
+    # ---------- Master loop ----------
+    def _reload_intents(self):
+        # Workers forked after this inherit the new table
+        from backend.nlp import nlp_processor
+        try:
+            nlp_processor.reload_intents()
+        except Exception:
+            import traceback
+            traceback.print_exc()
+            print("asta: keeping the previous intent table", flush=True)
+
+    def _on_hup(self, *_):
+        self._reload = True
+
+    def _on_stop(self, *_):
+        self._stop = True
+
+    def run(self):
+        signal.signal(signal.SIGHUP, self._on_hup)
+        signal.signal(signal.SIGTERM, self._on_stop)
+        signal.signal(signal.SIGINT, self._on_stop)
+        # Lets a worker's /nlp/intents/reload signal this process
+        os.environ["ASTA_MASTER_PID"] = str(os.getpid())
+        for _ in range(self.workers):
+            self.spawn()
+        print(f"asta: master {os.getpid()} serving with {self.workers} workers", flush=True)
+
+        while not self._stop:
+            self._reap()
+            if self._reload:
+                self._reload = False
+                self._reload_intents()
+                old = set(self.children)
+                for _ in range(self.workers):
+                    self.spawn()
+                self._signal(old, signal.SIGTERM)
+                self._wait_for(old, self.graceful_timeout)
+            # Replace workers that exited on their own
+            for _ in range(self.workers - len(self.children)):
+                self.spawn()
+            time.sleep(0.5)
+
+        current = set(self.children)
+        self._signal(current, signal.SIGTERM)
+        self._wait_for(current, self.graceful_timeout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=os.getenv("ASTA_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("ASTA_PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("ASTA_WORKERS", str(os.cpu_count() or 1))))
+    parser.add_argument("--threads", type=int, default=None,
+                        help="torch/BLAS/inference threads per worker (default: cores / workers)")
+    parser.add_argument("--backlog", type=int, default=2048)
+    parser.add_argument("--graceful-timeout", type=float, default=30.0)
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    workers = max(1, args.workers)
+    threads = args.threads or max(1, (os.cpu_count() or 1) // workers)
+    _configure_threads(threads)
+
+    sock = _bind(args.host, args.port, args.backlog)
+    # Loads the models in this process (ASTA_NLP_WARMUP=import)
+    from backend.api.main import app
+
+    Master(app, sock, workers, threads, args.graceful_timeout, {
+        "log_level": args.log_level,
+        "timeout_graceful_shutdown": args.graceful_timeout,
+    }).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,252 @@
-from typing import Dict, Optional
+import os
+import re
+import threading
+from datetime import datetime, time, timedelta
+from typing import Dict, Optional, Tuple
 import dateparser
 
-def parse_due_date(entities: Dict[str, str]) -> Optional[str]:
+from backend.utils.metrics import timed
+
+AGENDA_WINDOWS = ("today", "week")
+
+# Optional IANA zone (e.g. "Europe/Berlin") that "now" is taken in. Results
+# stay naive wall-clock datetimes, like the values stored in tasks.due_date.
+TIMEZONE = os.getenv("ASTA_TIMEZONE") or None
+
+# Same behaviour as before (future dates preferred), pinned to English so
+# dateparser skips language detection.
+DATEPARSER_LANGUAGES = ["en"]
+DATEPARSER_SETTINGS = {"PREFER_DATES_FROM": "future"}
+
+FAST_PATH = os.getenv("ASTA_DATE_FAST_PATH", "1") == "1"
+MEMO_SIZE = int(os.getenv("ASTA_DATE_MEMO_SIZE", "4096"))
+
+
+def now_in(tz: Optional[str] = TIMEZONE) -> datetime:
+    if not tz:
+        return datetime.now()
+    from zoneinfo import ZoneInfo
+    return datetime.now(ZoneInfo(tz)).replace(tzinfo=None)
+
+
+# ---------- Fast path ----------
+# Resolutions are
+#   ("rel", timedelta)  - an offset from now: "tomorrow", "in 2 hours";
+#   ("clock", time)     - the next time the clock shows it, today or, once it
+#                         has passed, tomorrow: "5 pm", "noon";
+#   ("day", datetime)   - a fixed point that only depends on the reference
+#                         day: "today at 5 pm", "friday";
+#   ("abs", (datetime, since)) - what dateparser gave at `since` for anything
+#                         else; see _still_valid.
+
+_WEEKDAYS = {
+    name: i for i, names in enumerate([
+        ("monday", "mon"), ("tuesday", "tue", "tues"), ("wednesday", "wed"), ("thursday", "thu", "thurs"),
+        ("friday", "fri"), ("saturday", "sat"), ("sunday", "sun"),
+    ]) for name in names
+}
+_DAY_OFFSETS = {"today": 0, "tomorrow": 1, "yesterday": -1}
+_UNIT_SECONDS = {"minute": 60, "min": 60, "hour": 3600, "hr": 3600, "day": 86400, "week": 604800}
+
+_IN_RE = re.compile(r"in (an?|\d+) (minute|min|hour|hr|day|week)s?")
+_DAY_TIME_RE = re.compile(
+    r"(?:(?P<day>today|tomorrow|yesterday)|(?:on )?(?P<weekday>" + "|".join(_WEEKDAYS) + r"))?"
+    r"(?: ?(?:at )?(?:(?P<noon>noon)|(?P<hour>\d{1,2})(?::(?P<minute>\d{2}))? ?(?P<ampm>am|pm)?))?"
+)
+_AMPM_RE = re.compile(r"\b([ap])\.m\.?")
+
+
+def _normalize(expression: str) -> str:
+    expr = _AMPM_RE.sub(r"\1m", expression.lower().replace(",", " "))
+    return " ".join(expr.split()).rstrip(".")
+
+
+def _clock(m) -> Optional[time]:
+    if m.group("noon"):
+        return time(12, 0)
+    hour, minute, ampm = m.group("hour"), m.group("minute"), m.group("ampm")
+    if hour is None:
+        return None
+    # A bare number ("5") could be a day of the month; leave that to dateparser
+    if minute is None and ampm is None:
+        raise ValueError(hour)
+    h, mi = int(hour), int(minute or 0)
+    if ampm:
+        if not 1 <= h <= 12:
+            raise ValueError(hour)
+        h = h % 12 + (12 if ampm.startswith("p") else 0)
+    if h > 23 or mi > 59:
+        raise ValueError(hour)
+    return time(h, mi)
+
+
+def _fast_path(expr: str, now: datetime):
+    m = _IN_RE.fullmatch(expr)
+    if m:
+        count = 1 if m.group(1) in ("a", "an") else int(m.group(1))
+        return ("rel", timedelta(seconds=count * _UNIT_SECONDS[m.group(2)]))
+
+    m = _DAY_TIME_RE.fullmatch(expr)
+    if not m or not expr:
+        return None
+    try:
+        clock = _clock(m)
+    except ValueError:
+        return None
+
+    day, weekday = m.group("day"), m.group("weekday")
+    if weekday:
+        # Next occurrence strictly after today
+        ahead = (_WEEKDAYS[weekday] - now.weekday() - 1) % 7 + 1
+        return ("day", datetime.combine(now.date() + timedelta(days=ahead), clock or time.min))
+    if day is None:
+        # A bare clock time; with no day named, dateparser prefers the future
+        return ("clock", clock)
+    if clock is None:
+        # "today" / "tomorrow" keep the current time of day, as dateparser does
+        return ("rel", timedelta(days=_DAY_OFFSETS[day]))
+    return ("day", datetime.combine(now.date() + timedelta(days=_DAY_OFFSETS[day]), clock))
+
+
+def _dateparser_resolution(expr: str, now: datetime):
+    def parse(base):
+        settings = dict(DATEPARSER_SETTINGS, RELATIVE_BASE=base)
+        return dateparser.parse(expr, languages=DATEPARSER_LANGUAGES, settings=settings)
+
+    first = parse(now)
+    if first is None:
+        return ("none", None)
+    # Parse against a base one second later to tell "in 2 hours" (moves with
+    # now) from "5:00:00 pm" (fixed, until now passes it)
+    second = parse(now + timedelta(seconds=1))
+    if second == first:
+        return ("abs", (first, now))
+    if second - first == timedelta(seconds=1):
+        return ("rel", first - now)
+    return ("uncacheable", first)
+
+
+# ---------- Memo ----------
+_memo: Dict[tuple, tuple] = {}
+_memo_lock = threading.Lock()
+memo_hits = 0
+memo_misses = 0
+
+def clear_memo():
+    with _memo_lock:
+        _memo.clear()
+
+def _still_valid(resolution, now: datetime) -> bool:
+    # The +1s probe can't see that a future-preferring "5:00:00 pm" moves to
+    # tomorrow once 17:00 has passed, so a dateparser result is only reused
+    # while now hasn't passed it since it was computed
+    if resolution[0] != "abs":
+        return True
+    value, since = resolution[1]
+    return since <= now and not since <= value < now
+
+
+def resolve_date(expression: str, now: Optional[datetime] = None, tz: Optional[str] = TIMEZONE) -> Optional[datetime]:
+    """
+    Resolve a date/time expression relative to `now`, preferring future dates.
+
+    Frequent forms ("tomorrow", "at 5 pm", "friday", "in 2 hours", and their
+    combinations) are handled by the fast path; anything else goes to
+    dateparser. A time with no day ("5 pm") that has already passed today
+    means tomorrow. Resolutions are memoized per (expression, reference day,
+    tz).
     """
-    Convert NLP-extracted DATE/TIME entities into a proper datetime string.
-    Returns ISO8601 string (e.g., '2025-09-18T17:00:00') or None if parsing fails.
+    global memo_hits, memo_misses
+    now = now or now_in(tz)
+    expr = _normalize(expression)
+    key = (expr, now.date(), tz)
+
+    resolution = _memo.get(key)
+    if resolution is None or not _still_valid(resolution, now):
+        memo_misses += 1
+        resolution = (_fast_path(expr, now) if FAST_PATH else None) or _dateparser_resolution(expr, now)
+        if resolution[0] == "uncacheable":
+            return resolution[1]
+        with _memo_lock:
+            if len(_memo) >= MEMO_SIZE:
+                _memo.clear()
+            _memo[key] = resolution
+    else:
+        memo_hits += 1
+
+    kind, value = resolution
+    if kind == "rel":
+        return now + value
+    if kind == "clock":
+        at = datetime.combine(now.date(), value)
+        return at if at >= now else at + timedelta(days=1)
+    if kind == "abs":
+        return value[0]
+    return value
+
+
+# ---------- Due dates ----------
+_TIME_PATTERN_RE = re.compile(r"\d{1,2}(:\d{2})?\s*(am|pm)?", re.I)
+_DIGIT_RE = re.compile(r"\d")
+
+@timed("parse_due_date")
+def parse_due_date(entities: Dict[str, str], now: Optional[datetime] = None) -> Tuple[Optional[datetime], bool]:
     """
+    Parse DATE/TIME entities and detect if it's all-day.
+    Returns (due_date: datetime | None, all_day: bool)
+
+    - Prefers future dates.
+    - If DATE+TIME both present, parse the combined string.
+    - If only DATE present and no time pattern, mark all_day = True.
+    - If only TIME is present, attach to today; roll to tomorrow if that time already passed.
+    """
+    now = now or now_in()
+    all_day = False
+    due_date: Optional[datetime] = None
+
     date_str = entities.get("DATE")
     time_str = entities.get("TIME")
 
+    # 1) If both DATE and TIME are present, parse them together
     if date_str and time_str:
-        combined = f"{date_str} {time_str}"
+        parsed = resolve_date(f"{date_str} {time_str}", now)
+        if parsed:
+            due_date = parsed
+            all_day = False
+
+    # 2) If only DATE is present
     elif date_str:
-        combined = date_str
+        parsed = resolve_date(date_str, now)
+        if parsed:
+            due_date = parsed
+            # If no explicit time pattern in the DATE string, treat as all-day
+            if not _TIME_PATTERN_RE.search(date_str):
+                all_day = True
+
+    # 3) If only TIME is present
     elif time_str:
-        combined = time_str
-    else:
-        return None
+        parsed = resolve_date(time_str, now)
+        if parsed:
+            # If the parsed time (today at that time) is already past, roll to tomorrow
+            if parsed < now:
+                parsed = parsed + timedelta(days=1)
+            due_date = parsed
+            all_day = False
+
+    # If parsed is still not None and it looks like midnight but user gave a time,
+    # ensure all_day is False (defensive)
+    if due_date and (time_str or (date_str and _DIGIT_RE.search(date_str))):
+        all_day = all_day and not bool(time_str)
+
+    return due_date, all_day
 
-    parsed = dateparser.parse(combined)
-    if parsed:
-        return parsed.isoformat()
-    return None
+
+def agenda_window(window: str, now: Optional[datetime] = None) -> Tuple[datetime, datetime]:
+    """
+    [start, end) range for an agenda window: "today" is the current day,
+    "week" is today plus the following six days.
+    """
+    now = now or now_in()
+    start = datetime.combine(now.date(), time.min)
+    days = 7 if window == "week" else 1
+    return start, start + timedelta(days=days)
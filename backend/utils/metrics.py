@@ -0,0 +1,214 @@
+"""
+In-process timing histograms and counters, exposed as Prometheus text on
+/metrics, plus a Server-Timing header on every response.
+
+Stages are measured with `timed("name")` (decorator) or `timer("name")`
+(context manager). While a request is in flight its stage durations and DB
+query count are also collected for its Server-Timing header; that follows
+the request onto Starlette's threadpool, but not into batched inference,
+which is shared between requests and only shows up in the histograms.
+
+ASTA_METRICS=0 turns everything off: the decorator returns the function
+unchanged, timer() is a shared no-op and no middleware or SQLAlchemy events
+are installed. Figures are per process; with several workers, scrape each.
+"""
+import bisect
+import contextvars
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+ENABLED = os.getenv("ASTA_METRICS", "1") == "1"
+
+# Seconds; the Prometheus client's default buckets with finer steps below 5ms
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_NOOP = nullcontext()
+
+
+class Histogram:
+    __slots__ = ("counts", "sum", "count", "_lock")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        i = bisect.bisect_left(BUCKETS, seconds)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += seconds
+            self.count += 1
+
+
+_HELP = {
+    "asta_stage_seconds": "Time spent in instrumented stages.",
+    "asta_http_request_seconds": "HTTP request latency by route.",
+    "asta_db_query_seconds": "Time spent executing SQL statements.",
+    "asta_db_queries_total": "SQL statements executed.",
+}
+# (name, labels tuple) -> Histogram / count
+_histograms = {}
+_counters = {}
+_registry_lock = threading.Lock()
+
+# Per-request {stage: seconds, "db_queries": n}, set by MetricsMiddleware
+_request_stages: contextvars.ContextVar = contextvars.ContextVar("asta_request_stages", default=None)
+
+
+def _histogram(name: str, labels: tuple) -> Histogram:
+    key = (name, labels)
+    hist = _histograms.get(key)
+    if hist is None:
+        with _registry_lock:
+            hist = _histograms.setdefault(key, Histogram())
+    return hist
+
+def _increment(name: str, labels: tuple = (), by: int = 1):
+    key = (name, labels)
+    with _registry_lock:
+        _counters[key] = _counters.get(key, 0) + by
+
+def observe(stage: str, seconds: float):
+    _histogram("asta_stage_seconds", (("stage", stage),)).observe(seconds)
+    stages = _request_stages.get()
+    if stages is not None:
+        stages[stage] = stages.get(stage, 0.0) + seconds
+
+
+@contextmanager
+def _timer(stage: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, time.perf_counter() - start)
+
+def timer(stage: str):
+    """Context manager timing its block as `stage`."""
+    return _timer(stage) if ENABLED else _NOOP
+
+def timed(stage: str):
+    """Decorator timing every call of the function as `stage`."""
+    def decorate(fn):
+        if not ENABLED:
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                observe(stage, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+# ---------- SQLAlchemy ----------
+def instrument_engine(engine):
+    """Count and time every statement run on `engine` (sync engines only)."""
+    if not ENABLED:
+        return
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("asta_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - conn.info["asta_query_start"].pop()
+        _histogram("asta_db_query_seconds", ()).observe(seconds)
+        _increment("asta_db_queries_total")
+        stages = _request_stages.get()
+        if stages is not None:
+            stages["db"] = stages.get("db", 0.0) + seconds
+            stages["db_queries"] = stages.get("db_queries", 0) + 1
+
+
+# ---------- ASGI middleware ----------
+def _server_timing(stages: dict, total: float) -> bytes:
+    parts = []
+    for stage, seconds in stages.items():
+        if stage == "db_queries":
+            continue
+        if stage == "db":
+            parts.append(f'db;desc="{stages.get("db_queries", 0)} queries";dur={seconds * 1000:.2f}')
+        else:
+            parts.append(f"{stage};dur={seconds * 1000:.2f}")
+    parts.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(parts).encode("latin-1")
+
+
+class MetricsMiddleware:
+    """Times each HTTP request by route template and adds Server-Timing."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stages = {}
+        token = _request_stages.set(stages)
+        start = time.perf_counter()
+        status = [500]
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", _server_timing(stages, time.perf_counter() - start)))
+                message = dict(message, headers=headers)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_stages.reset(token)
+            route = scope.get("route")
+            # Route templates, not raw paths, keep the label set bounded
+            path = getattr(route, "path", "unmatched")
+            labels = (("method", scope["method"]), ("route", path), ("status", str(status[0])))
+            _histogram("asta_http_request_seconds", labels).observe(time.perf_counter() - start)
+
+
+# ---------- Prometheus text ----------
+def _labels(labels: tuple, extra: tuple = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    with _registry_lock:
+        histograms = sorted(_histograms.items())
+        counters = sorted(_counters.items())
+
+    lines, seen = [], set()
+    for (name, labels), hist in histograms:
+        if name not in seen:
+            seen.add(name)
+            lines += [f"# HELP {name} {_HELP[name]}", f"# TYPE {name} histogram"]
+        with hist._lock:
+            counts, total, count = list(hist.counts), hist.sum, hist.count
+        cumulative = 0
+        for bound, n in zip(BUCKETS, counts):
+            cumulative += n
+            lines.append(f"{name}_bucket{_labels(labels, (('le', repr(bound)),))} {cumulative}")
+        lines.append(f"{name}_bucket{_labels(labels, (('le', '+Inf'),))} {count}")
+        lines.append(f"{name}_sum{_labels(labels)} {total}")
+        lines.append(f"{name}_count{_labels(labels)} {count}")
+    for (name, labels), value in counters:
+        if name not in seen:
+            seen.add(name)
+            lines += [f"# HELP {name} {_HELP[name]}", f"# TYPE {name} counter"]
+        lines.append(f"{name}{_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
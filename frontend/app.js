@@ -9,6 +9,9 @@ const tasksTable = document.getElementById("tasksTable");
 const logOutput = document.getElementById("logOutput");
 const alertBox = document.getElementById("alertBox");
 
+// Last change-feed sequence applied; the feed sends only what came after it
+let changeCursor = null;
+
 // Helper: Show alert messages
 function showAlert(message, type = "success") {
   alertBox.textContent = message;
@@ -26,55 +29,75 @@ function showAlert(message, type = "success") {
 // Helper: Render tasks table
 function renderTasks(tasks) {
   tasksTable.innerHTML = "";
+  tasks.forEach((task) => tasksTable.appendChild(buildTaskRow(task)));
+}
 
-  tasks.forEach((task) => {
-    // Format due date
-    let dueDateDisplay = "—";
-    if (task.due_date) {
-      const parsedDate = new Date(task.due_date);
-      if (task.all_day) {
-        dueDateDisplay = `${parsedDate.toLocaleDateString(undefined, {
-          weekday: "long",
-          month: "short",
-          day: "numeric",
-        })} (All Day)`;
-      } else {
-        dueDateDisplay = parsedDate.toLocaleString(undefined, {
-          weekday: "long",
-          month: "short",
-          day: "numeric",
-          hour: "2-digit",
-          minute: "2-digit",
-        });
-      }
+// Helper: Build one task row
+function buildTaskRow(task) {
+  // Format due date
+  let dueDateDisplay = "—";
+  if (task.due_date) {
+    const parsedDate = new Date(task.due_date);
+    if (task.all_day) {
+      dueDateDisplay = `${parsedDate.toLocaleDateString(undefined, {
+        weekday: "long",
+        month: "short",
+        day: "numeric",
+      })} (All Day)`;
+    } else {
+      dueDateDisplay = parsedDate.toLocaleString(undefined, {
+        weekday: "long",
+        month: "short",
+        day: "numeric",
+        hour: "2-digit",
+        minute: "2-digit",
+      });
     }
+  }
 
-    // Status display
-    const statusBadge =
-      task.status === "completed"
-        ? `<span class="px-2 py-1 bg-green-200 text-green-800 rounded-full text-sm">Completed</span>`
-        : `<span class="px-2 py-1 bg-gray-200 text-gray-800 rounded-full text-sm">Pending</span>`;
-
-    // Build row
-    const row = document.createElement("tr");
-    row.innerHTML = `
-      <td class="px-4 py-2">${task.id}</td>
-      <td class="px-4 py-2">${task.title}</td>
-      <td class="px-4 py-2">${dueDateDisplay}</td>
-      <td class="px-4 py-2">${statusBadge}</td>
-      <td class="px-4 py-2">
-        ${
-          task.status === "pending"
-            ? `<button class="bg-green-500 text-white px-3 py-1 rounded hover:bg-green-600 mr-2"
-                onclick="completeTask(${task.id})">Complete</button>`
-            : ""
-        }
-        <button class="bg-red-500 text-white px-3 py-1 rounded hover:bg-red-600"
-          onclick="deleteTask(${task.id})">Delete</button>
-      </td>
-    `;
-    tasksTable.appendChild(row);
-  });
+  // Status display
+  const statusBadge =
+    task.status === "completed"
+      ? `<span class="px-2 py-1 bg-green-200 text-green-800 rounded-full text-sm">Completed</span>`
+      : `<span class="px-2 py-1 bg-gray-200 text-gray-800 rounded-full text-sm">Pending</span>`;
+
+  // Build row
+  const row = document.createElement("tr");
+  row.dataset.taskId = task.id;
+  row.innerHTML = `
+    <td class="px-4 py-2">${task.id}</td>
+    <td class="px-4 py-2">${task.title}</td>
+    <td class="px-4 py-2">${dueDateDisplay}</td>
+    <td class="px-4 py-2">${statusBadge}</td>
+    <td class="px-4 py-2">
+      ${
+        task.status === "pending"
+          ? `<button class="bg-green-500 text-white px-3 py-1 rounded hover:bg-green-600 mr-2"
+              onclick="completeTask(${task.id})">Complete</button>`
+          : ""
+      }
+      <button class="bg-red-500 text-white px-3 py-1 rounded hover:bg-red-600"
+        onclick="deleteTask(${task.id})">Delete</button>
+    </td>
+  `;
+  return row;
+}
+
+// Helper: Insert or replace a single task row, keeping rows in id order
+function upsertTaskRow(task) {
+  const row = buildTaskRow(task);
+  const existing = tasksTable.querySelector(`tr[data-task-id="${task.id}"]`);
+  if (existing) {
+    existing.replaceWith(row);
+    return;
+  }
+  const next = Array.from(tasksTable.rows).find((r) => Number(r.dataset.taskId) > task.id);
+  tasksTable.insertBefore(row, next || null);
+}
+
+function removeTaskRow(taskId) {
+  const existing = tasksTable.querySelector(`tr[data-task-id="${taskId}"]`);
+  if (existing) existing.remove();
 }
 
 // Helper: Render log
@@ -112,6 +135,43 @@ async function loadLastLog() {
   }
 }
 
+// Apply one change-feed entry to the page
+function applyChange(change) {
+  if (change.entity === "task") {
+    if (change.op === "upsert") upsertTaskRow(change.data);
+    else if (change.op === "delete") removeTaskRow(change.entity_id);
+    else if (change.op === "reset") loadTasks();
+  } else if (change.entity === "log") {
+    if (change.op === "upsert") renderLog(change.data);
+    else if (change.op === "reset") loadLastLog();
+  }
+}
+
+// Load the lists once, then follow the change feed (SSE) instead of
+// re-fetching them after every action
+async function startChangeFeed() {
+  try {
+    // Cursor first: changes made while the lists load are replayed, and
+    // replaying an upsert/delete is harmless
+    const res = await fetch(`${BASE_URL}/users/${USER_ID}/changes`);
+    if (!res.ok) throw new Error("Failed to fetch change cursor");
+    changeCursor = (await res.json()).cursor;
+  } catch (err) {
+    console.error("Change feed unavailable:", err);
+  }
+
+  await Promise.all([loadTasks(), loadLastLog()]);
+
+  const since = changeCursor === null ? "" : `?since=${changeCursor}`;
+  // EventSource reconnects by itself and resumes from the last event id
+  const stream = new EventSource(`${BASE_URL}/users/${USER_ID}/changes/stream${since}`);
+  stream.addEventListener("change", (e) => {
+    const change = JSON.parse(e.data);
+    changeCursor = change.seq;
+    applyChange(change);
+  });
+}
+
 // Send user input to backend
 async function sendCommand() {
   const text = userInput.value.trim();
@@ -134,8 +194,9 @@ async function sendCommand() {
 
     const data = await res.json();
 
-    // Update UI
-    renderTasks(data.tasks || []);
+    // Task changes arrive through the change feed; only a task query
+    // ("show my tasks", "what do I have today") replaces the list
+    if (data.tasks) renderTasks(data.tasks);
     renderLog(data.log);
 
     // Success alert
@@ -160,9 +221,8 @@ function completeTask(taskId) {
       return res.json();
     })
     .then((data) => {
+      // The row and log update through the change feed
       showAlert(`Task "${data.title}" marked as completed`, "success");
-      loadTasks(); // refresh list
-      loadLastLog(); // refresh logs
     })
     .catch((err) => {
       console.error("Error completing task:", err);
@@ -180,7 +240,7 @@ async function deleteTask(taskId) {
     });
 
     const data = await res.json();
-    renderTasks(data.tasks || []);
+    // The row is removed through the change feed
     renderLog(data.log);
 
     // Success alert for delete
@@ -197,8 +257,7 @@ userInput.addEventListener("keypress", (e) => {
   if (e.key === "Enter") sendCommand();
 });
 
-// Auto-load tasks and logs on page open
+// Auto-load tasks and logs on page open, then keep them current
 window.addEventListener("DOMContentLoaded", () => {
-  loadTasks();
-  loadLastLog();
+  startChangeFeed();
 });
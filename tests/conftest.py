@@ -0,0 +1,57 @@
+import os
+import tempfile
+
+# Before any backend module reads its settings: a throwaway database for the
+# app's own engine, and no model loading
+os.environ.setdefault("ASTA_DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="asta-test-"), "app.db"))
+os.environ.setdefault("ASTA_NLP_MODE", "rules-only")
+os.environ.setdefault("ASTA_NLP_WARMUP", "lazy")
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.db import models
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'asta.db'}")
+    models.Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine):
+    """A sessionmaker like session.SessionLocal, bound to the test database."""
+    return sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+
+@pytest.fixture
+def user_id(session_factory):
+    with session_factory() as db:
+        user = models.User(username="alice")
+        db.add(user)
+        db.commit()
+        return user.id
+
+
+@pytest.fixture
+def client(session_factory, monkeypatch):
+    """The app on the test database, with empty read caches."""
+    from fastapi.testclient import TestClient
+    from backend.api import main
+    from backend.db import read_cache, session
+
+    def get_db():
+        with session_factory() as db:
+            yield db
+
+    monkeypatch.setattr(session, "SessionLocal", session_factory)
+    monkeypatch.setattr(read_cache, "_versions", {})
+    read_cache.pages.clear()
+    read_cache.users.clear()
+    main.app.dependency_overrides[session.get_db] = get_db
+    yield TestClient(main.app)
+    main.app.dependency_overrides.clear()
@@ -0,0 +1,56 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("aiosqlite")
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from backend.db import async_crud, crud, read_cache, session
+from backend.db.session import unit_of_work
+
+
+def test_async_reads_match_the_sync_ones(engine, session_factory, user_id, monkeypatch):
+    # Every call goes to the database
+    monkeypatch.setattr(read_cache, "ENABLED", False)
+    now = datetime(2026, 10, 18, 9)
+    with session_factory() as db, unit_of_work(db):
+        for i in range(5):
+            crud.create_task(db, title=f"task {i}", due_date=now + timedelta(hours=i), user_id=user_id)
+            crud.create_log(db, user_id, "conversation", f"User said: {i}")
+
+    calls = [
+        ("get_user_by_username", dict(username="alice")),
+        ("get_user_ref", dict(user_id=user_id)),
+        ("list_version", dict(user_id=user_id)),
+        ("get_tasks", dict(limit=2, after=1)),
+        ("get_tasks_for_user", dict(user_id=user_id, limit=3, skip=1)),
+        ("get_agenda", dict(user_id=user_id, start=now, end=now + timedelta(hours=3))),
+        ("get_logs", dict(limit=2, after=4)),
+        ("get_logs_for_user", dict(user_id=user_id, limit=10)),
+    ]
+
+    async def run_async():
+        async_engine = create_async_engine(session.async_database_url(str(engine.url)))
+        try:
+            async with AsyncSession(async_engine) as db:
+                results = []
+                for name, kwargs in calls:
+                    results.append(await getattr(async_crud, name)(db, **kwargs))
+                return results
+        finally:
+            await async_engine.dispose()
+
+    expected = []
+    with session_factory() as db:
+        for name, kwargs in calls:
+            expected.append(getattr(crud, name)(db, **kwargs))
+    got = asyncio.run(run_async())
+
+    assert [row.id for row in got[3]] == [2, 3]
+    assert [row.id for row in got[6]] == [3, 2]
+    for (name, _), sync_result, async_result in zip(calls, expected, got):
+        if name == "get_user_by_username":
+            sync_result, async_result = sync_result.id, async_result.id
+        assert async_result == sync_result, name
@@ -0,0 +1,82 @@
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.api import main
+from backend.nlp.batcher import MicroBatcher
+from backend.nlp.executor import InferenceExecutor, InferenceSaturated
+
+
+def test_concurrent_items_run_as_one_batch():
+    batches = []
+
+    def batch_fn(items):
+        batches.append(list(items))
+        return [item.upper() for item in items]
+
+    batcher = MicroBatcher(batch_fn, max_batch_size=4, max_wait_ms=2000)
+    futures = [batcher.submit(text) for text in ("a", "b", "c", "d")]
+    assert [f.result(timeout=5) for f in futures] == ["A", "B", "C", "D"]
+    assert batches == [["a", "b", "c", "d"]]
+    assert batcher.pending == 0
+
+
+def test_a_failing_batch_fails_each_item():
+    def batch_fn(items):
+        raise ValueError("model exploded")
+
+    batcher = MicroBatcher(batch_fn, max_batch_size=2, max_wait_ms=1)
+    futures = [batcher.submit(text) for text in ("a", "b")]
+    for future in futures:
+        with pytest.raises(ValueError, match="model exploded"):
+            future.result(timeout=5)
+
+
+def test_submit_beyond_max_pending_is_refused():
+    release = threading.Event()
+
+    def batch_fn(items):
+        release.wait(5)
+        return items
+
+    executor = InferenceExecutor(max_workers=1, max_queue=0, retry_after=7)
+    batcher = MicroBatcher(batch_fn, max_batch_size=1, max_wait_ms=1, max_pending=2, executor=executor)
+    futures = [batcher.submit("a"), batcher.submit("b")]
+    with pytest.raises(InferenceSaturated) as saturated:
+        batcher.submit("c")
+    assert saturated.value.retry_after == 7
+    release.set()
+    assert [f.result(timeout=5) for f in futures] == ["a", "b"]
+    executor.shutdown()
+
+
+def test_executor_admits_workers_plus_queue():
+    release = threading.Event()
+    executor = InferenceExecutor(max_workers=1, max_queue=1)
+    running = [executor.try_submit(release.wait, 5) for _ in range(2)]
+    with pytest.raises(InferenceSaturated):
+        executor.try_submit(release.wait, 5)
+    release.set()
+    assert all(f.result(timeout=5) for f in running)
+    executor.shutdown()
+
+
+def test_saturated_nlp_endpoints_answer_429(monkeypatch):
+    release = threading.Event()
+    executor = InferenceExecutor(max_workers=1, max_queue=0, retry_after=3)
+    busy = executor.try_submit(release.wait, 5)
+    monkeypatch.setattr(main, "get_inference_executor", lambda: executor)
+    monkeypatch.setattr(main, "get_parse_batcher", lambda: MicroBatcher(list, max_pending=0))
+    client = TestClient(main.app)
+    try:
+        # The batcher's own queue limit, then the executor's
+        for path, body, retry_after in (("/nlp/parse", {"text": "hi"}, "1"),
+                                        ("/nlp/parse/batch", {"texts": ["hi"]}, "3")):
+            response = client.post(path, json=body)
+            assert response.status_code == 429, path
+            assert response.headers["Retry-After"] == retry_after
+    finally:
+        release.set()
+        busy.result(timeout=5)
+        executor.shutdown()
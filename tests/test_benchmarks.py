@@ -0,0 +1,53 @@
+import pytest
+
+from backend.benchmarks import suite
+from backend.db import session
+from backend.nlp import nlp_processor
+from backend.nlp.registry import registry
+
+
+@pytest.fixture
+def mock_models(monkeypatch):
+    monkeypatch.setattr(registry, "_spacy", None)
+    monkeypatch.setattr(registry, "_classifier", None)
+    monkeypatch.setattr(registry, "mode", "full")
+    monkeypatch.setattr(nlp_processor, "result_cache", None)
+    return suite.install_models("mock")
+
+
+def test_summarize_reports_percentiles_and_throughput():
+    stats = suite.summarize([i / 1000 for i in range(1, 101)], elapsed=2.0)
+    assert stats == {"n": 100, "p50_ms": 51.0, "p95_ms": 96.0, "p99_ms": 100.0, "mean_ms": 50.5, "ops_per_sec": 50.0}
+
+
+def test_compare_flags_p95_regressions_only():
+    baseline = {"pipeline": {"rules": {"p95_ms": 1.0}, "spacy_ner": {"p95_ms": 2.0}}}
+    report = {"pipeline": {"rules": {"p95_ms": 1.1}, "spacy_ner": {"p95_ms": 3.0}, "new_stage": {"p95_ms": 9.0}}}
+    assert suite.compare(report, baseline, 0.2) == [
+        {"name": "pipeline/spacy_ner", "baseline_p95_ms": 2.0, "p95_ms": 3.0},
+    ]
+    assert suite.compare(baseline, baseline, 0.0) == []
+
+
+def test_pipeline_stages_with_mock_models(mock_models):
+    report = suite.bench_pipeline(rounds=1)
+    assert set(report) == {"rules", "spacy_ner", "classifier", "date_parsing", "date_parsing_memo",
+                           "title_cleaning", "parse_input", "parse_batch"}
+    assert report["parse_input"]["n"] == len(suite.PIPELINE_CORPUS)
+    assert report["parse_batch"]["n"] == 1
+
+
+def test_endpoints_under_concurrency(client, user_id, mock_models):
+    report = suite.bench_endpoints(requests=4, concurrency=2)
+    assert report["concurrency"] == 2
+    assert set(report["endpoints"]) == set(suite.ENDPOINTS)
+    assert all(stats["n"] == 4 for stats in report["endpoints"].values())
+
+
+def test_write_paths_per_table_size(session_factory, user_id, monkeypatch):
+    monkeypatch.setattr(session, "SessionLocal", session_factory)
+    report = suite.bench_writes(ops=3, sizes=[5, 20])
+    assert set(report) == {"5", "20"}
+    for stats in report.values():
+        assert stats["create_task_with_log"]["n"] == 3
+        assert stats["bulk_insert_logs"]["rows_per_sec"] > 0
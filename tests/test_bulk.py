@@ -0,0 +1,80 @@
+import csv
+import io
+import json
+
+from sqlalchemy.exc import IntegrityError
+
+from backend.db import bulk, changes
+
+
+def ndjson(*rows):
+    return "\n".join(json.dumps(row) for row in rows) + "\n"
+
+
+def test_tasks_round_trip_through_ndjson_and_csv(client, user_id, monkeypatch):
+    monkeypatch.setattr(bulk, "CHUNK_SIZE", 2)
+    tasks = [
+        {"title": "pay rent", "due_date": "2026-11-01T09:00:00", "user_id": user_id},
+        {"title": "call mom", "description": "about sunday", "user_id": user_id, "status": "completed"},
+        {"title": "gym", "due_date": "2026-11-02T00:00:00", "all_day": True, "user_id": user_id},
+    ]
+    response = client.post("/tasks/bulk", content=ndjson(*tasks))
+    assert response.status_code == 200 and response.json() == {"inserted": 3}
+
+    exported = [json.loads(line) for line in client.get("/tasks/export").text.splitlines()]
+    assert [(t["title"], t["due_date"], t["status"], t["all_day"]) for t in exported] == [
+        ("pay rent", "2026-11-01T09:00:00", "pending", False),
+        ("call mom", None, "completed", False),
+        ("gym", "2026-11-02T00:00:00", "pending", True),
+    ]
+    # CSV carries the same values, dates in the same isoformat
+    rows = list(csv.DictReader(io.StringIO(client.get("/tasks/export", params={"format": "csv"}).text)))
+    assert [(r["id"], r["title"], r["due_date"]) for r in rows] == \
+           [(str(t["id"]), t["title"], t["due_date"] or "") for t in exported]
+
+    # What was exported imports again as is
+    assert client.post("/tasks/bulk", content=ndjson(*exported)).json() == {"inserted": 3}
+    again = [json.loads(line) for line in client.get("/tasks/export").text.splitlines()][3:]
+    assert [{k: v for k, v in t.items() if k != "id"} for t in again] == \
+           [{k: v for k, v in t.items() if k != "id"} for t in exported]
+
+
+def test_logs_round_trip_and_reset_the_feed(client, session_factory, user_id):
+    logs = [{"user_id": user_id, "event_type": "conversation", "content": f"line, {i}\nwith \"quotes\"",
+             "timestamp": f"2026-10-0{i + 1}T08:30:00"} for i in range(3)]
+    assert client.post("/logs/bulk", content=ndjson(*logs)).json() == {"inserted": 3}
+    rows = list(csv.DictReader(io.StringIO(client.get("/logs/export", params={"format": "csv"}).text)))
+    assert [(r["content"], r["timestamp"]) for r in rows] == [(log["content"], log["timestamp"]) for log in logs]
+    with session_factory() as db:
+        assert [(c.entity, c.op) for c in changes.since(db, user_id, 0)] == [("log", "reset")]
+
+
+def test_unknown_user_is_a_422_naming_the_line(client, user_id, monkeypatch):
+    monkeypatch.setattr(bulk, "CHUNK_SIZE", 2)
+    tasks = [{"title": f"task {i}", "user_id": user_id} for i in range(3)]
+    tasks.insert(2, {"title": "someone else's", "user_id": 999})
+    response = client.post("/tasks/bulk", content=ndjson(*tasks))
+    assert response.status_code == 422
+    assert response.json()["detail"] == "line 3: user_id: user 999 does not exist"
+    # The chunk already inserted was rolled back with the rest
+    assert client.get("/tasks/export").text == ""
+
+
+def test_rejected_chunk_is_a_409_naming_its_lines(client, user_id, monkeypatch):
+    monkeypatch.setattr(bulk, "CHUNK_SIZE", 2)
+
+    def insert_rows(db, model, rows):
+        if any(row["title"] == "bad" for row in rows):
+            raise IntegrityError("INSERT", {}, Exception("CHECK constraint failed"))
+        return len(rows)
+
+    monkeypatch.setattr(bulk, "insert_rows", insert_rows)
+    tasks = [{"title": title, "user_id": user_id} for title in ("ok", "ok", "ok", "bad")]
+    response = client.post("/tasks/bulk", content=ndjson(*tasks))
+    assert response.status_code == 409
+    assert response.json()["detail"] == "lines 3-4: CHECK constraint failed"
+
+
+def test_invalid_line_is_a_422(client, user_id):
+    response = client.post("/tasks/bulk", content=ndjson({"title": "fine", "user_id": user_id}, {"user_id": user_id}))
+    assert response.status_code == 422 and response.json()["detail"].startswith("line 2: title:")
@@ -0,0 +1,89 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from backend.api import change_feed
+from backend.db import changes, crud, models
+from backend.db.session import unit_of_work
+
+
+def test_feed_is_ordered_and_per_user(session_factory, user_id):
+    with session_factory() as db, unit_of_work(db):
+        bob = crud.create_user(db, "bob").id
+        first = crud.create_task(db, title="first", user_id=user_id)
+        crud.create_task(db, title="bob's", user_id=bob)
+    with session_factory() as db, unit_of_work(db):
+        crud.complete_task(db, crud.get_task(db, first.id))
+        crud.delete_task(db, first.id, user_id=user_id)
+
+    with session_factory() as db:
+        feed = changes.since(db, user_id, 0)
+        assert [c.id for c in feed] == sorted(c.id for c in feed)
+        assert [(c.op, c.entity_id) for c in feed] == [("upsert", first.id), ("upsert", first.id), ("delete", first.id)]
+        assert feed[1].data["status"] == "completed"
+        # Resuming from a cursor returns only what came after it
+        assert [c.id for c in changes.since(db, user_id, feed[0].id)] == [c.id for c in feed[1:]]
+        assert changes.since(db, user_id, feed[-1].id) == []
+        assert [c.data["title"] for c in changes.since(db, bob, 0)] == ["bob's"]
+        assert changes.latest(db, user_id) == feed[-1].id
+
+
+def test_log_changes_reference_their_log(session_factory, user_id):
+    with session_factory() as db, unit_of_work(db):
+        log = crud.create_log(db, user_id, "conversation", "User said: hi")
+    with session_factory() as db:
+        # Only the id is stored; the feed reads the log itself
+        assert db.execute(select(models.Change.data)).scalars().all() == [None]
+        assert [(c.entity_id, c.data["content"]) for c in changes.since(db, user_id, 0)] == [(log.id, "User said: hi")]
+    with session_factory() as db, unit_of_work(db):
+        db.delete(db.get(models.Log, log.id))
+    with session_factory() as db:
+        assert [c.data for c in changes.since(db, user_id, 0)] == [None]
+
+
+def test_changes_are_written_by_any_session(engine, user_id):
+    with Session(engine) as db:
+        crud.create_task(db, title="plain session", user_id=user_id)
+        db.commit()
+        crud.create_task(db, title="rolled back", user_id=user_id)
+        db.rollback()
+        crud.create_task(db, title="second transaction", user_id=user_id)
+        db.commit()
+    with Session(engine) as db:
+        assert [c.data["title"] for c in changes.since(db, user_id, 0)] == ["plain session", "second transaction"]
+
+
+def test_cursor_before_the_pruned_feed_gets_resets(engine, session_factory, user_id, monkeypatch):
+    monkeypatch.setattr(changes, "PRUNE_BATCH", 2)
+    with session_factory() as db, unit_of_work(db):
+        for i in range(5):
+            crud.create_task(db, title=f"task {i}", user_id=user_id)
+    assert changes.prune(engine, datetime.utcnow() + timedelta(seconds=1)) == 4
+    with session_factory() as db:
+        resets = changes.since(db, user_id, 1)
+        assert [(c.entity, c.op) for c in resets] == [("task", "reset"), ("log", "reset")]
+        assert {c.id for c in resets} == {changes.latest(db, user_id)}
+        # Up to date with what is left: nothing to reset
+        assert changes.since(db, user_id, changes.latest(db, user_id)) == []
+
+
+def test_long_poll_wakes_on_commit(client, session_factory, user_id, monkeypatch):
+    monkeypatch.setattr(change_feed, "POLL_SECONDS", 30)
+    cursor = client.get(f"/users/{user_id}/changes").json()["cursor"]
+
+    def write():
+        time.sleep(0.3)
+        with session_factory() as db, unit_of_work(db):
+            crud.create_task(db, title="late", user_id=user_id)
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    start = time.monotonic()
+    feed = client.get(f"/users/{user_id}/changes", params={"since": cursor, "wait": 10}).json()
+    writer.join()
+    assert time.monotonic() - start < 5
+    assert [c["data"]["title"] for c in feed["changes"]] == ["late"]
+    assert feed["cursor"] == feed["changes"][-1]["seq"]
@@ -0,0 +1,76 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from backend.nlp import classifier, registry
+from backend.nlp.registry import ModelRegistry
+
+
+def test_held_out_examples_come_from_other_templates():
+    train_set, held_out = classifier.builtin_examples(holdout=0.2)
+    assert held_out and not {t for t, _ in train_set} & {t for t, _ in held_out}
+    for intent, templates in classifier._TEMPLATES.items():
+        kept, left_out = classifier._split(templates, 0.2)
+        assert left_out and not set(kept) & set(left_out)
+    assert classifier.builtin_examples()[1] == []
+
+
+def test_generalises_to_unseen_templates():
+    train_set, held_out = classifier.builtin_examples(holdout=0.2)
+    model = classifier.train(train_set, min_confidence=0.0, mutating_min_confidence=0.0)
+    report = classifier.evaluate(model, held_out, rounds=1)
+    # Six intents: chance is about 0.17
+    assert report["accuracy"] > 0.5
+
+
+def test_low_confidence_falls_back_to_chat():
+    model = classifier.train(classifier.builtin_examples(per_intent=20)[0], epochs=5, min_confidence=1.0)
+    assert model.predict(["i need to buy milk tomorrow"]) == [classifier.CHAT_INTENT]
+
+
+def test_save_and_load_round_trip(tmp_path):
+    model = classifier.train(classifier.builtin_examples(per_intent=20)[0], n_features=2 ** 12, epochs=5)
+    path = str(tmp_path / "model.npz")
+    model.save(path)
+    loaded = classifier.LinearIntentClassifier.load(path)
+    texts = ["scrap walk the dog", "hello", "what's on my plate tonight"]
+    assert loaded.predict(texts) == model.predict(texts)
+    assert np.allclose(loaded.probabilities(texts), model.probabilities(texts))
+
+
+def test_registry_version_comes_from_configuration(tmp_path, monkeypatch):
+    models = ModelRegistry(mode="full", classifier="linear")
+    before = models.version
+    models.classifier()
+    assert models.version == before
+    assert ModelRegistry(mode="full", classifier="linear").version == before
+
+    monkeypatch.setattr(registry, "CLASSIFIER_MIN_CONFIDENCE", 0.7)
+    assert ModelRegistry(mode="full", classifier="linear").version != before
+
+    path = tmp_path / "model.npz"
+    classifier.train(classifier.builtin_examples(per_intent=5)[0], n_features=2 ** 8, epochs=1).save(str(path))
+    monkeypatch.setattr(registry, "INTENT_MODEL_PATH", str(path))
+    saved = ModelRegistry(mode="full", classifier="linear").version
+    classifier.train(classifier.builtin_examples(per_intent=10)[0], n_features=2 ** 8, epochs=1).save(str(path))
+    assert ModelRegistry(mode="full", classifier="linear").version != saved
+
+
+CHAT = ["never mind", "forget it", "scrap that idea, lets talk about movies", "nah, ditch that thought",
+        "i'm done for today", "erase that from your memory lol", "ok that's sorted then"]
+
+
+def test_default_classifier_never_predicts_a_mutating_intent():
+    model = ModelRegistry(mode="full", classifier="linear").classifier()
+    assert not set(model.predict(CHAT)) & classifier.MUTATING_INTENTS
+    assert model.predict(["scrap walk the dog", "i took care of call mom"]) == [classifier.CHAT_INTENT] * 2
+    # Plain task requests are unaffected
+    assert model.predict(["gotta pay the rent tomorrow"]) == ["create_task"]
+
+
+def test_mutating_intents_need_their_own_threshold():
+    train_set = classifier.builtin_examples(per_intent=40)[0]
+    opted_in = classifier.train(train_set, mutating_min_confidence=0.5)
+    assert opted_in.predict(["i took care of call mom"]) == ["complete_task"]
+    strict = classifier.train(train_set, mutating_min_confidence=1.0)
+    assert strict.predict(["i took care of call mom"]) == [classifier.CHAT_INTENT]
@@ -0,0 +1,39 @@
+from backend.db import crud
+from backend.db.session import unit_of_work
+
+
+def add_tasks(session_factory, user_id, *titles):
+    with session_factory() as db, unit_of_work(db):
+        return [crud.create_task(db, title=title, user_id=user_id).id for title in titles]
+
+
+def test_unchanged_list_is_not_modified(client, session_factory, user_id):
+    add_tasks(session_factory, user_id, "first")
+    path = f"/users/{user_id}/tasks"
+    first = client.get(path)
+    etag = first.headers["ETag"]
+    assert first.headers["Cache-Control"] == "no-cache"
+
+    again = client.get(path, headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.content == b""
+    assert client.get(path, headers={"If-Modified-Since": first.headers["Last-Modified"]}).status_code == 304
+    # Other query, other validator
+    assert client.get(path, params={"limit": 1}, headers={"If-None-Match": etag}).status_code == 200
+
+    add_tasks(session_factory, user_id, "second")
+    changed = client.get(path, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert [row["title"] for row in changed.json()] == ["first", "second"]
+
+
+def test_other_users_writes_keep_the_etag(client, session_factory, user_id):
+    with session_factory() as db, unit_of_work(db):
+        bob = crud.create_user(db, "bob").id
+    add_tasks(session_factory, user_id, "mine")
+    etag = client.get(f"/users/{user_id}/tasks").headers["ETag"]
+    all_etag = client.get("/tasks/").headers["ETag"]
+    add_tasks(session_factory, bob, "bob's")
+    assert client.get(f"/users/{user_id}/tasks", headers={"If-None-Match": etag}).status_code == 304
+    # The all-users list does move
+    assert client.get("/tasks/", headers={"If-None-Match": all_etag}).status_code == 200
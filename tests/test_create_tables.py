@@ -0,0 +1,45 @@
+from sqlalchemy import create_engine, inspect, text
+
+from backend.db import models
+from backend.db.scripts.create_tables import upgrade
+
+# The schema before all_day, the change feed, log rollups and the indexes
+OLD_SCHEMA = [
+    "CREATE TABLE users (id INTEGER PRIMARY KEY, username VARCHAR NOT NULL UNIQUE)",
+    "CREATE TABLE tasks (id INTEGER PRIMARY KEY, title VARCHAR NOT NULL, description VARCHAR,"
+    " due_date DATETIME, status VARCHAR, user_id INTEGER REFERENCES users (id))",
+    "CREATE TABLE logs (id INTEGER PRIMARY KEY, user_id INTEGER REFERENCES users (id),"
+    " event_type VARCHAR NOT NULL, content VARCHAR NOT NULL, timestamp DATETIME)",
+    "INSERT INTO users (id, username) VALUES (1, 'alice')",
+    "INSERT INTO tasks (id, title, status, user_id) VALUES (1, 'old task', 'pending', 1)",
+]
+
+
+def test_upgrades_an_old_database(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        for statement in OLD_SCHEMA:
+            conn.execute(text(statement))
+
+    added = upgrade(engine)
+    assert "tasks.all_day" in added
+    assert {"ix_tasks_pending_due", "ix_tasks_user_status_due", "ix_logs_user_id_id"} <= set(added)
+    assert "ix_tasks_title_fts" not in added
+
+    inspector = inspect(engine)
+    assert {"changes", "log_rollups"} <= set(inspector.get_table_names())
+    for table in models.Base.metadata.sorted_tables:
+        expected = {i.name for i in table.indexes if i._ddl_if is None}
+        assert expected <= {i["name"] for i in inspector.get_indexes(table.name)}, table.name
+
+    with engine.begin() as conn:
+        assert conn.execute(text("SELECT all_day FROM tasks")).scalar() in (0, False)
+        conn.execute(text("INSERT INTO tasks (title, status) VALUES ('new', 'pending')"))
+        assert conn.execute(text("SELECT count(*) FROM tasks WHERE all_day = 0")).scalar() == 2
+
+    assert upgrade(engine) == []
+    engine.dispose()
+
+
+def test_fresh_database_needs_nothing_more(engine):
+    assert upgrade(engine) == []
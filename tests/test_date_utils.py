@@ -0,0 +1,79 @@
+from datetime import datetime
+
+import pytest
+
+from backend.benchmarks import dates
+from backend.utils import date_utils
+from backend.utils.date_utils import agenda_window, parse_due_date, resolve_date
+
+MORNING = datetime(2026, 10, 16, 9, 0)
+EVENING = datetime(2026, 10, 16, 18, 0)
+
+
+@pytest.fixture(autouse=True)
+def empty_memo():
+    date_utils.clear_memo()
+    yield
+    date_utils.clear_memo()
+
+
+@pytest.mark.parametrize("expr, now, expected", [
+    ("5 pm", MORNING, datetime(2026, 10, 16, 17)),
+    ("5 pm", EVENING, datetime(2026, 10, 17, 17)),
+    ("at 5:30 p.m.", EVENING, datetime(2026, 10, 17, 17, 30)),
+    ("17:00", datetime(2026, 10, 16, 17), datetime(2026, 10, 16, 17)),
+    ("noon", EVENING, datetime(2026, 10, 17, 12)),
+    ("today at 5 pm", EVENING, datetime(2026, 10, 16, 17)),
+    ("tomorrow 9am", EVENING, datetime(2026, 10, 17, 9)),
+    ("friday", EVENING, datetime(2026, 10, 23)),
+    ("on monday at noon", EVENING, datetime(2026, 10, 19, 12)),
+    ("in 2 hours", EVENING, datetime(2026, 10, 16, 20)),
+    ("tomorrow", EVENING, datetime(2026, 10, 17, 18)),
+])
+def test_resolve_date(expr, now, expected):
+    assert resolve_date(expr, now) == expected
+
+
+def test_same_outputs_as_dateparser_morning_and_evening():
+    assert dates.mismatches() == {}
+
+
+def test_memo_does_not_serve_a_passed_time():
+    # Both go through dateparser, not the fast path
+    assert resolve_date("5:00:00 pm", MORNING) == datetime(2026, 10, 16, 17)
+    hits = date_utils.memo_hits
+    assert resolve_date("5:00:00 pm", datetime(2026, 10, 16, 16)) == datetime(2026, 10, 16, 17)
+    assert date_utils.memo_hits == hits + 1
+    assert resolve_date("5:00:00 pm", EVENING) == datetime(2026, 10, 17, 17)
+    # A clock time from the fast path is memoized once and still rolls over
+    assert resolve_date("5 pm", MORNING) == datetime(2026, 10, 16, 17)
+    assert resolve_date("5 pm", EVENING) == datetime(2026, 10, 17, 17)
+
+
+def test_relative_results_move_with_now():
+    assert resolve_date("in 30 minutes", MORNING) == datetime(2026, 10, 16, 9, 30)
+    assert resolve_date("in 30 minutes", EVENING) == datetime(2026, 10, 16, 18, 30)
+    assert resolve_date("not a date at all", MORNING) is None
+
+
+def test_fast_path_off_gives_the_same_answers(monkeypatch):
+    fast = [resolve_date(expr, EVENING) for expr in dates.CORPUS]
+    monkeypatch.setattr(date_utils, "FAST_PATH", False)
+    date_utils.clear_memo()
+    assert [resolve_date(expr, EVENING) for expr in dates.CORPUS] == fast
+
+
+@pytest.mark.parametrize("entities, expected", [
+    ({"DATE": "5 pm"}, (datetime(2026, 10, 17, 17), False)),
+    ({"TIME": "noon"}, (datetime(2026, 10, 17, 12), False)),
+    ({"DATE": "friday"}, (datetime(2026, 10, 23), True)),
+    ({"DATE": "tomorrow", "TIME": "9am"}, (datetime(2026, 10, 17, 9), False)),
+    ({}, (None, False)),
+])
+def test_parse_due_date_in_the_evening(entities, expected):
+    assert parse_due_date(entities, EVENING) == expected
+
+
+def test_agenda_window():
+    assert agenda_window("today", EVENING) == (datetime(2026, 10, 16), datetime(2026, 10, 17))
+    assert agenda_window("week", EVENING) == (datetime(2026, 10, 16), datetime(2026, 10, 23))
@@ -0,0 +1,85 @@
+import json
+import os
+import signal
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.api import main
+from backend.nlp import nlp_processor
+
+client = TestClient(main.app)
+
+
+@pytest.fixture
+def intents_file(tmp_path, monkeypatch):
+    path = tmp_path / "intents.json"
+    path.write_text(json.dumps({"create_task": ["remind"], "greet": ["hello"]}))
+    monkeypatch.setattr(nlp_processor, "INTENTS_PATH", str(path))
+    monkeypatch.setattr(nlp_processor, "_matcher", None)
+    return path
+
+
+def test_disabled_without_admin_token(monkeypatch, intents_file):
+    monkeypatch.setattr(main, "ADMIN_TOKEN", None)
+    assert client.post("/nlp/intents/reload").status_code == 404
+
+
+def test_needs_the_admin_token(monkeypatch, intents_file):
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "s3cret")
+    assert client.post("/nlp/intents/reload").status_code == 403
+    assert client.post("/nlp/intents/reload", headers={"X-Admin-Token": "nope"}).status_code == 403
+
+
+def test_reloads_in_process(monkeypatch, intents_file):
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "s3cret")
+    monkeypatch.delenv("ASTA_MASTER_PID", raising=False)
+    response = client.post("/nlp/intents/reload", headers={"X-Admin-Token": "s3cret"})
+    assert response.status_code == 200
+    assert response.json() == {"intents": ["create_task", "greet"]}
+    assert nlp_processor.get_matcher().best("hello there") == "greet"
+
+
+def test_signals_the_serve_master(monkeypatch, intents_file):
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "s3cret")
+    monkeypatch.setenv("ASTA_MASTER_PID", "4242")
+    sent = []
+    monkeypatch.setattr(os, "kill", lambda pid, sig: sent.append((pid, sig)))
+    response = client.post("/nlp/intents/reload", headers={"X-Admin-Token": "s3cret"})
+    assert response.status_code == 202
+    assert sent == [(4242, signal.SIGHUP)]
+
+
+def test_rejects_a_broken_table(monkeypatch, intents_file):
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "s3cret")
+    monkeypatch.setenv("ASTA_MASTER_PID", "4242")
+    monkeypatch.setattr(os, "kill", lambda pid, sig: pytest.fail("signalled the master"))
+    intents_file.write_text("{not json")
+    response = client.post("/nlp/intents/reload", headers={"X-Admin-Token": "s3cret"})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("table", [
+    ["remind"],
+    {"create_task": "remind"},
+    {"create_task": ["remind", 3]},
+    {"create_task": [["remind", "high"]]},
+    {"create_task": {"remind": "high"}},
+])
+def test_rejects_a_malformed_table(monkeypatch, intents_file, table):
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "s3cret")
+    monkeypatch.delenv("ASTA_MASTER_PID", raising=False)
+    before = nlp_processor.get_matcher()
+    intents_file.write_text(json.dumps(table))
+    response = client.post("/nlp/intents/reload", headers={"X-Admin-Token": "s3cret"})
+    assert response.status_code == 400 and response.json()["detail"].startswith("Cannot load")
+    # The table being served is unchanged
+    assert nlp_processor.get_matcher() is before
+
+
+def test_accepts_weighted_pairs(monkeypatch, intents_file):
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "s3cret")
+    monkeypatch.delenv("ASTA_MASTER_PID", raising=False)
+    intents_file.write_text(json.dumps({"create_task": [["remind", 2]], "greet": {"hello": 1, "remind": 1}}))
+    assert client.post("/nlp/intents/reload", headers={"X-Admin-Token": "s3cret"}).status_code == 200
+    assert nlp_processor.get_matcher().best("remind me") == "create_task"
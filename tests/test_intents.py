@@ -0,0 +1,43 @@
+import json
+
+from backend.nlp import nlp_processor
+from backend.nlp.intent_matcher import IntentMatcher
+
+
+def test_longest_phrase_wins_and_words_match_whole():
+    matcher = IntentMatcher(nlp_processor.ASTA_INTENTS)
+    assert matcher.best("delete the tasks") == "delete_task"
+    assert matcher.best("show my task list") == "get_tasks"
+    assert matcher.best("update my address") is None
+    assert matcher.best("Remind   me to call mom") == "create_task"
+
+
+def test_ties_go_to_the_first_intent():
+    matcher = IntentMatcher({"a": ["foo"], "b": ["bar"]})
+    assert matcher.match("bar foo") == [("a", 1.0), ("b", 1.0)]
+
+
+def test_digest_follows_the_table_not_the_process():
+    same = IntentMatcher({"create_task": ["Remind  me", ("add", 1)]})
+    assert same.digest == IntentMatcher({"create_task": ["remind me", "add"]}).digest
+    assert same.digest != IntentMatcher({"create_task": ["remind me", ("add", 2)]}).digest
+
+
+def test_cache_key_changes_with_the_intent_table(tmp_path, monkeypatch):
+    monkeypatch.setattr(nlp_processor, "_matcher", None)
+    path = tmp_path / "intents.json"
+    path.write_text(json.dumps({"create_task": ["remind"]}))
+    monkeypatch.setattr(nlp_processor, "INTENTS_PATH", str(path))
+
+    # Loaded before the first key is built
+    first = nlp_processor._cache_key("parse", "remind me")
+    assert nlp_processor.get_matcher().digest in first
+
+    # A restart with an edited table (a fresh matcher) gets other keys
+    path.write_text(json.dumps({"create_task": ["remind", "add"]}))
+    monkeypatch.setattr(nlp_processor, "_matcher", None)
+    assert nlp_processor._cache_key("parse", "remind me") != first
+    nlp_processor.reload_intents(str(path))
+    path.write_text(json.dumps({"create_task": ["remind"]}))
+    nlp_processor.reload_intents(str(path))
+    assert nlp_processor._cache_key("parse", "remind me") == first
@@ -0,0 +1,88 @@
+import gzip
+import json
+import os
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import select, update
+
+from backend.db import changes, log_retention, models
+from backend.db.session import unit_of_work
+
+NOW = datetime(2026, 10, 18, 12)
+OLD = datetime(2025, 8, 15, 9)  # before the 12-month retention cutoff (2025-10-01)
+RECENT = datetime(2026, 10, 1, 9)
+
+
+@pytest.fixture
+def archive_dir(tmp_path, monkeypatch):
+    path = tmp_path / "archive"
+    monkeypatch.setattr(log_retention, "ARCHIVE_DIR", str(path))
+    monkeypatch.setattr(log_retention, "RETENTION_MONTHS", 12)
+    return path
+
+
+def add_logs(session_factory, user_id, *timestamps):
+    with session_factory() as db, unit_of_work(db):
+        for i, ts in enumerate(timestamps):
+            db.add(models.Log(user_id=user_id, event_type="conversation", content=f"log {ts:%Y-%m-%d} {i}", timestamp=ts))
+
+
+def read_archive(path):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_run_archives_and_drops_old_rows(engine, session_factory, user_id, archive_dir):
+    add_logs(session_factory, user_id, OLD, OLD, RECENT)
+
+    result = log_retention.run(engine, NOW)
+    assert not result["partitioned"]
+    assert result["archived"] == [{"month": "2025-08", "rows": 2, "path": str(archive_dir / "logs_2025_08.ndjson.gz")}]
+    archived = read_archive(archive_dir / "logs_2025_08.ndjson.gz")
+    assert [row["content"] for row in archived] == ["log 2025-08-15 0", "log 2025-08-15 1"]
+
+    with session_factory() as db:
+        assert [log.timestamp for log in db.execute(select(models.Log)).scalars()] == [RECENT]
+        # The counts outlive the archived rows
+        rollups = db.execute(select(models.LogRollup).where(models.LogRollup.day == date(2025, 8, 15))).scalars().all()
+        assert [(r.user_id, r.event_type, r.count) for r in rollups] == [(user_id, "conversation", 2)]
+        # Feed clients are told to reload their logs
+        assert [(c.entity, c.op) for c in changes.since(db, user_id, 0)] == [("log", "reset")]
+
+    # Nothing left to do
+    assert log_retention.run(engine, NOW)["archived"] == []
+    assert os.listdir(archive_dir) == ["logs_2025_08.ndjson.gz"]
+
+
+def test_late_rows_go_to_a_new_segment(engine, session_factory, user_id, archive_dir):
+    add_logs(session_factory, user_id, OLD)
+    log_retention.run(engine, NOW)
+    first = (archive_dir / "logs_2025_08.ndjson.gz").read_bytes()
+
+    # e.g. a bulk import of old logs after the month was archived
+    add_logs(session_factory, user_id, OLD.replace(day=20))
+    archived = log_retention.run(engine, NOW)["archived"]
+    assert [a["path"] for a in archived] == [str(archive_dir / "logs_2025_08.1.ndjson.gz")]
+    assert (archive_dir / "logs_2025_08.ndjson.gz").read_bytes() == first
+    assert [row["content"] for row in read_archive(archive_dir / "logs_2025_08.1.ndjson.gz")] == ["log 2025-08-20 0"]
+    assert not [name for name in os.listdir(archive_dir) if name.endswith(".tmp")]
+
+
+def test_change_feed_has_its_own_retention(engine, session_factory, user_id, archive_dir, monkeypatch):
+    monkeypatch.setattr(changes, "RETENTION_HOURS", 72)
+    add_logs(session_factory, user_id, RECENT, RECENT)
+    created = [datetime(2026, 10, 14), datetime(2026, 10, 15, 13), datetime(2026, 10, 18)]
+    with session_factory() as db, unit_of_work(db):
+        for _ in created:
+            changes.record(db, user_id, "log", "reset")
+    with session_factory() as db, unit_of_work(db):
+        ids = db.execute(select(models.Change.id).order_by(models.Change.id)).scalars().all()
+        for change_id, created_at in zip(ids, created):
+            db.execute(update(models.Change).where(models.Change.id == change_id).values(created_at=created_at))
+
+    # Feed rows older than 72 hours go, this month's logs stay
+    assert log_retention.run(engine, NOW)["pruned_changes"] == 1
+    with session_factory() as db:
+        assert db.execute(select(models.Change.id).order_by(models.Change.id)).scalars().all() == ids[1:]
+        assert len(db.execute(select(models.Log)).all()) == 2
@@ -0,0 +1,78 @@
+import time
+from datetime import datetime
+
+import pytest
+from sqlalchemy import func, select
+
+from backend.db import changes, crud, log_writer, models
+from backend.db.session import unit_of_work
+
+
+@pytest.fixture
+def writer(session_factory, monkeypatch):
+    """A writer hooked into the test sessions; its thread isn't started, stop() flushes."""
+    monkeypatch.setenv("ASTA_ASYNC_LOGS", "1")
+    monkeypatch.setattr(log_writer, "writer", None)
+    return log_writer.configure(session_factory)
+
+
+def count(db, model):
+    return db.execute(select(func.count()).select_from(model)).scalar()
+
+
+def test_rows_are_written_after_commit_with_their_changes(writer, session_factory, user_id):
+    with session_factory() as db, unit_of_work(db):
+        crud.create_task(db, title="call mom", user_id=user_id)
+        for i in range(3):
+            crud.create_log(db, user_id, "conversation", f"User said: {i}")
+    with session_factory() as db:
+        # The request's transaction wrote neither the logs nor their changes
+        assert count(db, models.Log) == 0
+        assert [c.entity for c in changes.since(db, user_id, 0)] == ["task"]
+
+    writer.stop()
+    assert writer.stats()["written"] == 3 and writer.stats()["batches"] == 1
+    with session_factory() as db:
+        logs = db.execute(select(models.Log).order_by(models.Log.id)).scalars().all()
+        assert [log.content for log in logs] == [f"User said: {i}" for i in range(3)]
+        feed = [c for c in changes.since(db, user_id, 0) if c.entity == "log"]
+        assert [(c.entity_id, c.data["content"]) for c in feed] == [(log.id, log.content) for log in logs]
+
+
+def test_rolled_back_rows_are_never_written(writer, session_factory, user_id):
+    with pytest.raises(RuntimeError):
+        with session_factory() as db, unit_of_work(db):
+            crud.create_log(db, user_id, "conversation", "User said: never")
+            raise RuntimeError("boom")
+    writer.stop()
+    assert writer.stats()["written"] == 0
+    with session_factory() as db:
+        assert count(db, models.Log) == 0
+
+
+def test_a_failed_batch_leaves_nothing_behind(writer, session_factory, user_id):
+    now = datetime.utcnow()
+    writer.enqueue([
+        {"user_id": user_id, "event_type": "conversation", "content": "fine", "timestamp": now},
+        {"user_id": user_id, "event_type": "conversation", "content": None, "timestamp": now},
+    ])
+    writer.stop()
+    assert writer.stats()["failed"] == 2
+    with session_factory() as db:
+        assert count(db, models.Log) == 0
+        assert count(db, models.Change) == 0
+
+
+def test_background_thread_flushes_on_its_interval(writer, session_factory, user_id):
+    writer.flush_interval = 0.05
+    writer.start()
+    try:
+        with session_factory() as db, unit_of_work(db):
+            crud.create_log(db, user_id, "conversation", "User said: hi")
+        for _ in range(100):
+            if writer.stats()["written"]:
+                break
+            time.sleep(0.05)
+        assert writer.stats()["written"] == 1
+    finally:
+        writer.stop()
@@ -0,0 +1,56 @@
+import pytest
+
+from backend.utils import metrics
+
+
+def metric_lines(text, prefix):
+    return [line for line in text.splitlines() if line.startswith(prefix)]
+
+
+def test_histogram_buckets_are_cumulative():
+    for seconds in (0.0002, 0.003, 0.003, 20.0):
+        metrics.observe("test_buckets", seconds)
+    lines = metric_lines(metrics.render(), 'asta_stage_seconds_bucket{stage="test_buckets"')
+    counts = {line.split('le="')[1].split('"')[0]: int(line.split()[-1]) for line in lines}
+    assert counts["0.0005"] == 1 and counts["0.0025"] == 1 and counts["0.005"] == 3 and counts["10.0"] == 3
+    assert counts["+Inf"] == 4
+    assert 'asta_stage_seconds_count{stage="test_buckets"} 4' in metrics.render()
+
+
+def test_timed_records_calls_that_raise():
+    @metrics.timed("test_timed")
+    def fail():
+        raise ValueError
+
+    with pytest.raises(ValueError):
+        fail()
+    with metrics.timer("test_timed"):
+        pass
+    assert 'asta_stage_seconds_count{stage="test_timed"} 2' in metrics.render()
+
+
+def test_disabled_instrumentation_is_a_no_op(monkeypatch):
+    monkeypatch.setattr(metrics, "ENABLED", False)
+
+    def fn():
+        return 1
+
+    assert metrics.timed("off")(fn) is fn
+    assert metrics.timer("off") is metrics._NOOP
+
+
+def test_server_timing_and_metrics_endpoint(client, engine, user_id):
+    metrics.instrument_engine(engine)
+    response = client.post("/tasks/", json={"title": "call mom", "user_id": user_id})
+    timing = response.headers["server-timing"]
+    assert "crud.create_task;dur=" in timing and "crud.create_log;dur=" in timing
+    # task, log and their change rows; the commit isn't a statement
+    assert 'db;desc="3 queries"' in timing
+    assert timing.split(", ")[-1].startswith("total;dur=")
+
+    client.get(f"/users/{user_id}/tasks")
+    text = client.get("/metrics").text
+    assert "# TYPE asta_http_request_seconds histogram" in text
+    # Labelled by route template, not by path
+    assert metric_lines(text, 'asta_http_request_seconds_count{method="GET",route="/users/{user_id}/tasks",status="200"}')
+    assert metric_lines(text, "asta_db_queries_total ")
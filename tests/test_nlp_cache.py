@@ -0,0 +1,42 @@
+import os
+import threading
+
+from backend.nlp.cache import SQLiteCache
+
+
+def test_constructor_opens_nothing(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    cache = SQLiteCache(str(path))
+    assert not path.exists()
+    assert cache.get("hello") is None
+    cache.set("hello", {"intent": "greet"})
+    assert cache.get("hello") == {"intent": "greet"}
+    assert cache.stats()["size"] == 1 and cache.stats()["hits"] == 1
+
+
+def test_each_thread_has_its_own_connection(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite3"))
+    cache.set("a", 1)
+    seen = []
+    thread = threading.Thread(target=lambda: seen.append((cache._conn(), cache.get("a"))))
+    thread.start()
+    thread.join()
+    assert seen[0][0] is not cache._conn() and seen[0][1] == 1
+
+
+def test_a_forked_worker_reconnects(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite3"))
+    cache.set("a", 1)
+    parent = cache._conn()
+    read, write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        ok = cache._conn() is not parent and cache.get("a") == 1
+        cache.set("b", 2)
+        os.write(write, b"1" if ok else b"0")
+        os._exit(0)
+    os.close(write)
+    assert os.read(read, 1) == b"1"
+    os.waitpid(pid, 0)
+    # The parent keeps its connection and sees the child's write
+    assert cache._conn() is parent and cache.get("b") == 2
@@ -0,0 +1,94 @@
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+from backend.benchmarks.suite import _MockNLP
+from backend.nlp import registry as nlp_registry
+from backend.nlp.classifier import SentimentClassifier
+from backend.nlp.registry import NER_EXCLUDE, ModelRegistry
+
+
+@pytest.fixture
+def spacy_loads(monkeypatch):
+    loads = []
+
+    def load(name, exclude=()):
+        loads.append(list(exclude))
+        return _MockNLP()
+
+    monkeypatch.setitem(sys.modules, "spacy", SimpleNamespace(load=load))
+    return loads
+
+
+@pytest.fixture
+def transformer_calls(monkeypatch):
+    """torch/transformers stand-ins recording how the pipeline is built."""
+    calls = {}
+
+    def pipeline(task, **kwargs):
+        calls["pipeline"] = (task, kwargs)
+
+        def classify(texts, batch_size=None):
+            return [{"label": "NEGATIVE" if "hate" in t else "POSITIVE", "score": 0.9} for t in texts]
+
+        classify.model = "fp32 model"
+        return classify
+
+    def quantize_dynamic(model, layers, dtype):
+        calls["quantize"] = (model, layers, dtype)
+        return "int8 model"
+
+    torch = SimpleNamespace(
+        set_num_threads=lambda n: calls.setdefault("threads", n),
+        quantization=SimpleNamespace(quantize_dynamic=quantize_dynamic),
+        nn=SimpleNamespace(Linear="Linear"), qint8="qint8",
+    )
+    monkeypatch.setitem(sys.modules, "torch", torch)
+    monkeypatch.setitem(sys.modules, "transformers", SimpleNamespace(pipeline=pipeline))
+    return calls
+
+
+def test_ner_pipeline_excludes_the_unused_components(spacy_loads):
+    ModelRegistry(spacy_pipeline="ner").spacy()
+    ModelRegistry(spacy_pipeline="full").spacy()
+    assert spacy_loads == [NER_EXCLUDE, []]
+    assert "ner" not in NER_EXCLUDE
+
+
+def test_transformer_is_quantized_with_capped_length(transformer_calls, monkeypatch):
+    monkeypatch.setattr(nlp_registry, "TORCH_THREADS", 2)
+    classifier = ModelRegistry(mode="full", classifier="transformer", max_length=32).classifier()
+    task, kwargs = transformer_calls["pipeline"]
+    assert task == "text-classification"
+    assert kwargs["truncation"] and kwargs["max_length"] == 32 and kwargs["device"] == -1
+    assert transformer_calls["threads"] == 2
+    assert transformer_calls["quantize"] == ("fp32 model", {"Linear"}, "qint8")
+    assert classifier.pipeline.model == "int8 model"
+    assert classifier.predict(["i hate mondays", "thanks!"]) == ["general_chat_negative", "general_chat_positive"]
+
+
+def test_quantization_can_be_turned_off(transformer_calls):
+    classifier = ModelRegistry(mode="full", classifier="transformer", quantize=False).classifier()
+    assert "quantize" not in transformer_calls
+    assert isinstance(classifier, SentimentClassifier) and classifier.pipeline.model == "fp32 model"
+
+
+def test_inference_settings_are_part_of_the_version():
+    versions = {
+        ModelRegistry(mode="full", classifier="transformer", quantize=q, max_length=n, spacy_pipeline=p).version
+        for q in (True, False) for n in (32, 64) for p in ("ner", "full")
+    }
+    assert len(versions) == 8
+
+
+def test_ner_only_finds_the_same_entities():
+    spacy = pytest.importorskip("spacy")
+    try:
+        full = spacy.load(nlp_registry.SPACY_MODEL)
+    except OSError:
+        pytest.skip(f"{nlp_registry.SPACY_MODEL} is not installed")
+    ner = spacy.load(nlp_registry.SPACY_MODEL, exclude=NER_EXCLUDE)
+    for text in ["Remind me tomorrow at 5 pm to call Sarah", "Meet John in Paris on Friday at noon"]:
+        assert [(e.label_, e.start_char, e.end_char) for e in ner(text).ents] == \
+               [(e.label_, e.start_char, e.end_char) for e in full(text).ents]
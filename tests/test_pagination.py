@@ -0,0 +1,36 @@
+from backend.db import crud
+from backend.db.session import unit_of_work
+
+
+def add_tasks(session_factory, user_id, *titles):
+    with session_factory() as db, unit_of_work(db):
+        return [crud.create_task(db, title=title, user_id=user_id).id for title in titles]
+
+
+def pages(client, path, limit):
+    """Follow X-Next-Cursor until a short page; the ids of each page."""
+    out, params = [], {"limit": limit}
+    while True:
+        response = client.get(path, params=params)
+        assert response.status_code == 200
+        out.append([row["id"] for row in response.json()])
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return out
+        params = {"limit": limit, "after": cursor}
+
+
+def test_task_cursor_walks_oldest_first(client, session_factory, user_id):
+    ids = add_tasks(session_factory, user_id, *[f"task {i}" for i in range(5)])
+    assert pages(client, f"/users/{user_id}/tasks", 2) == [ids[0:2], ids[2:4], ids[4:]]
+    # A cursor is stable across inserts, unlike skip
+    after = client.get(f"/users/{user_id}/tasks", params={"limit": 2}).headers["X-Next-Cursor"]
+    add_tasks(session_factory, user_id, "new")
+    page = client.get(f"/users/{user_id}/tasks", params={"limit": 2, "after": after}).json()
+    assert [row["id"] for row in page] == ids[2:4]
+
+
+def test_log_cursor_walks_newest_first(client, session_factory, user_id):
+    with session_factory() as db, unit_of_work(db):
+        ids = [crud.create_log(db, user_id, "conversation", f"User said: {i}").id for i in range(4)]
+    assert pages(client, f"/users/{user_id}/logs", 3) == [ids[::-1][:3], ids[::-1][3:]]
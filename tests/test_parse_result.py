@@ -0,0 +1,35 @@
+from types import SimpleNamespace
+
+import pytest
+
+from backend.benchmarks.suite import _MockNLP
+from backend.nlp.result import ParseResult
+
+
+def parse(text, extra_ents=()):
+    doc = _MockNLP()(text)
+    doc.ents = list(doc.ents) + [
+        SimpleNamespace(label_=label, start_char=text.index(part), end_char=text.index(part) + len(part), text=part)
+        for label, part in extra_ents
+    ]
+    return ParseResult.from_doc("delete_task", doc)
+
+
+@pytest.mark.parametrize("text, ents, task_id", [
+    ("delete task 12", (), 12),
+    ("complete 7 please", (), 7),
+    ("delete the dentist task on 15 march", (("DATE", "15 march"),), None),
+    ("delete the dentist task on march 15", (), None),
+    ("delete the dentist task on 15 march", (("CARDINAL", "15"),), None),
+    ("remove the call at 5 pm", (), None),
+    ("delete task 4 from 3 march", (("DATE", "3 march"),), 4),
+    ("drop the pay 50 dollars task", (("MONEY", "50 dollars"),), None),
+])
+def test_task_id_skips_dates_times_and_amounts(text, ents, task_id):
+    assert parse(text, ents).task_id == task_id
+
+
+def test_task_id_entity_wins():
+    result = parse("delete 3 now", (("TASK_ID", "3"),))
+    assert result.task_id == 3
+    assert ParseResult.from_row(result.to_row()).task_id == 3
@@ -0,0 +1,75 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+from backend.benchmarks.suite import _MockNLP
+from backend.nlp import registry as nlp_registry
+from backend.nlp.registry import ModelRegistry
+
+
+def fake_spacy(monkeypatch, delay=0.0):
+    """Puts a spacy module in sys.modules whose load() records its calls."""
+    loads = []
+
+    def load(name, exclude=()):
+        loads.append((name, list(exclude)))
+        time.sleep(delay)
+        return _MockNLP()
+
+    monkeypatch.setitem(sys.modules, "spacy", SimpleNamespace(load=load))
+    return loads
+
+
+def test_importing_the_app_loads_no_models():
+    env = dict(os.environ, ASTA_NLP_MODE="rules-only", ASTA_NLP_WARMUP="lazy")
+    code = "import sys, backend.api.main; print(sorted({'spacy', 'torch', 'transformers'} & set(sys.modules)))"
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    out = subprocess.run([sys.executable, "-c", code], env=env, cwd=root, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
+
+
+def test_app_serves_before_the_models_are_loaded(client, user_id):
+    assert not nlp_registry.registry.status()["spacy_loaded"]
+    assert client.get("/").status_code == 200
+    assert client.post("/tasks/", json={"title": "call mom", "user_id": user_id}).status_code == 200
+    health = client.get("/health").json()["nlp"]
+    assert not health["spacy_loaded"] and not health["ready"]
+
+
+def test_models_load_once_on_first_use(monkeypatch):
+    loads = fake_spacy(monkeypatch, delay=0.05)
+    models = ModelRegistry(mode="rules-only")
+    assert loads == [] and not models.ready
+
+    threads = [threading.Thread(target=models.spacy) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(loads) == 1
+    # rules-only never loads a classifier
+    assert models.classifier() is None and models.ready
+    assert models.status()["load_seconds"]["spacy"] > 0
+
+
+def test_warm_up_loads_everything(monkeypatch):
+    fake_spacy(monkeypatch)
+    models = ModelRegistry(mode="full", classifier="linear")
+    models.warm_up(freeze=False)
+    status = models.status()
+    assert status["ready"] and status["spacy_loaded"] and status["classifier_loaded"]
+
+
+def test_lifespan_warms_up_in_the_background(monkeypatch):
+    from backend.api import main
+
+    started = threading.Event()
+    monkeypatch.setattr(nlp_registry, "WARMUP", "background")
+    monkeypatch.setattr(nlp_registry.registry, "warm_up", started.set)
+    with TestClient(main.app):
+        assert started.wait(5)
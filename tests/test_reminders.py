@@ -0,0 +1,156 @@
+from datetime import datetime, time, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from backend.db import crud, models, reminders
+from backend.db.session import unit_of_work
+
+T0 = datetime(2026, 3, 10, 8, 0)
+
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock(T0)
+    monkeypatch.setattr(reminders, "now_in", clock)
+    return clock
+
+
+def make_scheduler(session_factory, tmp_path, **kwargs):
+    events = []
+    scheduler = reminders.ReminderScheduler(
+        session_factory, sink=events.extend, lock_file=str(tmp_path / "reminders.lock"), **kwargs
+    )
+    return scheduler, events
+
+
+def add_task(session_factory, user_id, title, due_date, all_day=False):
+    with session_factory() as db, unit_of_work(db):
+        return crud.create_task(db, title=title, due_date=due_date, all_day=all_day, user_id=user_id).id
+
+
+def reminder_logs(session_factory):
+    with session_factory() as db:
+        return db.execute(
+            select(models.Log.content).where(models.Log.event_type == "reminder_due").order_by(models.Log.id)
+        ).scalars().all()
+
+
+def test_fires_once_at_due_time(session_factory, user_id, clock, tmp_path):
+    add_task(session_factory, user_id, "call mom", T0 + timedelta(minutes=30))
+    scheduler, events = make_scheduler(session_factory, tmp_path)
+
+    scheduler._step()
+    assert events == []
+    assert scheduler.stats()["scheduled"] == 1
+
+    clock.now = T0 + timedelta(minutes=30)
+    scheduler._step()
+    scheduler._step()
+    assert [e["title"] for e in events] == ["call mom"]
+    assert reminder_logs(session_factory) == ["Task 'call mom' is due at 2026-03-10 08:30"]
+
+
+def test_picks_up_tasks_created_after_start(session_factory, user_id, clock, tmp_path):
+    scheduler, events = make_scheduler(session_factory, tmp_path)
+    scheduler._step()
+    add_task(session_factory, user_id, "water plants", T0 + timedelta(minutes=5))
+
+    clock.now = T0 + timedelta(minutes=1)
+    scheduler._step()
+    clock.now = T0 + timedelta(minutes=5)
+    scheduler._step()
+    assert [e["title"] for e in events] == ["water plants"]
+
+
+def test_lead_time_beyond_the_horizon(session_factory, user_id, clock, tmp_path):
+    # Fires an hour from now, although its due date is past the 2h horizon
+    add_task(session_factory, user_id, "flight", T0 + timedelta(hours=4))
+    scheduler, events = make_scheduler(session_factory, tmp_path, horizon_hours=2, lead_minutes=180)
+
+    scheduler._step()
+    clock.now = T0 + timedelta(hours=1)
+    scheduler._step()
+    assert [e["title"] for e in events] == ["flight"]
+
+
+def test_all_day_task_fires_at_all_day_time(session_factory, user_id, clock, tmp_path):
+    # Due "today" (stored late in the day) with a 2h horizon: fires at 09:00
+    add_task(session_factory, user_id, "taxes", datetime(2026, 3, 10, 18, 0), all_day=True)
+    scheduler, events = make_scheduler(session_factory, tmp_path, horizon_hours=2, all_day_at=time(9))
+
+    scheduler._step()
+    assert scheduler.stats()["next"] == "2026-03-10T09:00:00"
+    clock.now = datetime(2026, 3, 10, 9, 0)
+    scheduler._step()
+    assert [e["title"] for e in events] == ["taxes"]
+
+
+def test_horizon_is_loaded_in_slices(session_factory, user_id, clock, tmp_path):
+    add_task(session_factory, user_id, "soon", T0 + timedelta(hours=1))
+    add_task(session_factory, user_id, "later", T0 + timedelta(hours=30))
+    scheduler, events = make_scheduler(session_factory, tmp_path, horizon_hours=24)
+
+    scheduler._step()
+    assert scheduler.stats()["scheduled"] == 1
+
+    # Past half the horizon the next slice is loaded, without re-adding "soon"
+    clock.now = T0 + timedelta(hours=13)
+    scheduler._step()
+    assert [e["title"] for e in events] == ["soon"]
+    assert scheduler.stats()["scheduled"] == 1
+    clock.now = T0 + timedelta(hours=30)
+    scheduler._step()
+    assert [e["title"] for e in events] == ["soon", "later"]
+
+
+def test_deleted_and_completed_tasks_do_not_fire(session_factory, user_id, clock, tmp_path):
+    deleted = add_task(session_factory, user_id, "deleted", T0 + timedelta(minutes=10))
+    completed = add_task(session_factory, user_id, "completed", T0 + timedelta(minutes=10))
+    add_task(session_factory, user_id, "kept", T0 + timedelta(minutes=10))
+    scheduler, events = make_scheduler(session_factory, tmp_path)
+    scheduler._step()
+    assert scheduler.stats()["scheduled"] == 3
+
+    with session_factory() as db, unit_of_work(db):
+        crud.delete_task(db, deleted)
+        crud.complete_task(db, crud.get_task(db, completed))
+    clock.now = T0 + timedelta(minutes=10)
+    scheduler._step()
+    assert [e["title"] for e in events] == ["kept"]
+    assert scheduler._heap == []
+
+
+def test_stale_heap_items_are_compacted(session_factory, clock, tmp_path):
+    scheduler, _ = make_scheduler(session_factory, tmp_path)
+    scheduler._loaded_until = T0 + timedelta(days=1)
+    for minutes in range(1, 500):
+        scheduler._schedule(1, None, "moving", T0 + timedelta(minutes=minutes), False, "pending", T0)
+    assert len(scheduler._entries) == 1
+    assert len(scheduler._heap) <= 2 * len(scheduler._entries) + 65
+    assert (T0 + timedelta(minutes=499), 1) in scheduler._heap
+
+    # The stale items left in the heap are skipped when popped
+    sent = []
+    scheduler._send = sent.extend
+    scheduler._fire_due(T0 + timedelta(days=1))
+    assert [r.fire_at for r in sent] == [T0 + timedelta(minutes=499)]
+    assert scheduler._heap == []
+
+
+def test_one_leader_per_lock_file(session_factory, tmp_path):
+    first, _ = make_scheduler(session_factory, tmp_path)
+    second, _ = make_scheduler(session_factory, tmp_path)
+    assert first._lead()
+    assert not second._lead()
+    first._resign()
+    assert second._lead()
+    second._resign()
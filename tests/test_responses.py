@@ -0,0 +1,46 @@
+import json
+from datetime import datetime
+
+from sqlalchemy import event
+
+from backend.api import schemas
+from backend.api.responses import TASKS, model_response, rows_response
+from backend.db import crud
+from backend.db.session import unit_of_work
+
+
+def add_users_with_tasks(session_factory, users, tasks_each):
+    with session_factory() as db, unit_of_work(db):
+        for u in range(users):
+            user = crud.create_user(db, f"user {u}")
+            for t in range(tasks_each):
+                crud.create_task(db, title=f"task {u}.{t}", due_date=datetime(2026, 10, 20, 9), user_id=user.id)
+
+
+def test_rows_response_matches_the_response_model(session_factory):
+    add_users_with_tasks(session_factory, 1, 3)
+    with session_factory() as db:
+        rows = crud.get_tasks(db, limit=2)
+        expected = [schemas.Task.model_validate(row, from_attributes=True).model_dump(mode="json") for row in rows]
+        response = rows_response(TASKS, rows, limit=2)
+    assert json.loads(response.body) == expected
+    assert expected[0]["due_date"] == "2026-10-20T09:00:00"
+    # A full page carries the cursor to the next one
+    assert response.headers["x-next-cursor"] == str(rows[-1].id)
+
+
+def test_model_response_encodes_without_revalidating():
+    output = schemas.NLPActOutput(intent="general_chat", entities={}, action="no_crud", message="hi")
+    response = model_response(output)
+    assert response.media_type == "application/json"
+    assert json.loads(response.body) == json.loads(output.model_dump_json())
+
+
+def test_user_listing_is_two_queries_whatever_the_page_size(client, engine, session_factory):
+    add_users_with_tasks(session_factory, 5, 2)
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, sql, *args: statements.append(sql))
+    users = client.get("/users/").json()
+    assert [len(user["tasks"]) for user in users] == [2] * 5
+    # The users, then all their tasks in one selectin query
+    assert len(statements) == 2
@@ -0,0 +1,88 @@
+import os
+import signal
+import threading
+import time
+
+from backend import serve
+from backend.serve import Master
+
+THREAD_ENV = ("ASTA_NLP_WARMUP", "ASTA_INFERENCE_WORKERS", "ASTA_TORCH_THREADS") + serve._THREAD_VARS
+
+
+def clean_env(monkeypatch):
+    for var in THREAD_ENV:
+        monkeypatch.delenv(var, raising=False)
+
+
+def test_preloading_master_warms_up_single_threaded(monkeypatch):
+    clean_env(monkeypatch)
+    serve._configure_threads(4)
+    assert os.environ["ASTA_NLP_WARMUP"] == "import"
+    assert os.environ["ASTA_TORCH_THREADS"] == "1"
+    assert all(os.environ[var] == "4" for var in ("ASTA_INFERENCE_WORKERS",) + serve._THREAD_VARS)
+
+
+def test_thread_settings_already_set_are_kept(monkeypatch):
+    clean_env(monkeypatch)
+    monkeypatch.setenv("ASTA_NLP_WARMUP", "lazy")
+    monkeypatch.setenv("OMP_NUM_THREADS", "3")
+    serve._configure_threads(2)
+    # Without preloading each worker loads the models with its own threads
+    assert os.environ["ASTA_TORCH_THREADS"] == "2"
+    assert os.environ["OMP_NUM_THREADS"] == "3" and os.environ["MKL_NUM_THREADS"] == "2"
+
+
+class SleepingMaster(Master):
+    """Workers that only sleep; the real ones run uvicorn."""
+
+    def __init__(self, workers):
+        super().__init__(None, None, workers, 1, 2.0, {})
+        self.spawned, self.reloads = [], 0
+
+    def _worker(self):
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        time.sleep(60)
+
+    def _reload_intents(self):
+        self.reloads += 1
+
+    def spawn(self):
+        pid = super().spawn()
+        self.spawned.append(pid)
+        return pid
+
+
+def alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+
+def test_master_replaces_reloads_and_stops_its_workers(monkeypatch):
+    monkeypatch.setenv("ASTA_MASTER_PID", "")
+    handlers = {sig: signal.getsignal(sig) for sig in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT)}
+    master = SleepingMaster(2)
+
+    def drive():
+        time.sleep(0.3)
+        os.kill(master.spawned[0], signal.SIGKILL)  # a worker dies
+        time.sleep(1.0)
+        master._on_hup()
+        time.sleep(1.0)
+        master._on_stop()
+
+    driver = threading.Thread(target=drive)
+    driver.start()
+    try:
+        master.run()
+    finally:
+        driver.join()
+        for sig, handler in handlers.items():
+            signal.signal(sig, handler)
+
+    # 2 at start, 1 replacement, 2 for the reload
+    assert len(master.spawned) == 5 and master.reloads == 1
+    assert os.environ["ASTA_MASTER_PID"] == str(os.getpid())
+    assert master.children == set() and not any(alive(pid) for pid in master.spawned)
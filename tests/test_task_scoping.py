@@ -0,0 +1,68 @@
+import pytest
+from fastapi import HTTPException
+
+from backend.api.main import perform_action, resolve_task_id
+from backend.db import crud, models
+from backend.db.session import unit_of_work
+from backend.nlp.result import ParseResult
+
+
+def make_users_and_tasks(session_factory):
+    with session_factory() as db, unit_of_work(db):
+        alice, bob = models.User(username="alice"), models.User(username="bob")
+        db.add_all([alice, bob])
+        db.flush()
+        mine = crud.create_task(db, title="dentist appointment", user_id=alice.id)
+        theirs = crud.create_task(db, title="dentist appointment", user_id=bob.id)
+        return alice.id, bob.id, mine.id, theirs.id
+
+
+def test_delete_and_get_are_scoped_to_the_owner(session_factory):
+    alice, bob, mine, theirs = make_users_and_tasks(session_factory)
+    with session_factory() as db, unit_of_work(db):
+        assert crud.get_task(db, theirs, user_id=alice) is None
+        assert crud.delete_task(db, theirs, user_id=alice) is None
+        assert crud.get_task(db, theirs) is not None
+        assert crud.delete_task(db, mine, user_id=alice).id == mine
+    with session_factory() as db:
+        assert crud.get_task(db, mine) is None
+        assert crud.get_task(db, theirs, user_id=bob).id == theirs
+
+
+def test_task_name_resolves_within_the_user(session_factory):
+    alice, bob, mine, theirs = make_users_and_tasks(session_factory)
+    text = "delete the dentist appointment task"
+    with session_factory() as db:
+        assert resolve_task_id(db, text, alice, ParseResult("delete_task")) == (mine, None, [])
+        assert resolve_task_id(db, text, bob, ParseResult("delete_task")) == (theirs, None, [])
+        task_id, reason, candidates = resolve_task_id(db, "delete the gym task", alice, ParseResult("delete_task"))
+        assert task_id is None and "gym" in reason.lower() and candidates == []
+
+
+def test_partial_title_overlap_does_not_delete(session_factory, user_id):
+    with session_factory() as db, unit_of_work(db):
+        review = crud.create_task(db, title="Quarterly report review", user_id=user_id).id
+    with session_factory() as db:
+        with pytest.raises(HTTPException) as e:
+            perform_action(db, "delete the report", user_id, ParseResult("delete_task"))
+        assert e.value.status_code == 409
+        assert e.value.detail["candidates"] == [{"id": review, "title": "Quarterly report review"}]
+        with pytest.raises(HTTPException) as e:
+            perform_action(db, "mark the report as done", user_id, ParseResult("complete_task"))
+        assert e.value.status_code == 409
+    with session_factory() as db:
+        assert crud.get_task(db, review).status == "pending"
+
+
+def test_exact_or_close_title_acts(session_factory, user_id):
+    with session_factory() as db, unit_of_work(db):
+        report = crud.create_task(db, title="report", user_id=user_id).id
+        review = crud.create_task(db, title="Report review", user_id=user_id).id
+        dentist = crud.create_task(db, title="dentist appointment", user_id=user_id).id
+    with session_factory() as db:
+        # Exact beats the other partial match; a single hit close to the title is enough
+        assert perform_action(db, "delete the Report", user_id, ParseResult("delete_task")).task_id == report
+        assert perform_action(db, "delete the dentist appoint task", user_id,
+                              ParseResult("delete_task")).task_id == dentist
+    with session_factory() as db:
+        assert crud.get_task(db, review) is not None
@@ -0,0 +1,42 @@
+from backend.nlp.utils import TitleCleaner, clean_title, task_reference
+
+
+def span(text, part, start=0):
+    i = text.index(part, start)
+    return (i, i + len(part))
+
+
+def test_entity_spans_are_cut_by_offset():
+    cleaner = TitleCleaner()
+    text = "Remind me to call mom tomorrow at 5pm"
+    assert cleaner.clean(text, [span(text, "tomorrow"), span(text, "5pm")]) == "Call mom"
+
+
+def test_only_the_tagged_occurrence_goes():
+    cleaner = TitleCleaner()
+    text = "plan the Sunday brunch on Sunday"
+    assert cleaner.clean(text, [span(text, "Sunday", 10)]) == "Plan the Sunday brunch"
+    text = "Monday.com review on monday"
+    assert cleaner.clean(text, [span(text, "monday")]) == "Monday.com review"
+
+
+def test_fillers_only_go_next_to_removed_text():
+    cleaner = TitleCleaner()
+    text = "talk to Sam at noon"
+    assert cleaner.clean(text, [span(text, "noon")]) == "Talk to Sam"
+    text = "add task: pay rent by friday"
+    assert cleaner.clean(text, [span(text, "friday")]) == "Pay rent"
+
+
+def test_overlapping_spans_and_no_spans():
+    cleaner = TitleCleaner()
+    text = "buy milk tomorrow morning"
+    assert cleaner.clean(text, [span(text, "tomorrow morning"), span(text, "morning")]) == "Buy milk"
+    assert cleaner.clean("remind me to buy milk, please") == "Buy milk"
+
+
+def test_entities_without_offsets_and_task_references():
+    assert clean_title("call the dentist on friday", {"DATE": "friday"}) == "Call the dentist"
+    assert task_reference("Mark the report as done") == "Report"
+    text = "delete the gym task for tomorrow"
+    assert task_reference(text, [("DATE", *span(text, "tomorrow"))]) == "Gym"
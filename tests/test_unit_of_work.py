@@ -0,0 +1,51 @@
+import pytest
+from sqlalchemy import event, func, select
+
+from backend.db import changes, crud, models
+from backend.db.session import unit_of_work
+
+
+def test_unit_of_work_commits_everything_once(session_factory, user_id, monkeypatch):
+    notified = []
+    monkeypatch.setattr(changes, "_subscribers", [notified.append])
+    with session_factory() as db, unit_of_work(db):
+        task = crud.create_task(db, title="call mom", user_id=user_id)
+        crud.create_log(db, user_id, "conversation", "User said: call mom")
+        assert task.id is not None  # flushed, not yet committed
+    assert notified == [{user_id}]
+    with session_factory() as db:
+        assert db.execute(select(func.count()).select_from(models.Task)).scalar() == 1
+        assert [(c.entity, c.op) for c in changes.since(db, user_id, 0)] == [("task", "upsert"), ("log", "upsert")]
+
+
+def test_unit_of_work_rolls_back_together(session_factory, user_id, monkeypatch):
+    notified = []
+    monkeypatch.setattr(changes, "_subscribers", [notified.append])
+    with pytest.raises(RuntimeError):
+        with session_factory() as db, unit_of_work(db):
+            crud.create_task(db, title="call mom", user_id=user_id)
+            crud.create_log(db, user_id, "conversation", "User said: call mom")
+            raise RuntimeError("boom")
+    assert notified == []
+    with session_factory() as db:
+        for model in (models.Task, models.Log, models.Change):
+            assert db.execute(select(func.count()).select_from(model)).scalar() == 0
+
+
+def test_nlp_create_is_three_statements_and_a_commit(client, engine, user_id, monkeypatch):
+    from backend.api import main
+    from backend.nlp.result import ParseResult
+
+    async def parse_one(text):
+        return ParseResult("create_task")
+
+    monkeypatch.setattr(main, "parse_one", parse_one)
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, sql, *args: statements.append(sql.split()[:3]))
+    event.listen(engine, "commit", lambda conn: statements.append(["COMMIT"]))
+
+    response = client.post("/nlp/act", json={"text": "remind me to buy milk", "user_id": user_id})
+    assert response.status_code == 200 and response.json()["action"] == "task_created"
+    # The change rows of the task and its log (and, on PostgreSQL, the user's
+    # lock) are a single statement at commit
+    assert statements == [["INSERT", "INTO", "tasks"], ["INSERT", "INTO", "logs"], ["INSERT", "INTO", "changes"], ["COMMIT"]]